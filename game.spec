@@ -32,6 +32,8 @@ added_files = [
     ('assets/images/*.png', 'assets/images'),
     ('assets/images/*.ico', 'assets/images'),
     ('assets/sounds/*.mp3', 'assets/sounds'),
+    ('assets/data/*.json', 'assets/data'),
+    ('assets/data/text/*.json', 'assets/data/text'),
     ('src/game/*.py', 'src/game'),
     ('src/ui/*.py', 'src/ui'),
     ('src/utils/*.py', 'src/utils'),
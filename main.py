@@ -3,6 +3,7 @@ El Secreto de la Mansión Oscura - Punto de entrada principal
 """
 import sys
 import os
+import multiprocessing
 import traceback
 import pygame
 
@@ -29,6 +30,15 @@ def main():
         
         # Crear y ejecutar el juego
         game = Game()
+        if "--resume" in sys.argv:
+            # Retomar la partida guardada automáticamente, p. ej. tras un cierre inesperado
+            game.resume_autosave()
+        if "--stream" in sys.argv:
+            # Emitir el estado para espectadores: python -m src.game.viewer
+            game.start_streaming()
+        if "--npc-process" in sys.argv:
+            # Planificar los pasos de los NPCs en otro proceso
+            game.start_npc_planner()
         game.run()
         
     except Exception as e:
@@ -48,4 +58,6 @@ def main():
         sys.exit()
 
 if __name__ == "__main__":
+    # Necesario para el proceso del planificador en el ejecutable empaquetado
+    multiprocessing.freeze_support()
     main()
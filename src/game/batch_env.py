@@ -0,0 +1,248 @@
+"""
+Vectorized batch environment
+
+BatchEnv steps many games in lockstep for AI playtesting and for tuning
+INITIAL_TIMER, TIMER_BONUS and REDUCED_TIMER. Each game is one row of
+NumPy arrays: room, player tile, timer, clue mask, points and suspect
+positions. One call to step() applies an action to every game at once:
+moves are checked against the stacked room arrays, talking is tested
+against the suspects' tiles, doors are looked up in a per-room table, and
+the timers tick.
+
+The rules are those of GameRules, one frame per step, with two
+simplifications that don't change the score:
+- The mystery is solved as soon as every suspect has been heard. The
+  scenario bank only holds scenarios where that names a single killer.
+- A suspect the player talked to does not walk tile by tile. It moves
+  straight to a random point of interest of its room, where its errand
+  would end.
+
+Door destinations are read from GameRules.check_door_interaction when the
+environment is built, so they always match the game.
+"""
+import numpy as np
+
+from .entities import Player
+from .game_constants import INITIAL_TIMER, NPC_ROOM, REDUCED_TIMER, TIMER_BONUS
+from .game_maps import ALEXS_ROOM, MAIN_MAP, OUTSIDE_MAP, PATROL_WAYPOINTS, TILE_TYPES
+from .mystery_generator import DEFAULT_SUSPECTS
+from .navigation import NavigationGrid
+from .rules import GameRules
+
+ACTION_NONE = 0
+ACTION_UP = 1
+ACTION_DOWN = 2
+ACTION_LEFT = 3
+ACTION_RIGHT = 4
+ACTION_INTERACT = 5
+
+# Player start, as in Game.setup_game_state
+START_ROOM = 'outside'
+START_POSITION = (1, 17)
+
+ACTION_DX = np.array([0, 0, 0, -1, 1, 0], dtype=np.int16)
+ACTION_DY = np.array([0, -1, 1, 0, 0, 0], dtype=np.int16)
+FRAME_TIME = 1 / 60
+NO_DOOR = -1
+
+
+class _DoorProbe(GameRules):
+    """Bare GameRules used to read where each door leads"""
+
+    __slots__ = ('player', 'rooms')
+
+    def __init__(self, rooms, room, x, y):
+        self.rooms = rooms
+        self.player = Player(x, y, room)
+
+
+class BatchEnv:
+    def __init__(self, count, initial_timer=INITIAL_TIMER, timer_bonus=TIMER_BONUS,
+                 reduced_timer=REDUCED_TIMER, rooms=None, suspects=DEFAULT_SUSPECTS,
+                 auto_reset=True, seed=None):
+        """
+        Initialize environment and reset every game
+
+        Args:
+            count (int): Games stepped together
+            initial_timer (float): Seconds of a new game
+            timer_bonus (float): Seconds added by each new clue
+            reduced_timer (float): Timer after the first mystery solved
+            rooms (dict): Room maps by name, the game rooms if None
+            suspects (tuple): Suspect names, in the order of the clue bits
+            auto_reset (bool): Reset lost games at the end of step()
+            seed (int): Seed for the suspects' positions
+        """
+        self.count = count
+        self.initial_timer = initial_timer
+        self.timer_bonus = timer_bonus
+        self.reduced_timer = reduced_timer
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+        self.suspects = tuple(suspects)
+        self.full_clues = (1 << len(self.suspects)) - 1
+
+        rooms = rooms or {'main': MAIN_MAP, 'alexs_room': ALEXS_ROOM, 'outside': OUTSIDE_MAP}
+        self.room_names = list(rooms)
+        self._build_maps(rooms)
+        self.npc_room = self.room_names.index(NPC_ROOM)
+        self.start_room = self.room_names.index(START_ROOM)
+        npc_grid = np.asarray(rooms[NPC_ROOM], dtype=np.uint8)
+        floor_y, floor_x = np.nonzero(npc_grid == TILE_TYPES['EMPTY'])
+        self.floor_cells = np.stack((floor_x, floor_y), axis=1).astype(np.int16)
+        navigation = NavigationGrid(rooms[NPC_ROOM], waypoints=PATROL_WAYPOINTS.get(NPC_ROOM, ()))
+        self.goal_cells = np.array(navigation.points_of_interest or self.floor_cells[:1], dtype=np.int16)
+
+        shape = (count,)
+        self.room = np.zeros(shape, dtype=np.uint8)
+        self.x = np.zeros(shape, dtype=np.int16)
+        self.y = np.zeros(shape, dtype=np.int16)
+        self.timer = np.zeros(shape, dtype=np.float64)
+        self.timer_active = np.zeros(shape, dtype=bool)
+        self.clues = np.zeros(shape, dtype=np.uint8)
+        self.points = np.zeros(shape, dtype=np.int32)
+        self.first_win = np.zeros(shape, dtype=bool)
+        self.lost = np.zeros(shape, dtype=bool)
+        self.npc_x = np.zeros((count, len(self.suspects)), dtype=np.int16)
+        self.npc_y = np.zeros((count, len(self.suspects)), dtype=np.int16)
+        self.steps = 0
+        self.reset()
+
+    def _build_maps(self, rooms):
+        """Stack the rooms into one padded tile array and tabulate their doors"""
+        grids = [np.asarray(rooms[name], dtype=np.uint8) for name in self.room_names]
+        height = max(grid.shape[0] for grid in grids)
+        width = max(grid.shape[1] for grid in grids)
+        self.room_height = np.array([grid.shape[0] for grid in grids], dtype=np.int16)
+        self.room_width = np.array([grid.shape[1] for grid in grids], dtype=np.int16)
+        self.tiles = np.full((len(grids), height, width), TILE_TYPES['WALL'], dtype=np.uint8)
+        # Destino de cada puerta: sala, columna y fila, o NO_DOOR
+        self.door_room = np.full(self.tiles.shape, NO_DOOR, dtype=np.int16)
+        self.door_x = np.zeros(self.tiles.shape, dtype=np.int16)
+        self.door_y = np.zeros(self.tiles.shape, dtype=np.int16)
+        for index, (name, grid) in enumerate(zip(self.room_names, grids)):
+            self.tiles[index, :grid.shape[0], :grid.shape[1]] = grid
+            for y, x in zip(*np.nonzero(grid == TILE_TYPES['DOOR'])):
+                probe = _DoorProbe(rooms, name, int(x), int(y))
+                probe.check_door_interaction()
+                if (probe.current_map, probe.player_x, probe.player_y) != (name, x, y):
+                    self.door_room[index, y, x] = self.room_names.index(probe.current_map)
+                    self.door_x[index, y, x] = probe.player_x
+                    self.door_y[index, y, x] = probe.player_y
+
+    def reset(self, index=None):
+        """
+        Start new games
+
+        Args:
+            index: Games to reset (indices or boolean mask), all if None
+        """
+        if index is None:
+            index = slice(None)
+        elif np.asarray(index).dtype == bool:
+            index = np.flatnonzero(index)
+        count = len(self.room[index])
+        self.room[index] = self.start_room
+        self.x[index] = START_POSITION[0]
+        self.y[index] = START_POSITION[1]
+        self.timer[index] = self.initial_timer
+        self.timer_active[index] = True
+        self.clues[index] = 0
+        self.points[index] = 0
+        self.first_win[index] = True
+        self.lost[index] = False
+        # Posiciones distintas al azar en el suelo libre, como place_characters_randomly
+        choice = np.argpartition(self.rng.random((count, len(self.floor_cells))),
+                                 len(self.suspects), axis=1)[:, :len(self.suspects)]
+        self.npc_x[index] = self.floor_cells[choice, 0]
+        self.npc_y[index] = self.floor_cells[choice, 1]
+
+    def step(self, actions):
+        """
+        Advance every game one frame
+
+        Args:
+            actions (ndarray): One ACTION_* per game
+
+        Returns:
+            tuple: (points scored this step, games lost this step), one per game
+        """
+        actions = np.asarray(actions)
+        playing = ~self.lost
+        points_before = self.points.copy()
+
+        # Mover: dentro de la sala y sin atravesar paredes, como move_player
+        new_x = self.x + ACTION_DX[actions]
+        new_y = self.y + ACTION_DY[actions]
+        inside = (new_x >= 0) & (new_y >= 0) & (new_x < self.room_width[self.room]) & \
+                 (new_y < self.room_height[self.room])
+        tile = self.tiles[self.room, np.clip(new_y, 0, self.tiles.shape[1] - 1),
+                          np.clip(new_x, 0, self.tiles.shape[2] - 1)]
+        can_move = playing & inside & (tile != TILE_TYPES['WALL'])
+        self.x = np.where(can_move, new_x, self.x)
+        self.y = np.where(can_move, new_y, self.y)
+
+        talking = playing & (actions == ACTION_INTERACT)
+        if talking.any():
+            self._interact(np.flatnonzero(talking))
+
+        # Puertas
+        target = self.door_room[self.room, self.y, self.x]
+        through = playing & (target != NO_DOOR)
+        if through.any():
+            door_x = self.door_x[self.room, self.y, self.x]
+            door_y = self.door_y[self.room, self.y, self.x]
+            self.x = np.where(through, door_x, self.x)
+            self.y = np.where(through, door_y, self.y)
+            self.room = np.where(through, target, self.room).astype(np.uint8)
+
+        # Temporizador, como _update_timer
+        ticking = playing & self.timer_active
+        self.timer[ticking] -= FRAME_TIME
+        expired = ticking & (self.timer <= 0)
+        self.timer[expired] = 0
+        self.timer_active[expired] = False
+        lost = expired & (self.clues == 0)
+        self.lost |= lost
+
+        rewards = self.points - points_before
+        if self.auto_reset and lost.any():
+            self.reset(lost)
+        self.steps += 1
+        return rewards, lost
+
+    def _interact(self, games):
+        """Talk to the suspects next to the player, one suspect after another as interact does"""
+        for suspect in range(len(self.suspects)):
+            near = (np.abs(self.x[games] - self.npc_x[games, suspect]) <= 1) & \
+                   (np.abs(self.y[games] - self.npc_y[games, suspect]) <= 1)
+            heard = games[near]
+            if len(heard) == 0:
+                continue
+            bit = np.uint8(1 << suspect)
+            new_clue = (self.clues[heard] & bit) == 0
+            self.timer[heard[new_clue]] += self.timer_bonus
+            self.clues[heard] |= bit
+            # El sospechoso se va a un punto de interés al azar
+            goal = self.goal_cells[self.rng.integers(len(self.goal_cells), size=len(heard))]
+            self.npc_x[heard, suspect] = goal[:, 0]
+            self.npc_y[heard, suspect] = goal[:, 1]
+
+            solved = heard[self.clues[heard] == self.full_clues]
+            if len(solved):
+                self.points[solved] += 1
+                self.clues[solved] = 0
+                first = solved[self.first_win[solved]]
+                self.timer[first] = self.reduced_timer
+                self.first_win[first] = False
+
+    def observe(self):
+        """
+        Get the state of every game
+
+        Returns:
+            dict: Arrays by name, one row per game
+        """
+        return {"room": self.room, "x": self.x, "y": self.y, "timer": self.timer,
+                "timer_active": self.timer_active, "clues": self.clues, "points": self.points,
+                "lost": self.lost, "npc_x": self.npc_x, "npc_y": self.npc_y}
@@ -0,0 +1,87 @@
+"""
+Camera following the player over rooms larger than the screen
+
+The camera works in whole tiles: its origin is the top-left visible tile,
+so baked room layers stay aligned with the tile grid and moving the camera
+only exposes whole rows or columns of tiles. Visible areas are returned as
+slices, ready to index the 2D room arrays.
+"""
+import math
+
+
+class Camera:
+    def __init__(self, view_size, tile_size):
+        """
+        Initialize camera
+
+        Args:
+            view_size (tuple): Size of the view in pixels
+            tile_size (int): Size of a tile in pixels
+        """
+        self.view_size = tuple(view_size)
+        self.tile_size = tile_size
+        # Tiles needed to cover the view, counting a partly visible last one
+        self.columns = math.ceil(self.view_size[0] / tile_size)
+        self.rows = math.ceil(self.view_size[1] / tile_size)
+        self.world_width = 0
+        self.world_height = 0
+        self.x = 0
+        self.y = 0
+
+    @property
+    def origin(self):
+        """Top-left visible tile as (x, y)"""
+        return self.x, self.y
+
+    def set_world(self, width, height):
+        """Set the size in tiles of the room the camera moves over"""
+        self.world_width = width
+        self.world_height = height
+        self.x = min(self.x, max(0, width - self.columns))
+        self.y = min(self.y, max(0, height - self.rows))
+
+    def follow(self, x, y):
+        """
+        Center the camera on a tile, without showing anything past the room edges
+
+        Returns:
+            bool: True if the origin moved
+        """
+        new_x = max(0, min(int(x) - self.columns // 2, self.world_width - self.columns))
+        new_y = max(0, min(int(y) - self.rows // 2, self.world_height - self.rows))
+        if (new_x, new_y) == (self.x, self.y):
+            return False
+        self.x, self.y = new_x, new_y
+        return True
+
+    def visible_slices(self, rect=None, margin=0):
+        """
+        Tiles under a screen area, as (row slice, column slice) of the room
+
+        Args:
+            rect (Rect): Area in view pixels, the whole view if None
+            margin (int): Extra tiles around the area, for images bigger than a tile
+        """
+        if rect is None:
+            left, top, right, bottom = 0, 0, self.view_size[0], self.view_size[1]
+        else:
+            left, top, right, bottom = rect.left, rect.top, rect.right, rect.bottom
+        size = self.tile_size
+        x0 = max(0, self.x + left // size - margin)
+        y0 = max(0, self.y + top // size - margin)
+        x1 = min(self.world_width, self.x + math.ceil(right / size) + margin)
+        y1 = min(self.world_height, self.y + math.ceil(bottom / size) + margin)
+        return slice(y0, max(y0, y1)), slice(x0, max(x0, x1))
+
+    def is_visible(self, x, y):
+        """Check if any part of a tile is inside the view"""
+        return (self.x - 1 < x < self.x + self.columns and
+                self.y - 1 < y < self.y + self.rows)
+
+    def to_view(self, x, y):
+        """Convert a tile position to tile units relative to the view"""
+        return x - self.x, y - self.y
+
+    def to_screen(self, x, y):
+        """Convert a tile position to view pixels"""
+        return (x - self.x) * self.tile_size, (y - self.y) * self.tile_size
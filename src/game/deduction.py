@@ -0,0 +1,110 @@
+"""
+Bitset deduction engine
+
+With exactly one killer, a possible world is just the name of the killer,
+so the worlds still possible are an integer bitset with one bit per
+suspect. A statement ``Implies(Not(speaker), claim)`` holds in the worlds
+where the claim is true plus the world where the speaker is the killer, so
+it compiles once to a mask and hearing it is a single AND. Python integers
+have no width limit, so dozens of suspects cost the same few operations.
+
+BitsetSession has the same interface as SolverSession; create_session picks
+one of them from DEDUCTION_BACKEND.
+"""
+import time
+from collections import deque
+
+from .game_constants import DEDUCTION_BACKEND
+from .solver_session import LATENCY_SAMPLES, SolverSession, summarize_latency
+from .statements import CLAIM_EITHER, CLAIM_GUILTY, CLAIM_INNOCENT
+
+BACKEND_BITSET = 'bitset'
+BACKEND_Z3 = 'z3'
+DEDUCTION_BACKENDS = (BACKEND_BITSET, BACKEND_Z3)
+
+
+def create_session(suspects, backend=DEDUCTION_BACKEND):
+    """
+    Create a deduction session for the requested backend
+
+    Args:
+        suspects (list): Suspect names
+        backend (str): One of DEDUCTION_BACKENDS
+    """
+    if backend == BACKEND_BITSET:
+        return BitsetSession(suspects)
+    if backend == BACKEND_Z3:
+        return SolverSession(suspects)
+    raise ValueError(f"Unknown deduction backend: {backend}")
+
+
+class BitsetSession:
+    def __init__(self, suspects):
+        """
+        Initialize session
+
+        Args:
+            suspects (list): Suspect names
+        """
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.queries = 0
+        self._build(suspects)
+
+    def _build(self, suspects):
+        """Assign one bit per suspect"""
+        self.suspects = list(suspects)
+        self.bits = {name: 1 << i for i, name in enumerate(self.suspects)}
+        self.all_worlds = (1 << len(self.suspects)) - 1
+        self.masks = {}
+        self.possible = self.all_worlds
+
+    def reset(self, suspects=None):
+        """
+        Forget the heard statements and start a new round
+
+        Args:
+            suspects (list): Suspects of the new round, if they change
+        """
+        if suspects is not None and list(suspects) != self.suspects:
+            self._build(suspects)
+        self.possible = self.all_worlds
+
+    def compile(self, statement):
+        """Get the mask of worlds a statement allows, compiling it on first use"""
+        mask = self.masks.get(statement.key)
+        if mask is None:
+            bits = self.bits
+            if statement.claim == CLAIM_INNOCENT:
+                claim = self.all_worlds & ~bits[statement.a]
+            elif statement.claim == CLAIM_GUILTY:
+                claim = bits[statement.a]
+            elif statement.claim == CLAIM_EITHER:
+                claim = bits[statement.a] | bits[statement.b]
+            else:
+                claim = self.all_worlds & ~(bits[statement.a] | bits[statement.b])
+            mask = claim | bits[statement.speaker]
+            self.masks[statement.key] = mask
+        return mask
+
+    def add(self, statement):
+        """Assert a statement heard in this round"""
+        start = time.perf_counter()
+        self.possible &= self.compile(statement)
+        self.latencies.append(time.perf_counter() - start)
+        self.queries += 1
+
+    def possible_suspects(self):
+        """Suspects who can still be the killer given the statements heard"""
+        possible = self.possible
+        return [name for name in self.suspects if possible & self.bits[name]]
+
+    def killer(self):
+        """The only possible suspect, or None while several remain or none does"""
+        possible = self.possible
+        if possible == 0 or possible & (possible - 1):
+            return None
+        return self.suspects[possible.bit_length() - 1]
+
+    def latency_stats(self):
+        """Latency of the recent statements, see summarize_latency"""
+        return summarize_latency(self.latencies, self.queries)
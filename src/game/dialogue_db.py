@@ -0,0 +1,101 @@
+"""
+Indexed dialogue database
+
+Every line a character can say has a stable integer ID in
+assets/data/dialogues.json. Lines with a claim are statements and are
+compiled to Statement objects when the database loads, so hearing a line
+is a dict lookup from its ID to its logical meaning, never a text compare.
+
+The text of the lines lives in one table per language
+(assets/data/text/<language>.json), loaded the first time the language is
+used. Statements without a text of their own use the table's template for
+their claim ("claim.<claim>").
+"""
+import json
+import os
+
+from .game_constants import LANGUAGE
+from .statements import Statement
+from ..utils.path_manager import PathManager
+
+DIALOGUE_DB_VERSION = 1
+DIALOGUE_FILE_NAME = "dialogues.json"
+TEXT_DIR_NAME = "text"
+
+
+class DialogueDatabase:
+    def __init__(self, path=None, language=LANGUAGE):
+        """
+        Initialize database
+
+        Args:
+            path (str): Dialogue file, assets/data/dialogues.json if None
+            language (str): Language of the text returned by text()
+        """
+        self.path = path or PathManager.get_data_path(DIALOGUE_FILE_NAME)
+        with open(self.path, encoding="utf-8") as dialogue_file:
+            data = json.load(dialogue_file)
+        if data.get("version") != DIALOGUE_DB_VERSION:
+            raise ValueError(f"Unsupported dialogue file version: {data.get('version')}")
+
+        self.language = language
+        self.tables = {}
+        self.speakers = {}
+        self.statements = {}
+        self.statement_ids = {}
+        for line in data["lines"]:
+            line_id = line["id"]
+            if line_id in self.speakers:
+                raise ValueError(f"Duplicate dialogue line id: {line_id}")
+            self.speakers[line_id] = line["speaker"]
+            if "claim" in line:
+                statement = Statement(line["speaker"], line["claim"], line["a"], line.get("b"), text="")
+                self.statements[line_id] = statement
+                self.statement_ids[statement.key] = line_id
+        self.small_talk = {name: list(ids) for name, ids in data["small_talk"].items()}
+        self.next_id = max(self.speakers, default=0) + 1
+
+    def statement_id(self, statement):
+        """
+        Get the ID of a statement
+
+        Statements missing from the dialogue file (e.g. from a bank generated
+        for other suspects) get a new ID for this run.
+        """
+        line_id = self.statement_ids.get(statement.key)
+        if line_id is None:
+            line_id = self.next_id
+            self.next_id += 1
+            self.speakers[line_id] = statement.speaker
+            self.statements[line_id] = statement
+            self.statement_ids[statement.key] = line_id
+        return line_id
+
+    def table(self, language):
+        """Get the text table of a language, loading it on first use"""
+        table = self.tables.get(language)
+        if table is None:
+            path = os.path.join(os.path.dirname(self.path), TEXT_DIR_NAME, f"{language}.json")
+            with open(path, encoding="utf-8") as text_file:
+                table = json.load(text_file)
+            self.tables[language] = table
+        return table
+
+    def set_language(self, language):
+        """Change the language of the text returned by text()"""
+        self.language = language
+
+    def text(self, line_id, language=None):
+        """
+        Get the text of a line
+
+        Args:
+            line_id (int): Line ID
+            language (str): Language, the database language if None
+        """
+        table = self.table(language or self.language)
+        text = table.get(str(line_id))
+        if text is not None:
+            return text
+        statement = self.statements[line_id]
+        return table[f"claim.{statement.claim}"].format(a=statement.a, b=statement.b)
@@ -0,0 +1,115 @@
+"""
+Dialogue box layout
+
+Each dialogue line is word-wrapped and rendered once into a ready image of
+its box, border and text included, kept by text. Showing the line again,
+and every frame of the dialogue loop, only blits that image. The images
+depend on the font size and on the language of the text, so changing
+either drops them.
+"""
+import pygame
+
+from .game_constants import BLACK, DIALOGUE_FONT_SIZE, DIALOGUE_LINE_WIDTH, LANGUAGE, WHITE
+
+LINE_HEIGHT = 30
+PADDING = 10  # Pixels between the text and each side of the box
+BORDER = 2
+
+
+def wrap_text(font, text, width):
+    """
+    Split text into lines no wider than a width, measuring each word once
+
+    Args:
+        font (Font): Font the text is rendered with
+        text (str): Text to wrap
+        width (int): Widest line in pixels; longer words get a line of their own
+
+    Returns:
+        list: Lines of text
+    """
+    space = font.size(" ")[0]
+    lines = []
+    line = []
+    line_width = 0
+    for word in text.split():
+        word_width = font.size(word)[0]
+        if line and line_width + space + word_width > width:
+            lines.append(" ".join(line))
+            line = []
+        line_width = line_width + space + word_width if line else word_width
+        line.append(word)
+    lines.append(" ".join(line))
+    return lines
+
+
+class DialogueLayout:
+    def __init__(self, get_font, font_size=DIALOGUE_FONT_SIZE, language=LANGUAGE,
+                 line_width=DIALOGUE_LINE_WIDTH, prepare_image=None):
+        """
+        Initialize layout cache
+
+        Args:
+            get_font (callable): Returns the font for a size, loading it only once
+            font_size (int): Size of the dialogue text
+            language (str): Language of the texts laid out
+            line_width (int): Widest line of text in pixels
+            prepare_image (callable): Converts a rendered box for fast blits, if given
+        """
+        self.get_font = get_font
+        self.font_size = font_size
+        self.language = language
+        self.line_width = line_width
+        self.prepare_image = prepare_image
+        self.images = {}
+        self.renders = 0
+
+    def set_font_size(self, font_size):
+        """Change the size of the text, dropping the boxes rendered with the old one"""
+        if font_size != self.font_size:
+            self.font_size = font_size
+            self.images.clear()
+
+    def set_language(self, language):
+        """Change the language of the texts, dropping the boxes of the old one"""
+        if language != self.language:
+            self.language = language
+            self.images.clear()
+
+    def image(self, text):
+        """
+        Get the box of a text, rendering it on first use
+
+        Args:
+            text (str): Text said in the dialogue
+
+        Returns:
+            Surface: Box with the wrapped text
+        """
+        image = self.images.get(text)
+        if image is None:
+            image = self._render(text)
+            self.images[text] = image
+        return image
+
+    def preload(self, texts):
+        """Render the boxes of texts that will be shown, so showing them costs only a blit"""
+        for text in texts:
+            self.image(text)
+
+    def _render(self, text):
+        """Draw the box, its border and the wrapped lines into a new image"""
+        font = self.get_font(self.font_size)
+        lines = wrap_text(font, text, self.line_width)
+        width = self.line_width + 2 * PADDING
+        height = len(lines) * LINE_HEIGHT + 2 * PADDING
+        image = pygame.Surface((width, height))
+        image.fill(WHITE)
+        pygame.draw.rect(image, BLACK, image.get_rect(), BORDER)
+        for i, line in enumerate(lines):
+            text_surface = font.render(line, True, BLACK)
+            image.blit(text_surface, text_surface.get_rect(center=(width / 2, 2 * PADDING + i * LINE_HEIGHT)))
+        self.renders += 1
+        if self.prepare_image is not None:
+            image = self.prepare_image(image)
+        return image
@@ -0,0 +1,319 @@
+"""
+Display management with a fixed logical resolution
+
+The game always draws at a logical resolution of SCREEN_WIDTH x SCREEN_HEIGHT.
+Once per frame the result is upscaled to the real window, keeping the aspect
+ratio, so larger windows never change per-tile work.
+
+Two interchangeable backends share the same drawing interface:
+- SoftwareDisplay: blits onto a Surface and scales it on the CPU
+- TextureDisplay: draws cached textures with pygame._sdl2.video, letting the
+  GPU do the scaling; UI drawn on ``screen`` is uploaded as one overlay texture
+"""
+import os
+import weakref
+import pygame
+from pygame.locals import *
+
+from .game_constants import BLACK
+
+# Render quality settings
+QUALITY_SCALED = 'scaled'   # pygame.SCALED, scaling done by SDL
+QUALITY_SMOOTH = 'smooth'   # cached smoothscale (bilinear)
+QUALITY_FAST = 'fast'       # cached nearest-neighbour scale
+RENDER_QUALITIES = (QUALITY_SCALED, QUALITY_SMOOTH, QUALITY_FAST)
+
+# Render backends
+BACKEND_SOFTWARE = 'software'
+BACKEND_TEXTURE = 'texture'
+RENDER_BACKENDS = (BACKEND_SOFTWARE, BACKEND_TEXTURE)
+
+MOUSE_EVENTS = (MOUSEMOTION, MOUSEBUTTONDOWN, MOUSEBUTTONUP)
+TRANSPARENT = (0, 0, 0, 0)
+
+
+def create_display(logical_size, backend=BACKEND_SOFTWARE, quality=QUALITY_SMOOTH):
+    """
+    Create a display for the requested backend
+    
+    The texture backend falls back to the software one when pygame._sdl2 or
+    a renderer is not available, so the game always starts.
+    
+    Args:
+        logical_size (tuple): Resolution the game draws at
+        backend (str): One of RENDER_BACKENDS
+        quality (str): One of RENDER_QUALITIES
+    """
+    if backend not in RENDER_BACKENDS:
+        raise ValueError(f"Unknown render backend: {backend}")
+    if backend == BACKEND_TEXTURE:
+        try:
+            return TextureDisplay(logical_size, quality)
+        except (ImportError, pygame.error):
+            pass
+    return SoftwareDisplay(logical_size, quality)
+
+
+class SoftwareDisplay:
+    backend = BACKEND_SOFTWARE
+
+    def __init__(self, logical_size, quality=QUALITY_SMOOTH):
+        """
+        Initialize display
+
+        Args:
+            logical_size (tuple): Resolution the game draws at
+            quality (str): One of RENDER_QUALITIES
+        """
+        if quality not in RENDER_QUALITIES:
+            raise ValueError(f"Unknown render quality: {quality}")
+        self.logical_size = tuple(logical_size)
+        self.quality = quality
+        self.window = None
+        self.window_size = None
+        self.screen = None
+        self._scaled_target = None
+        self._scaled_rect = pygame.Rect((0, 0), self.logical_size)
+        self._full_present = True
+        self._open_window(self.logical_size)
+
+    def _open_window(self, size):
+        """Create the window and the surfaces used to present frames"""
+        if self.quality == QUALITY_SCALED:
+            try:
+                self.window = pygame.display.set_mode(self.logical_size, SCALED | RESIZABLE)
+                self.window_size = self.window.get_size()
+                self.screen = self.window
+                return
+            except pygame.error:
+                # SCALED needs a renderer; fall back to software scaling
+                self.quality = QUALITY_SMOOTH
+
+        self.window = pygame.display.set_mode(size, RESIZABLE)
+        self.window_size = self.window.get_size()
+        self._full_present = True
+        if self.screen is None or self.screen is self.window:
+            self.screen = pygame.Surface(self.logical_size).convert()
+        self._build_scaled_target()
+
+    def _build_scaled_target(self):
+        """Compute the letterboxed area and cache the scaled frame surface"""
+        window_w, window_h = self.window_size
+        logical_w, logical_h = self.logical_size
+        scale = min(window_w / logical_w, window_h / logical_h)
+        scaled_size = (max(1, int(logical_w * scale)), max(1, int(logical_h * scale)))
+        self._scaled_rect = pygame.Rect((0, 0), scaled_size)
+        self._scaled_rect.center = (window_w // 2, window_h // 2)
+        self.window.fill(BLACK)
+
+        if scaled_size == self.logical_size:
+            self._scaled_target = None
+        else:
+            # Scale straight into the window area, no intermediate surface
+            self._scaled_target = self.window.subsurface(self._scaled_rect)
+
+    def set_caption(self, title):
+        """Set the window title"""
+        pygame.display.set_caption(title)
+
+    def set_icon(self, icon):
+        """Set the window icon"""
+        pygame.display.set_icon(icon)
+
+    def prepare_image(self, image, alpha=True):
+        """Convert an image to the display pixel format so blits need no conversion"""
+        return image.convert_alpha() if alpha else image.convert()
+
+    def invalidate_image(self, image):
+        """Images are read when they are blitted, so changes need no action"""
+
+    def clear(self, color):
+        """Start a new frame filled with a color"""
+        self.screen.fill(color)
+
+    def blit(self, image, pos):
+        """Draw a cached image at a logical position"""
+        self.screen.blit(image, pos)
+
+    def draw_group(self, group):
+        """
+        Draw a LayeredDirty group, redrawing only dirty sprites
+        
+        Returns:
+            list: Logical areas that changed
+        """
+        return group.draw(self.screen)
+
+    def close(self):
+        """Release backend resources"""
+
+    def resize(self, size):
+        """Handle a window resize, rebuilding caches only if the size changed"""
+        size = tuple(size)
+        if self.quality == QUALITY_SCALED or size == self.window_size:
+            return
+        self._open_window(size)
+
+    def present(self, dirty_rects=None):
+        """
+        Upscale the logical frame to the window and show it
+        
+        Args:
+            dirty_rects (list): Logical areas that changed, None for the whole frame
+        """
+        if self._full_present:
+            # A new window must be shown whole once
+            dirty_rects = None
+            self._full_present = False
+        if self.screen is self.window:
+            if dirty_rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty_rects)
+            return
+
+        if self._scaled_target is None:
+            if dirty_rects is None:
+                self.window.blit(self.screen, self._scaled_rect)
+            else:
+                offset_x, offset_y = self._scaled_rect.topleft
+                dirty_rects = [self.window.blit(self.screen, (rect.x + offset_x, rect.y + offset_y), rect)
+                               for rect in dirty_rects]
+                pygame.display.update(dirty_rects)
+                return
+        elif self.quality == QUALITY_SMOOTH:
+            pygame.transform.smoothscale(self.screen, self._scaled_rect.size, self._scaled_target)
+        else:
+            pygame.transform.scale(self.screen, self._scaled_rect.size, self._scaled_target)
+        pygame.display.flip()
+
+    def to_logical(self, pos):
+        """Convert a window position to logical coordinates"""
+        if self.screen is self.window:
+            return pos
+        x = (pos[0] - self._scaled_rect.x) * self.logical_size[0] / self._scaled_rect.width
+        y = (pos[1] - self._scaled_rect.y) * self.logical_size[1] / self._scaled_rect.height
+        return int(x), int(y)
+
+    def get_events(self):
+        """Get pending events, handling resizes and mapping mouse positions"""
+        events = pygame.event.get()
+        for i, event in enumerate(events):
+            if event.type == VIDEORESIZE:
+                self.resize(event.size)
+            elif event.type in MOUSE_EVENTS and self.screen is not self.window:
+                attributes = dict(event.dict, pos=self.to_logical(event.pos))
+                events[i] = pygame.event.Event(event.type, attributes)
+        return events
+
+
+class TextureDisplay:
+    backend = BACKEND_TEXTURE
+
+    def __init__(self, logical_size, quality=QUALITY_SMOOTH):
+        """
+        Initialize display
+        
+        Args:
+            logical_size (tuple): Resolution the game draws at
+            quality (str): One of RENDER_QUALITIES
+        
+        Raises:
+            ImportError: pygame._sdl2 is not available
+            pygame.error: No renderer could be created
+        """
+        from pygame._sdl2 import video
+
+        if quality not in RENDER_QUALITIES:
+            raise ValueError(f"Unknown render quality: {quality}")
+        # Read by SDL when textures are created
+        os.environ["SDL_RENDER_SCALE_QUALITY"] = "0" if quality == QUALITY_FAST else "1"
+        self.logical_size = tuple(logical_size)
+        self.quality = quality
+        self.window = video.Window(size=self.logical_size, resizable=True)
+        self.window_size = self.logical_size
+        self.renderer = video.Renderer(self.window)
+        # SDL scales and letterboxes the logical size, mouse events included
+        self.renderer.logical_size = self.logical_size
+        # Keyed by the image itself; textures go away with their images
+        self._textures = weakref.WeakKeyDictionary()
+        self._texture_class = video.Texture
+        self._overlay_texture = video.Texture(self.renderer, self.logical_size, streaming=True)
+        self._overlay_texture.blend_mode = pygame.BLENDMODE_BLEND
+        # UI drawn on screen goes over the textures drawn with blit
+        self.screen = pygame.Surface(self.logical_size, SRCALPHA)
+
+    def set_caption(self, title):
+        """Set the window title"""
+        self.window.title = title
+
+    def set_icon(self, icon):
+        """Set the window icon"""
+        self.window.set_icon(icon)
+
+    def prepare_image(self, image, alpha=True):
+        """Images are converted when they are uploaded as textures"""
+        return image
+
+    def invalidate_image(self, image):
+        """Drop the texture of an image that was drawn into, to upload it again"""
+        self._textures.pop(image, None)
+
+    def clear(self, color):
+        """Start a new frame filled with a color"""
+        self.renderer.draw_color = pygame.Color(color)
+        self.renderer.clear()
+        self.screen.fill(TRANSPARENT)
+
+    def blit(self, image, pos):
+        """
+        Draw a cached image at a logical position
+        
+        Images are uploaded to a texture the first time they are drawn; call
+        invalidate_image after modifying one.
+        """
+        texture = self._textures.get(image)
+        if texture is None:
+            texture = self._texture_class.from_surface(self.renderer, image)
+            self._textures[image] = texture
+        texture.draw(dstrect=(int(pos[0]), int(pos[1]), texture.width, texture.height))
+
+    def draw_group(self, group):
+        """
+        Draw every visible sprite of a group as textures
+        
+        The GPU redraws the whole frame, so no dirty areas are returned.
+        """
+        self.renderer.clear()
+        self.screen.fill(TRANSPARENT)
+        for sprite in group.sprites():
+            if sprite.visible:
+                self.blit(sprite.image, sprite.rect.topleft)
+            sprite.dirty = 0
+
+    def close(self):
+        """Release backend resources"""
+        self._textures.clear()
+        self.window.destroy()
+
+    def resize(self, size):
+        """Window resizes are handled by the renderer's logical size"""
+        self.window_size = tuple(size)
+
+    def present(self, dirty_rects=None):
+        """Draw the UI overlay on top of the textures and show the frame"""
+        self._overlay_texture.update(self.screen)
+        self._overlay_texture.draw()
+        self.renderer.present()
+
+    def to_logical(self, pos):
+        """Mouse positions are already logical"""
+        return pos
+
+    def get_events(self):
+        """Get pending events"""
+        events = pygame.event.get()
+        for event in events:
+            if event.type == WINDOWSIZECHANGED:
+                self.resize((event.x, event.y))
+        return events
@@ -0,0 +1,92 @@
+"""
+Game entities
+
+Characters, the player and the body are small classes with __slots__, so
+attribute reads are cheap, each instance is compact and a misspelt
+attribute raises AttributeError instead of silently creating a new key.
+"""
+
+
+class Character:
+    """Suspect or NPC moved by the room's NPCSystem, which writes back x and y"""
+
+    __slots__ = ('name', 'npcs', 'x', 'y', 'image', 'dialogues', 'dialogue_index', 'is_guilty')
+
+    def __init__(self, name, npcs, dialogues, x=0, y=0, image=None):
+        """
+        Initialize character and add it to the NPC system
+
+        Args:
+            name (str): Unique character name
+            npcs (NPCSystem): System that moves the character
+            dialogues (list): IDs of the lines said in turn when the player talks to it
+            x (int): Starting tile column
+            y (int): Starting tile row
+            image (Surface): Image drawn for the character
+        """
+        self.name = name
+        self.npcs = npcs
+        self.image = image
+        self.dialogues = dialogues
+        self.dialogue_index = 0
+        self.is_guilty = None
+        # Columna y fila en tiles, fraccionarias mientras camina
+        self.x = float(x)
+        self.y = float(y)
+        npcs.spawn(name, x, y, entity=self)
+
+    def place(self, x, y):
+        """Put the character on a tile and stop it"""
+        self.npcs.place(self.name, x, y)
+
+    def next_dialogue(self):
+        """Get the ID of the current dialogue line and advance to the next one"""
+        dialogue = self.dialogues[self.dialogue_index]
+        self.dialogue_index = (self.dialogue_index + 1) % len(self.dialogues)
+        return dialogue
+
+
+class Player:
+    """Player position and the room it is in"""
+
+    __slots__ = ('x', 'y', 'room')
+
+    def __init__(self, x, y, room):
+        """
+        Initialize player
+
+        Args:
+            x (int): Tile column
+            y (int): Tile row
+            room (str): Name of the current room
+        """
+        self.x = x
+        self.y = y
+        self.room = room
+
+    def is_near(self, x, y):
+        """Check if a tile is the player's tile or next to it"""
+        return abs(self.x - x) <= 1 and abs(self.y - y) <= 1
+
+
+class Body:
+    """Victim's body and its fullscreen close-up"""
+
+    __slots__ = ('x', 'y', 'room', 'fullscreen', 'fullscreen_since', 'fullscreen_duration')
+
+    def __init__(self, x, y, room, fullscreen_duration=3):
+        """
+        Initialize body
+
+        Args:
+            x (int): Tile column
+            y (int): Tile row
+            room (str): Room the body lies in
+            fullscreen_duration (float): Seconds the close-up is shown
+        """
+        self.x = x
+        self.y = y
+        self.room = room
+        self.fullscreen = False
+        self.fullscreen_since = 0
+        self.fullscreen_duration = fullscreen_duration
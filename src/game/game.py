@@ -4,19 +4,39 @@ Main game class implementation
 import os
 import sys
 import time
-import random
+import numpy as np
 import pygame
 from pygame.locals import *
-from z3 import *
+from pygame.sprite import LayeredDirty
 
 # Local imports
 from .game_state import GameState
+from .camera import Camera
+from .dialogue_db import DialogueDatabase
+from .dialogue_layout import DialogueLayout
+from .display import create_display
+from .entities import Body, Character, Player
+from .lighting import Lighting
+from .mystery_generator import load_bank
+from .npc_planner import NPCPlanner
+from .npc_system import NPCSystem
+from .rules import GameRules
+from .weather import Storm
+from .world import ChunkedWorld
+from .snapshot import SnapshotWriter, read_snapshot_file, restore_snapshot, take_snapshot
+from .state_stream import (NO_OVERLAY, OVERLAY_DIALOGUE, OVERLAY_KILLER, OVERLAY_LOST, OVERLAY_WON,
+                           StatePublisher, capture_state)
+from .sprites import (ActorSprite, ImageSprite, TextSprite, LAYER_FLOOR, LAYER_BLOOD,
+                      LAYER_FURNITURE, LAYER_ACTORS, LAYER_DARKNESS, LAYER_WEATHER,
+                      LAYER_OVERLAY)
 from .game_constants import *
-from .game_maps import (MAIN_MAP, ALEXS_ROOM, OUTSIDE_MAP, 
-                       ALEXS_ROOM_START_POS, OUTSIDE_START_POS, TILE_TYPES)
+from .game_maps import MAIN_MAP, ALEXS_ROOM, OUTSIDE_MAP, TILE_TYPES
 from ..ui.button import Button
+from ..ui.minimap import Minimap
+from ..utils.logger import get_logger
+from ..utils.path_manager import PathManager
 
-class Game:
+class Game(GameRules):
     """
     Main game class that handles all game logic and rendering
     
@@ -30,36 +50,49 @@ class Game:
     7. Helper Methods
     """
 
-    def __init__(self):
-        """Initialize game components"""
+    def __init__(self, render_backend=RENDER_BACKEND, render_quality=RENDER_QUALITY,
+                 deduction_backend=DEDUCTION_BACKEND):
+        """
+        Initialize game components
+        
+        Args:
+            render_backend (str): 'software' or 'texture' (GPU, falls back to software)
+            render_quality (str): How the logical frame is scaled to the window
+            deduction_backend (str): 'bitset' or 'z3' engine deducing the killer
+        """
         # Basic setup
         pygame.init()
+        self.logger = get_logger()
+        self.fonts = {}
+        self.deduction_backend = deduction_backend
         
-        # Set window dimensions
+        # Logical resolution; the display scales it to the real window size
         self.WIDTH = SCREEN_WIDTH
         self.HEIGHT = SCREEN_HEIGHT
-        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT), RESIZABLE)
-        pygame.display.set_caption("El Secreto de la Mansión Oscura")
+        self.display = create_display((self.WIDTH, self.HEIGHT), render_backend, render_quality)
+        self.screen = self.display.screen
+        self.display.set_caption("El Secreto de la Mansión Oscura")
         self.clock = pygame.time.Clock()
         
         # Game properties
-        self.move_speed = 0.1
+        self.move_speed = MOVE_SPEED
         self.TILE_SIZE = TILE_SIZE
         
         # Initialize maps
         self.map = MAIN_MAP
         self.alexs_room = ALEXS_ROOM
         self.outside_map = OUTSIDE_MAP
+        self.rooms = {'main': MAIN_MAP, 'alexs_room': ALEXS_ROOM, 'outside': OUTSIDE_MAP}
         
         # Initialize all components
         self._load_icon()
         self.setup_game_state()
         self.setup_buttons()
         self.setup_characters()
-        self.setup_solver()
         self.load_resources()
         self.setup_audio()
         self.setup_timers()
+        self.setup_sprites()
 
     def _load_icon(self):
         """Load game icon"""
@@ -67,26 +100,26 @@ class Game:
             base_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
             icon_path = os.path.join(base_path, "assets/images", "icono.ico")
             if os.path.exists(icon_path):
-                pygame.display.set_icon(pygame.image.load(icon_path))
+                self.display.set_icon(pygame.image.load(icon_path))
             else:
-                print(f"⚠️ Warning: Icon file not found at {icon_path}")
+                self.logger.warning("Icon file not found at %s", icon_path)
         except Exception as e:
-            print(f"Error loading icon: {e}")
+            self.logger.error("Error loading icon: %s", e)
 
     def setup_game_state(self):
         """Initialize game state and variables"""
         self.state = GameState.MENU
         self.points = 0
         self.mystery_solved = False
-        self.player_x, self.player_y = 1, 17
+        self.player = Player(1, 17, 'outside')
+        self.body = Body(9, 8, 'alexs_room')
         self.clues = []
-        self.current_map = 'outside'
-        self.body_fullscreen = False
-        self.body_fullscreen_timer = 0
-        self.body_fullscreen_duration = 3
-        self.body_position = (9, 8)
+        self.solver = None
+        self.snapshot_writer = None
+        self.state_publisher = None
+        self.overlay = NO_OVERLAY
         self.first_win = True
-        self.moving_character = None
+        self.frame_count = 0
 
     def setup_buttons(self):
         """Initialize game buttons"""
@@ -103,80 +136,53 @@ class Game:
 
     def setup_characters(self):
         """Initialize game characters and place them randomly"""
-        self.characters = {
-            "Carla": {
-                "x": 5, "y": 2,  # Posiciones iniciales que serán reemplazadas
-                "image": None,
-                "dialogues": [
-                    "Estaba en mi habitación toda la noche.",
-                    "No vi a nadie en el pasillo.",
-                    "No sé quién es el asesino."
-                ],
-                "dialogue_index": 0,
-                "is_guilty": None
-            },
-            "Juan": {
-                "x": 7, "y": 4,
-                "image": None,
-                "dialogues": [
-                    "Vi a Carla en el pasillo.",
-                    "Rodys estaba en la sala.",
-                    "No sé quién es el asesino."
-                ],
-                "dialogue_index": 0,
-                "is_guilty": None
-            },
-            "Rodys": {
-                "x": 3, "y": 5,
-                "image": None,
-                "dialogues": [
-                    "La tormenta deshabilitó las cámaras.",
-                    "No vi a nadie sospechoso.",
-                    "No sé quién es el asesino."
-                ],
-                "dialogue_index": 0,
-                "is_guilty": None
-            }
-        }
-        self.character_directions = {}
-        self.character_steps = {}
-        self.character_step_limits = {}
-        self.character_last_positions = {}
+        self.navigation = {}
+        self.npcs = NPCSystem(self.get_navigation(NPC_ROOM), self.move_speed)
+        # Los diálogos son IDs de líneas; el texto se busca en la tabla del idioma
+        self.dialogue_db = DialogueDatabase()
+        self.dialogue_layout = DialogueLayout(self.get_font, language=self.dialogue_db.language,
+                                              prepare_image=lambda image: self.display.prepare_image(image, alpha=False))
+        # Posiciones iniciales que serán reemplazadas
+        self.characters = {name: Character(name, self.npcs, list(lines))
+                           for name, lines in self.dialogue_db.small_talk.items()}
+        self.scenarios = self.load_scenarios()
+        self.setup_mystery()
         self.place_characters_randomly()  # Colocar personajes aleatoriamente al inicio
 
-    def get_valid_positions(self):
-        """Get list of valid positions on the current map"""
-        valid_positions = []
-        current_map = self.get_current_map()
-        
-        for y in range(len(current_map)):
-            for x in range(len(current_map[0])):
-                # Verificar si la posición es válida (no es pared ni puerta)
-                if current_map[y][x] == 0:
-                    # Verificar que no haya otro personaje en esta posición
-                    position_occupied = False
-                    for character in self.characters.values():
-                        if int(character["x"]) == x and int(character["y"]) == y:
-                            position_occupied = True
-                            break
-                    
-                    if not position_occupied:
-                        valid_positions.append((x, y))
-        
-        return valid_positions
-
-    def place_characters_randomly(self):
-        """Place characters in random valid positions"""
-        valid_positions = self.get_valid_positions()
-        
-        for character in self.characters.values():
-            if valid_positions:
-                # Seleccionar una posición aleatoria
-                new_pos = random.choice(valid_positions)
-                # Remover la posición seleccionada para evitar superposiciones
-                valid_positions.remove(new_pos)
-                # Asignar nueva posición al personaje
-                character["x"], character["y"] = new_pos
+    def set_scenario(self, scenario):
+        """Start a round with a scenario and render the dialogue boxes of its lines"""
+        super().set_scenario(scenario)
+        self.preload_dialogues()
+
+    def set_language(self, language):
+        """Change the language of the dialogues, rendering their boxes again"""
+        self.dialogue_db.set_language(language)
+        self.dialogue_layout.set_language(language)
+        self.preload_dialogues()
+
+    def set_dialogue_font_size(self, font_size):
+        """Change the size of the dialogue text, rendering the boxes again"""
+        self.dialogue_layout.set_font_size(font_size)
+        self.preload_dialogues()
+
+    def dialogue_text(self, name, line_id):
+        """Text shown when a character says a line"""
+        return f"{name}: {self.dialogue_db.text(line_id)}"
+
+    def preload_dialogues(self):
+        """Render the dialogue boxes of every line the characters can say"""
+        self.dialogue_layout.preload(self.dialogue_text(name, line_id)
+                                     for name, character in self.characters.items()
+                                     for line_id in character.dialogues)
+
+    def load_scenarios(self):
+        """Load the validated scenarios whose suspects are the game characters"""
+        try:
+            scenarios = load_bank()
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning("Scenario bank not available: %s", e)
+            return []
+        return [scenario for scenario in scenarios if set(scenario.suspects) == set(self.characters)]
 
     def setup_audio(self):
         """Initialize audio settings"""
@@ -193,14 +199,14 @@ class Game:
                 self.sound_on_image = pygame.image.load(os.path.join(base_path, "images", "sound_on.png"))
                 self.sound_off_image = pygame.image.load(os.path.join(base_path, "images", "sound_off.png"))
             except (pygame.error, FileNotFoundError):
-                print("⚠️ Using temporary sound button images")
+                self.logger.warning("Using temporary sound button images")
                 self.sound_on_image = temp_on
                 self.sound_off_image = temp_off
             self.sound_on_image = pygame.transform.scale(self.sound_on_image, sound_button_size)
             self.sound_off_image = pygame.transform.scale(self.sound_off_image, sound_button_size)
             
         except Exception as e:
-            print(f"Error in setup_audio: {e}")
+            self.logger.error("Error in setup_audio: %s", e)
             # Usar superficies temporales en caso de error
             self.sound_on_image = pygame.Surface(sound_button_size)
             self.sound_off_image = pygame.Surface(sound_button_size)
@@ -211,8 +217,61 @@ class Game:
         """Initialize game timers"""
         self.timer = INITIAL_TIMER
         self.timer_active = True
-        self.body_fullscreen_timer = 0
-        self.body_fullscreen_duration = 3
+
+    def setup_sprites(self):
+        """Create the sprite group used to draw the gameplay screen"""
+        self.sprites = LayeredDirty()
+        self.room_layers = {}
+        self.room_origins = {}
+        self.room_arrays = {}
+        self.scene_room = None
+        self.camera = Camera((self.WIDTH, self.HEIGHT), self.TILE_SIZE)
+        self.dirty_rects = None
+        self.shown_points = None
+        self.shown_seconds = None
+        
+        self.player_sprite = ActorSprite(self.scaled_images['player'], self.TILE_SIZE)
+        self.sprites.add(self.player_sprite, layer=LAYER_ACTORS)
+        self.character_sprites = {}
+        self._sync_character_sprites()
+        
+        self.lighting = Lighting(self.display.prepare_image(pygame.Surface((self.WIDTH, self.HEIGHT), SRCALPHA)),
+                                 self.TILE_SIZE)
+        self.darkness_sprite = ImageSprite(self.lighting.surface)
+        self.darkness_sprite.visible = 0
+        self.sprites.add(self.darkness_sprite, layer=LAYER_DARKNESS)
+        self.storm = Storm(self.display.prepare_image(pygame.Surface((self.WIDTH, self.HEIGHT), SRCALPHA)))
+        self.weather_sprite = ImageSprite(self.storm.surface)
+        self.weather_sprite.visible = 0
+        self.sprites.add(self.weather_sprite, layer=LAYER_WEATHER)
+        self.minimap = Minimap()
+        self.minimap_sprite = ImageSprite(pygame.Surface((1, 1)))
+        self.minimap_sprite.visible = 0
+        self.sprites.add(self.minimap_sprite, layer=LAYER_OVERLAY)
+        self.show_minimap = True
+
+        self.body_sprite = ImageSprite(self.scaled_images['body_fullscreen'])
+        self.body_sprite.visible = 0
+        self.sprites.add(self.body_sprite, layer=LAYER_OVERLAY)
+        self.show_controls()
+        font = self.get_font(20)
+        self.mute_sprite = ImageSprite(self.sound_on_image, self.mute_button.rect.topleft)
+        self.points_sprite = TextSprite(font, "", (SCREEN_WIDTH - 100, 20))
+        self.timer_sprite = TextSprite(font, "", (SCREEN_WIDTH - 100, 50))
+        self.sprites.add(self.mute_sprite, self.points_sprite, self.timer_sprite, layer=LAYER_OVERLAY)
+
+    def _sync_character_sprites(self):
+        """Create sprites for new characters and drop those of removed ones"""
+        for name in list(self.character_sprites):
+            if name not in self.characters:
+                self.character_sprites.pop(name).kill()
+        font = self.get_font(20)
+        for name, character in self.characters.items():
+            if name not in self.character_sprites:
+                sprite = ActorSprite(character.image, self.TILE_SIZE, font, name)
+                self.character_sprites[name] = sprite
+                self.sprites.add(sprite, layer=LAYER_ACTORS)
+                self.sprites.add(sprite.label, layer=LAYER_OVERLAY)
 
     def toggle_mute(self):
         """Toggle audio mute state"""
@@ -230,43 +289,73 @@ class Game:
             if self.mute_button.rect.collidepoint(event.pos):
                 self.toggle_mute()
 
-    def move_player(self, dx, dy):
-        """Move player by delta x and y"""
-        new_x = self.player_x + dx
-        new_y = self.player_y + dy
-        current_map = self.get_current_map()
-        if 0 <= new_x < len(current_map[0]) and 0 <= new_y < len(current_map):
-            if current_map[new_y][new_x] != TILE_TYPES['WALL']:
-                self.player_x, self.player_y = new_x, new_y
-
-    def get_current_map(self):
-        """Get current map based on game state"""
-        if self.current_map == 'outside':
-            return OUTSIDE_MAP
-        elif self.current_map == 'alexs_room':
-            return ALEXS_ROOM
-        return MAIN_MAP
-
-    def check_door_interaction(self):
-        """Check and handle door interactions"""
-        current_map = self.get_current_map()
-        if current_map[self.player_y][self.player_x] == TILE_TYPES['DOOR']:
-            if self.current_map == 'main':
-                if self.player_x == 23 and self.player_y == 5:
-                    self.transition_to_room('alexs_room', ALEXS_ROOM_START_POS)
-                elif self.player_x == 23 and self.player_y == 15:
-                    self.transition_to_room('outside', (7, 15))
-            elif self.current_map == 'alexs_room':
-                self.transition_to_room('main', (23, 4))
-            elif self.current_map == 'outside':
-                self.transition_to_room('main', (23, 14))
-
-    def transition_to_room(self, room_name, position):
-        """Handle room transitions"""
-        self.current_map = room_name
-        self.player_x, self.player_y = position
+    def get_room_array(self, room_name):
+        """Get the map of a room as a 2D array, used to slice the visible tiles"""
+        grid = self.room_arrays.get(room_name)
+        if grid is None:
+            grid = self.get_room_map(room_name)
+            if isinstance(grid, list):
+                grid = np.array(grid, dtype=np.uint8)
+            self.room_arrays[room_name] = grid
+        return grid
+
+    def load_world_room(self, room_name, path, max_resident=None):
+        """
+        Add a room stored as a chunked world file, streamed from disk while it is shown
+
+        Args:
+            room_name (str): Name used for the room
+            path (str): World file written by world.save_world
+            max_resident (int): Chunks kept in memory, the world default if None
+        """
+        if max_resident is None:
+            world = ChunkedWorld(path)
+        else:
+            world = ChunkedWorld(path, max_resident)
+        self.rooms[room_name] = world
+        self.room_arrays[room_name] = world
+        return world
+
+    def unload_world_room(self, room_name):
+        """
+        Remove a room added with load_world_room and close its world file
+
+        Args:
+            room_name (str): Name used when the room was loaded
+        """
+        if room_name == self.current_map:
+            raise ValueError(f"Cannot unload the current room: {room_name}")
+        world = self.rooms.pop(room_name)
+        if self.scene_room == room_name:
+            for _, layer_sprite in self.room_layers[room_name]:
+                self.sprites.remove(layer_sprite)
+            self.scene_room = None
+        for cache in (self.room_arrays, self.room_layers, self.room_origins, self.navigation):
+            cache.pop(room_name, None)
+        self.lighting.forget(room_name)
+        self.minimap.forget(room_name)
+        world.close()
+
+    def on_room_changed(self, room_name):
+        """Play the music of the room the player entered"""
         self.load_room_music(room_name)
 
+    def on_dialogue(self, name, line_id, x, y):
+        """Show the line a character said in a dialogue box"""
+        self.show_dialogue(self.dialogue_text(name, line_id), x, y)
+
+    def on_killer_revealed(self, killer, explanation):
+        """Show the killer reveal card"""
+        self.show_killer_card(killer, explanation)
+
+    def on_round_won(self):
+        """Show the victory card"""
+        self.show_congratulations_card()
+
+    def on_lost(self):
+        """Show the game over card"""
+        self.show_lost_card()
+
     def load_room_music(self, room_name):
         """Load and play room-specific music"""
         try:
@@ -279,24 +368,31 @@ class Game:
                 music_file = "background_music.mp3"
             
             music_path = os.path.join(base_path, "assets", "sounds", music_file)
-            print(f"Loading music: {music_path}")
+            self.logger.debug("Loading music: %s", music_path)
             
             if os.path.exists(music_path):
                 pygame.mixer.music.load(music_path)
                 if not self.muted:
                     pygame.mixer.music.play(-1)
             else:
-                print(f"Music file not found: {music_path}")
+                self.logger.warning("Music file not found: %s", music_path)
                 
         except Exception as e:
-            print(f"Error loading music: {e}")
+            self.logger.error("Error loading music: %s", e)
+
+    def get_font(self, size):
+        """Get the default font at a size, loading it only once"""
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
 
     def draw_text(self, text, size, x, y, color=None):
         """Draw text on screen"""
         if color is None:
             color = WHITE
-        font = pygame.font.Font(None, size)
-        text_surface = font.render(text, True, color)
+        text_surface = self.get_font(size).render(text, True, color)
         text_rect = text_surface.get_rect(center=(x, y))
         self.screen.blit(text_surface, text_rect)
 
@@ -311,22 +407,23 @@ class Game:
             "Presiona ESPACIO para continuar."
         ]
         while context_running:
-            for event in pygame.event.get():
+            for event in self.display.get_events():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
                     self.state = GameState.OUTSIDE
                     context_running = False
-            self.screen.fill(BLACK)
+            self.display.clear(BLACK)
             self.draw_text("El Secreto de la Mansión Oscura", 48, SCREEN_WIDTH/2, 100)
             for i, line in enumerate(context_text):
                 self.draw_text(line, 24, SCREEN_WIDTH/2, 200 + i * 30)
-            pygame.display.flip()
+            self.display.present()
             self.clock.tick(60)
 
     def run(self):
         """Main game loop"""
+        self.start_autosave()
         while True:
             self._handle_game_state()
 
@@ -346,18 +443,35 @@ class Game:
             self.show_lost_card()
             self.reset_game()
 
-    def game_loop(self):
-        """Main gameplay loop"""
-        while self.state in (GameState.PLAYING, GameState.OUTSIDE):
+    def game_loop(self, max_frames=None, frame_rate=60):
+        """
+        Main gameplay loop
+
+        Args:
+            max_frames (int): Frames to run before returning, None to play until the state changes
+            frame_rate (int): Frames per second the loop is held to, 0 for as fast as possible
+
+        Returns:
+            int: Frames run
+        """
+        self.invalidate_screen()
+        frames = 0
+        while self.state in (GameState.PLAYING, GameState.OUTSIDE) and frames != max_frames:
+            frames += 1
+            self.frame_count += 1
+            self.logger.set_frame(self.frame_count, self.current_map)
             self.handle_input()
             self.update_game_state()
+            self.publish_state()
             self.draw_game_screen()
-            pygame.display.flip()
-            self.clock.tick(60)
+            self.display.present(self.dirty_rects)
+            self.clock.tick(frame_rate)
+            self.storm.record_frame_time(self.clock.get_rawtime())
+        return frames
 
     def handle_input(self):
         """Handle user input"""
-        for event in pygame.event.get():
+        for event in self.display.get_events():
             if event.type == QUIT:
                 pygame.quit()
                 sys.exit()
@@ -379,6 +493,8 @@ class Game:
                 self.move_player(1, 0)
             elif event.key == K_e:
                 self.interact()
+            elif event.key == K_m:
+                self.show_minimap = not self.show_minimap
 
     def update_game_state(self):
         """Update game state and check conditions"""
@@ -386,107 +502,157 @@ class Game:
         self.check_body_interaction()
         self._update_characters()
         self._update_timer()
-
-    def _update_characters(self):
-        """Update character movements"""
-        if self.moving_character:
-            self.move_character_gradually(self.moving_character)
-
-    def _update_timer(self):
-        """Update game timer"""
-        if self.timer_active:
-            self.timer -= 1 / 60  # Restar un segundo cada 60 frames
-            if self.timer <= 0:
-                self.timer = 0
-                self.timer_active = False
-                if len(self.clues) == 0:
-                    self.show_lost_card()
-                    self.state = GameState.LOST
+        self._autosave()
+
+    def start_autosave(self, path=None):
+        """
+        Snapshot the game every AUTOSAVE_INTERVAL seconds for crash recovery
+
+        Snapshots are taken on the game thread and written by a background thread.
+
+        Args:
+            path (str): Snapshot file, the autosave in the saves directory if None
+        """
+        if self.snapshot_writer is None:
+            self.snapshot_writer = SnapshotWriter(path or PathManager.get_save_path(AUTOSAVE_FILE_NAME))
+            self.last_autosave_frame = self.frame_count
+
+    def stop_autosave(self):
+        """Write the last pending snapshot and stop autosaving"""
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.close()
+            self.snapshot_writer = None
+
+    def _autosave(self):
+        """Hand a snapshot to the writer when the autosave interval has passed"""
+        if self.snapshot_writer is not None and \
+                self.frame_count - self.last_autosave_frame >= AUTOSAVE_INTERVAL * 60:
+            self.last_autosave_frame = self.frame_count
+            self.snapshot_writer.submit(take_snapshot(self, compress=True))
+
+    def start_streaming(self, port=STREAM_PORT):
+        """
+        Stream the game state to spectators connecting to a local port
+
+        Returns:
+            int: Port listened on
+        """
+        if self.state_publisher is None:
+            self.state_publisher = StatePublisher()
+        return self.state_publisher.listen(port=port)
+
+    def stop_streaming(self):
+        """Disconnect the spectators"""
+        if self.state_publisher is not None:
+            self.logger.info("State stream: %s", self.state_publisher.stats())
+            self.state_publisher.close()
+            self.state_publisher = None
+
+    def start_npc_planner(self):
+        """
+        Plan the NPCs' steps in a worker process, keeping in-process planning if it cannot run
+
+        Returns:
+            bool: True if the worker was started
+        """
+        if self.npcs.planner is not None:
+            return True
+        if (os.cpu_count() or 1) < 2:
+            self.logger.info("NPC planner: one CPU, planning in-process")
+            return False
+        planner = NPCPlanner()
+        if not planner.start(self.npcs):
+            self.logger.warning("NPC planner could not start, planning in-process: %s", planner.error)
+            return False
+        return True
+
+    def stop_npc_planner(self):
+        """Stop the NPC planner process and plan in-process again"""
+        planner = self.npcs.planner
+        if planner is not None:
+            self.logger.info("NPC planner: %s", planner.stats())
+            planner.close()
+
+    def publish_state(self):
+        """Send this frame's changes to the spectators"""
+        if self.state_publisher is not None:
+            self.state_publisher.publish(self.frame_count, capture_state(self))
+
+    def resume_autosave(self, path=None):
+        """
+        Restore the game from the autosave
+
+        Returns:
+            bool: True if a snapshot was found and restored
+        """
+        path = path or PathManager.get_save_path(AUTOSAVE_FILE_NAME)
+        try:
+            restore_snapshot(self, read_snapshot_file(path))
+        except FileNotFoundError:
+            return False
+        except ValueError as e:
+            self.logger.warning("Autosave %s not restored: %s", path, e)
+            return False
+        return True
 
     def draw_game_screen(self):
-        """Draw the main game screen"""
-        self.screen.fill(BLACK)
+        """Draw the main game screen, redrawing only the sprites that changed"""
         self.draw_map()
-        if not self.body_fullscreen:
-            self.draw_characters()
-            self.draw_player()
+        self.draw_characters()
+        self.draw_player()
+        self.draw_darkness()
+        self.draw_weather()
+        self.draw_minimap()
         self.draw_fullscreen_body()
-        self.show_controls()
-        self.draw_mute_button()
+        self.mute_sprite.set_image(self.sound_off_image if self.muted else self.sound_on_image)
         self.draw_ui()
+        self.dirty_rects = self.display.draw_group(self.sprites)
+
+    def invalidate_screen(self):
+        """Redraw the whole gameplay screen on the next frame"""
+        self.sprites.repaint_rect(self.screen.get_rect())
+        self.dirty_rects = None
 
     def draw_ui(self):
-        """Draw UI elements"""
-        self.draw_text(f"Puntos: {self.points}", 20, SCREEN_WIDTH - 100, 20)
-        minutes = int(self.timer // 60)
-        seconds = int(self.timer % 60)
-        self.draw_text(f"Tiempo: {minutes}:{seconds:02d}", 20, SCREEN_WIDTH - 100, 50)
-
-    def interact(self):
-        """Handle player interactions with characters and objects"""
-        for name, data in self.characters.items():
-            if abs(self.player_x - data["x"]) <= 1 and abs(self.player_y - data["y"]) <= 1:
-                dialogue = data["dialogues"][data["dialogue_index"]]
-                self.show_dialogue(f"{name}: {dialogue}", data["x"], data["y"])
-                self.update_solver(dialogue, name)
-                if name not in self.clues:
-                    self.clues.append(name)
-                    self.timer += TIMER_BONUS
-                data["dialogue_index"] = (data["dialogue_index"] + 1) % len(data["dialogues"])
-                self.moving_character = name
-                
-                if len(self.clues) == 3:
-                    self.solve_mystery()
-
-    def solve_mystery(self):
-        """Attempt to solve the mystery"""
-        killer = self.determine_killer()
-        if killer:
-            explanation = f"Basado en las declaraciones, {killer} es el asesino."
-            self.show_killer_card(killer, explanation)
-            self.mystery_solved = True
-            self.points += 1
-            self.clues = []
-            self.setup_solver()
-            if self.first_win:
-                self.timer = REDUCED_TIMER
-                self.first_win = False
-            self.show_congratulations_card()
+        """Update the points and timer labels when their values change"""
+        if self.points != self.shown_points:
+            self.shown_points = self.points
+            self.points_sprite.set_text(f"Puntos: {self.points}")
+        seconds_left = int(self.timer)
+        if seconds_left != self.shown_seconds:
+            self.shown_seconds = seconds_left
+            minutes, seconds = divmod(seconds_left, 60)
+            self.timer_sprite.set_text(f"Tiempo: {minutes}:{seconds:02d}")
 
     def reset_game(self):
         """Reset game to initial state"""
         self.state = GameState.MENU
-        self.timer = INITIAL_TIMER
-        self.timer_active = True
-        self.clues = []
-        self.setup_solver()
-        self.first_win = True
-        self.place_characters_randomly()  # Reubicar personajes al reiniciar
+        self.restart_round()
 
     def main_menu(self):
         """Display and handle main menu"""
         while self.state == GameState.MENU:
-            for event in pygame.event.get():
+            for event in self.display.get_events():
                 if event.type == QUIT:
                     pygame.quit()
                     sys.exit()
                 for button in self.menu_buttons:
                     button.handle_event(event)
                 self.handle_mute_button_event(event)
-            self.screen.fill(BLACK)
+            self.display.clear(BLACK)
             self.draw_text("El Secreto de la Mansión Oscura", 48, SCREEN_WIDTH/2, 100)
             for button in self.menu_buttons:
                 button.draw(self.screen)
             self.draw_mute_button()
             self.draw_text("Created by CodeWithBotina", 20, SCREEN_WIDTH/2, SCREEN_HEIGHT - 30)
-            pygame.display.flip()
+            self.display.present()
             self.clock.tick(60)
 
     def pause_menu(self):
         """Display and handle pause menu"""
         pygame.mixer.music.pause()
         while self.state == GameState.PAUSED:
-            for event in pygame.event.get():
+            for event in self.display.get_events():
                 if event.type == QUIT:
                     pygame.quit()
                     sys.exit()
@@ -495,26 +661,25 @@ class Game:
                     if not self.muted:
                         pygame.mixer.music.unpause()
                 self.handle_mute_button_event(event)
-            self.screen.fill(BLACK)
+            self.display.clear(BLACK)
             self.draw_text("Pausa", 48, SCREEN_WIDTH/2, SCREEN_HEIGHT/2 - 50)
             self.draw_text("Presiona ESC para continuar", 24, SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + 50)
             self.draw_mute_button()
-            pygame.display.flip()
+            self.display.present()
             self.clock.tick(60)
 
     def show_controls_screen(self):
         """Display game controls screen"""
         controls_running = True
         try:
-            arrow_keys_image = self.images['arrow_keys']
-            arrow_keys_image = pygame.transform.scale(arrow_keys_image, (150, 150))
+            arrow_keys_image = self.scaled_images['arrow_keys']
         except (AttributeError, KeyError):
             # Crear una imagen temporal si no está disponible
             arrow_keys_image = pygame.Surface((150, 150))
             arrow_keys_image.fill((255, 0, 0))  # Rojo para indicar imagen faltante
 
         while controls_running:
-            for event in pygame.event.get():
+            for event in self.display.get_events():
                 if event.type == QUIT:
                     pygame.quit()
                     sys.exit()
@@ -528,9 +693,9 @@ class Game:
                         controls_running = False
                         self.state = GameState.MENU
 
-            self.screen.fill(BLACK)
+            self.display.clear(BLACK)
             self.draw_text("Controles del Juego", 48, SCREEN_WIDTH/2, 50)
-            self.screen.blit(arrow_keys_image, (SCREEN_WIDTH/2 - 70, 150))
+            self.display.blit(arrow_keys_image, (SCREEN_WIDTH/2 - 70, 150))
             controls = [
                 "Flechas: Mover al personaje",
                 "E: Interactuar con personajes y objetos",
@@ -542,73 +707,124 @@ class Game:
                 self.draw_text(control, 30, SCREEN_WIDTH/2, 300 + i * 50)
             pygame.draw.rect(self.screen, WHITE, (SCREEN_WIDTH/2 - 100, SCREEN_HEIGHT - 100, 200, 50))
             self.draw_text("Volver al Menú", 30, SCREEN_WIDTH/2, SCREEN_HEIGHT - 75, BLACK)
-            pygame.display.flip()
+            self.display.present()
             self.clock.tick(60)
 
     def draw_map(self):
-        """Draw the current game map"""
-        if self.current_map == 'outside':
-            self.draw_outside_map()
+        """Show the sprite layers of the current room and scroll them with the camera"""
+        room = self.current_map
+        if self.scene_room != room:
+            for _, layer_sprite in self.room_layers.get(self.scene_room, ()):
+                self.sprites.remove(layer_sprite)
+            grid = self.get_room_array(room)
+            self.camera.set_world(grid.shape[1], grid.shape[0])
+            self.camera.follow(self.player_x, self.player_y)
+            if room not in self.room_layers:
+                self.room_layers[room] = self._bake_room_layers()
+            for layer, layer_sprite in self.room_layers[room]:
+                layer_sprite.dirty = 1
+                self.sprites.add(layer_sprite, layer=layer)
+            self.scene_room = room
+            moved = True
         else:
-            self.draw_interior_map()
-
-    def draw_outside_map(self):
-        """Draw the outside area"""
-        outside_image = pygame.transform.scale(self.images['outside'], (self.WIDTH, self.HEIGHT))
-        self.screen.blit(outside_image, (0, 0))
-        for y, row in enumerate(self.outside_map):
-            for x, tile in enumerate(row):
-                pos = (x * self.TILE_SIZE, y * self.TILE_SIZE)
-                if tile == TILE_TYPES['WALL']:
-                    self.screen.blit(pygame.transform.scale(self.images['wall'], 
-                                (self.TILE_SIZE, self.TILE_SIZE)), pos)
-                elif tile == TILE_TYPES['DOOR']:
-                    self.screen.blit(pygame.transform.scale(self.images['door'], 
-                                (self.TILE_SIZE, self.TILE_SIZE)), pos)
-
-    def draw_interior_map(self):
-        """Draw interior maps (main map and Alex's room)"""
-        floor_image = self.images['dark_floor'] if self.current_map == 'alexs_room' else self.images['floor']
-        current_map = self.alexs_room if self.current_map == 'alexs_room' else self.map
-        floor_scaled = pygame.transform.scale(floor_image, (self.WIDTH, self.HEIGHT))
-        self.screen.blit(floor_scaled, (0, 0))
-        for y, row in enumerate(current_map):
-            for x, tile in enumerate(row):
-                pos = (x * self.TILE_SIZE, y * self.TILE_SIZE)
-                self.draw_tile(tile, pos, x, y)
-
-    def draw_tile(self, tile, pos, x, y):
-        """Draw individual map tiles"""
+            moved = self.camera.follow(self.player_x, self.player_y)
+        if self.room_origins[room] != self.camera.origin:
+            self._scroll_room_layers(room)
+        grid = self.room_arrays[room]
+        if moved and isinstance(grid, ChunkedWorld):
+            # Load the chunks around the view before the camera gets there
+            grid.prefetch(*self.camera.visible_slices(margin=grid.chunk_size))
+
+    def _bake_room_layers(self):
+        """Render the floor and the visible blood and furniture tiles of the current room"""
+        screen_size = (self.WIDTH, self.HEIGHT)
+        floor_key = {'outside': 'outside', 'alexs_room': 'dark_floor'}.get(self.current_map, 'floor')
+        layers = {
+            LAYER_FLOOR: self.display.prepare_image(self.scaled_images[floor_key], alpha=False),
+            LAYER_BLOOD: self.display.prepare_image(pygame.Surface(screen_size, SRCALPHA)),
+            LAYER_FURNITURE: self.display.prepare_image(pygame.Surface(screen_size, SRCALPHA))
+        }
+        if self.current_map != 'alexs_room':
+            # Only Alex's room shows blood tiles
+            del layers[LAYER_BLOOD]
+        self.draw_room_area(layers, self.get_room_array(self.current_map), layers[LAYER_FURNITURE].get_rect())
+        self.room_origins[self.current_map] = self.camera.origin
+        return [(layer, ImageSprite(surface)) for layer, surface in layers.items()]
+
+    def _scroll_room_layers(self, room):
+        """Scroll the baked tile layers to the camera, drawing only the tiles that came into view"""
+        old_x, old_y = self.room_origins[room]
+        dx, dy = self.camera.x - old_x, self.camera.y - old_y
+        view = pygame.Rect(0, 0, self.WIDTH, self.HEIGHT)
+        size = self.TILE_SIZE
+        if abs(dx) >= self.camera.columns or abs(dy) >= self.camera.rows:
+            exposed = [view]
+        else:
+            exposed = []
+            if dx:
+                exposed.append(pygame.Rect(view.width - dx * size if dx > 0 else 0, 0, abs(dx) * size, view.height))
+            if dy:
+                exposed.append(pygame.Rect(0, view.height - dy * size if dy > 0 else 0, view.width, abs(dy) * size))
+
+        layers = {layer: sprite.image for layer, sprite in self.room_layers[room] if layer != LAYER_FLOOR}
+        for surface in layers.values():
+            surface.scroll(-dx * size, -dy * size)
+        grid = self.get_room_array(room)
+        for area in exposed:
+            self.draw_room_area(layers, grid, area)
+        for layer, sprite in self.room_layers[room]:
+            if layer != LAYER_FLOOR:
+                self.display.invalidate_image(sprite.image)
+                sprite.dirty = 1
+        self.room_origins[room] = self.camera.origin
+
+    def draw_room_area(self, layers, grid, area):
+        """
+        Draw the tiles under an area of the view onto the tile layers
+
+        Args:
+            layers (dict): Layer surfaces by layer id; LAYER_FLOOR is left untouched
+            grid (ndarray): Room tiles
+            area (Rect): Area of the view to redraw, in pixels
+        """
+        tile_layers = [surface for layer, surface in layers.items() if layer != LAYER_FLOOR]
+        for surface in tile_layers:
+            surface.set_clip(area)
+            surface.fill((0, 0, 0, 0), area)
+        # One extra tile around the area catches the blood pool bigger than its tile
+        rows, columns = self.camera.visible_slices(area, margin=1)
+        visible = grid[rows, columns]
+        for y, x in zip(*np.nonzero(visible)):
+            tile_x, tile_y = columns.start + int(x), rows.start + int(y)
+            self.draw_tile(layers, int(visible[y, x]), self.camera.to_screen(tile_x, tile_y), tile_x, tile_y)
+        for surface in tile_layers:
+            surface.set_clip(None)
+
+    def draw_tile(self, layers, tile, pos, x, y):
+        """Draw individual map tiles onto the room layers"""
+        furniture_layer = layers[LAYER_FURNITURE]
         if tile == TILE_TYPES['BLOOD'] and self.current_map == 'alexs_room':
-            blood_image = pygame.transform.scale(self.images['blood'], 
-                        (self.TILE_SIZE, self.TILE_SIZE))
-            self.screen.blit(blood_image, pos)
+            layers[LAYER_BLOOD].blit(self.scaled_images['blood_tile'], pos)
             
         if tile == TILE_TYPES['WALL']:
-            self.screen.blit(pygame.transform.scale(self.images['wall'], 
-                        (self.TILE_SIZE, self.TILE_SIZE)), pos)
+            furniture_layer.blit(self.scaled_images['wall'], pos)
         elif tile == TILE_TYPES['DOOR']:
-            self.screen.blit(pygame.transform.scale(self.images['door'], 
-                        (self.TILE_SIZE, self.TILE_SIZE)), pos)
+            furniture_layer.blit(self.scaled_images['door'], pos)
         elif tile == TILE_TYPES['BODY']:
-            self.draw_body_and_blood(x, y)
+            self.draw_body_and_blood(furniture_layer, pos)
         elif tile in [TILE_TYPES['TABLE'], TILE_TYPES['CHAIR'], 
                      TILE_TYPES['BOOKSHELF'], TILE_TYPES['WARDROBE'], 
                      TILE_TYPES['PLANT']]:
-            self.draw_furniture(tile, pos)
+            self.draw_furniture(furniture_layer, tile, pos)
 
-    def draw_body_and_blood(self, x, y):
+    def draw_body_and_blood(self, surface, pos):
         """Draw body and blood effects"""
-        blood_image = pygame.transform.scale(self.images['blood'], 
-                    (self.TILE_SIZE * 3, self.TILE_SIZE * 3))
-        self.screen.blit(blood_image, (x * self.TILE_SIZE - self.TILE_SIZE, 
-                    y * self.TILE_SIZE - self.TILE_SIZE))
-        body_image = pygame.transform.scale(self.images['body'], 
-                    (self.TILE_SIZE * 2, self.TILE_SIZE * 2))
-        self.screen.blit(body_image, (x * self.TILE_SIZE - self.TILE_SIZE // 2, 
-                    y * self.TILE_SIZE - self.TILE_SIZE // 2))
-
-    def draw_furniture(self, tile, pos):
+        surface.blit(self.scaled_images['blood'], (pos[0] - self.TILE_SIZE, 
+                    pos[1] - self.TILE_SIZE))
+        surface.blit(self.scaled_images['body'], (pos[0] - self.TILE_SIZE // 2, 
+                    pos[1] - self.TILE_SIZE // 2))
+
+    def draw_furniture(self, surface, tile, pos):
         """Draw furniture tiles"""
         furniture_types = {
             TILE_TYPES['TABLE']: 'table',
@@ -619,57 +835,99 @@ class Game:
         }
         if tile in furniture_types:
             image_key = furniture_types[tile]
-            self.screen.blit(pygame.transform.scale(self.images[image_key], 
-                        (self.TILE_SIZE, self.TILE_SIZE)), pos)
+            surface.blit(self.scaled_images[image_key], pos)
 
     def draw_characters(self):
-        """Draw game characters"""
-        if self.current_map == 'main':
-            for name, data in self.characters.items():
-                pos = (data["x"] * self.TILE_SIZE, data["y"] * self.TILE_SIZE)
-                self.screen.blit(pygame.transform.scale(data["image"], 
-                            (self.TILE_SIZE, self.TILE_SIZE)), pos)
-                self.draw_text(name, 20, 
-                            data["x"] * self.TILE_SIZE + self.TILE_SIZE / 2,
-                            data["y"] * self.TILE_SIZE - 15)
+        """Move character sprites to the characters' positions"""
+        if self.character_sprites.keys() != self.characters.keys():
+            self._sync_character_sprites()
+        in_room = self.current_map == NPC_ROOM and not self.body.fullscreen
+        sprites = self.character_sprites
+        camera = self.camera
+        for name, x, y in self.npcs.positions():
+            sprite = sprites[name]
+            visible = in_room and camera.is_visible(x, y)
+            sprite.show(visible)
+            if visible:
+                sprite.place(*camera.to_view(x, y))
 
     def draw_player(self):
-        """Draw the player character"""
-        pos = (self.player_x * self.TILE_SIZE, self.player_y * self.TILE_SIZE)
-        self.screen.blit(pygame.transform.scale(self.images['player'], 
-                       (self.TILE_SIZE, self.TILE_SIZE)), pos)
+        """Move the player sprite to the player position"""
+        self.player_sprite.show(not self.body.fullscreen)
+        self.player_sprite.place(*self.camera.to_view(self.player_x, self.player_y))
+
+    def draw_darkness(self):
+        """Cover the dark rooms, lit around the player, redrawing the darkness only when the player moves"""
+        room = self.current_map
+        dark = room in DARK_ROOMS and self.lighting.radius > 0
+        self.darkness_sprite.show(dark)
+        if not dark:
+            return
+        changed = self.lighting.update(room, self.get_room_array(room), self.player_x, self.player_y, self.camera)
+        if changed is not None:
+            self.display.invalidate_image(self.darkness_sprite.image)
+            self.sprites.repaint_rect(changed)
+
+    def draw_weather(self):
+        """Draw the rain outside and the lightning flashes"""
+        if self.storm.update(self.current_map in RAIN_ROOMS):
+            self.weather_sprite.show(self.storm.shown)
+            self.display.invalidate_image(self.weather_sprite.image)
+            self.weather_sprite.dirty = 1
+
+    def draw_minimap(self):
+        """Show the minimap of the current room, repainting only the dots that moved"""
+        shown = self.show_minimap and not self.body.fullscreen
+        self.minimap_sprite.show(shown)
+        if not shown:
+            return
+        minimap = self.minimap
+        room = self.current_map
+        if minimap.set_room(room, self.get_room_array(room)):
+            width, height = minimap.surface.get_size()
+            self.minimap_sprite.set_image(minimap.surface)
+            self.minimap_sprite.move_to(self.WIDTH - width - MINIMAP_MARGIN, self.HEIGHT - height - MINIMAP_MARGIN)
+        npcs = None
+        if room == NPC_ROOM:
+            npcs = (self.npcs.x[:self.npcs.count], self.npcs.y[:self.npcs.count])
+        changed = minimap.update((self.player_x, self.player_y), npcs)
+        if changed:
+            self.display.invalidate_image(minimap.surface)
+            left, top = self.minimap_sprite.rect.topleft
+            for rect in changed:
+                self.sprites.repaint_rect(rect.move(left, top))
 
     def check_body_interaction(self):
         """Handle body interaction and fullscreen effect"""
-        if self.current_map == 'alexs_room':
-            distance_x = abs(self.player_x - self.body_position[0])
-            distance_y = abs(self.player_y - self.body_position[1])
-            
-            if distance_x <= 1 and distance_y <= 1:
-                self.body_fullscreen = True
-                self.body_fullscreen_timer = pygame.time.get_ticks()
+        body = self.body
+        if self.current_map == body.room:
+            if self.player.is_near(body.x, body.y):
+                body.fullscreen = True
+                body.fullscreen_since = pygame.time.get_ticks()
             else:
-                self.body_fullscreen = False
+                body.fullscreen = False
 
     def draw_fullscreen_body(self):
-        """Draw fullscreen body effect"""
-        if self.body_fullscreen and self.current_map == 'alexs_room':
-            body_image = pygame.transform.scale(self.images['body'], (self.WIDTH, self.HEIGHT))
-            self.screen.blit(body_image, (0, 0))
+        """Show or hide the fullscreen body effect"""
+        body = self.body
+        show_body = body.fullscreen and self.current_map == body.room
+        self.body_sprite.show(show_body)
+        if show_body:
             current_time = pygame.time.get_ticks()
-            if current_time - self.body_fullscreen_timer >= self.body_fullscreen_duration * 1000:
-                self.body_fullscreen = False
+            if current_time - body.fullscreen_since >= body.fullscreen_duration * 1000:
+                body.fullscreen = False
 
     def show_killer_card(self, killer, explanation):
         """Show the killer reveal card"""
         card_running = True
+        self.overlay = (OVERLAY_KILLER, explanation)
         card_width = 400
         card_height = 300
         card_x = self.WIDTH / 2 - card_width / 2
         card_y = self.HEIGHT / 2 - card_height / 2
         
         while card_running:
-            for event in pygame.event.get():
+            for event in self.display.get_events():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
@@ -684,19 +942,23 @@ class Game:
             self.draw_text(explanation, 24, card_x + card_width/2, card_y + 150, BLACK)
             self.draw_text("Presiona ESPACIO para continuar", 20, card_x + card_width/2, card_y + 250, BLACK)
             
-            pygame.display.flip()
+            self.display.present()
+            self.publish_state()
             self.clock.tick(60)
+        self.overlay = NO_OVERLAY
+        self.invalidate_screen()
 
     def show_lost_card(self):
         """Show game over card"""
         card_running = True
+        self.overlay = (OVERLAY_LOST, "")
         card_width = 400
         card_height = 300
         card_x = self.WIDTH / 2 - card_width / 2
         card_y = self.HEIGHT / 2 - card_height / 2
         
         while card_running:
-            for event in pygame.event.get():
+            for event in self.display.get_events():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
@@ -710,21 +972,11 @@ class Game:
             self.draw_text("Se acabó el tiempo", 28, card_x + card_width/2, card_y + 100, BLACK)
             self.draw_text("Presiona ESPACIO para volver al menú", 20, card_x + card_width/2, card_y + 250, BLACK)
             
-            pygame.display.flip()
+            self.display.present()
+            self.publish_state()
             self.clock.tick(60)
-
-    def setup_solver(self):
-        """Initialize the logical solver"""
-        self.solver = Solver()
-        self.C, self.J, self.R = Bools('Carla Juan Rodys')
-        self._setup_base_constraints()
-
-    def _setup_base_constraints(self):
-        """Setup initial solver constraints"""
-        self.solver.add(Or(self.C, self.J, self.R))
-        self.solver.add(Not(And(self.C, self.J)))
-        self.solver.add(Not(And(self.C, self.R)))
-        self.solver.add(Not(And(self.J, self.R)))
+        self.overlay = NO_OVERLAY
+        self.invalidate_screen()
 
     def load_resources(self):
         """Load game resources"""
@@ -732,8 +984,9 @@ class Game:
             self._load_images()
             self._load_sounds()
         except Exception as e:
-            print(f"Error loading resources: {e}")
+            self.logger.error("Error loading resources: %s", e)
             self._create_temporary_resources()
+        self._build_asset_cache()
 
     def _load_images(self):
         """Load game images"""
@@ -758,8 +1011,6 @@ class Game:
             'outside': pygame.image.load(os.path.join(assets_path, "images", "outside.png")),
             'arrow_keys': pygame.image.load(os.path.join(assets_path, "images", "arrow_keys.png"))
         }
-        for name in self.characters:
-            self.characters[name]["image"] = self.images[name.lower()]
 
     def _load_sounds(self):
         """Load game sounds"""
@@ -785,72 +1036,92 @@ class Game:
                    'blood', 'body', 'dark_floor', 'table', 'chair', 'bookshelf',
                    'wardrobe', 'plant', 'outside', 'arrow_keys']:
             self.images[key] = temp_surface.copy()
-        for name in self.characters:
-            self.characters[name]["image"] = self.images[name.lower()]
+
+    def _build_asset_cache(self):
+        """
+        Scale every image to its drawing size once
+        
+        Sizes only depend on the logical resolution and TILE_SIZE, so the
+        cache is independent of the real window size.
+        """
+        tile_size = (self.TILE_SIZE, self.TILE_SIZE)
+        screen_size = (self.WIDTH, self.HEIGHT)
+        backgrounds = ('floor', 'dark_floor', 'outside')
+        scaled_sizes = {
+            'floor': screen_size,
+            'dark_floor': screen_size,
+            'outside': screen_size,
+            'blood': (self.TILE_SIZE * 3, self.TILE_SIZE * 3),
+            'body': (self.TILE_SIZE * 2, self.TILE_SIZE * 2),
+            'arrow_keys': (150, 150)
+        }
+        self.scaled_images = {}
+        for key, image in self.images.items():
+            scaled = pygame.transform.scale(image, scaled_sizes.get(key, tile_size))
+            self.scaled_images[key] = self.display.prepare_image(scaled, alpha=key not in backgrounds)
+        self.scaled_images['blood_tile'] = self.display.prepare_image(
+            pygame.transform.scale(self.images['blood'], tile_size))
+        self.scaled_images['body_fullscreen'] = self.display.prepare_image(
+            pygame.transform.scale(self.images['body'], screen_size))
+        for name, character in self.characters.items():
+            character.image = self.scaled_images[name.lower()]
 
     def show_dialogue(self, text, character_x, character_y):
         """Show character dialogue"""
         dialogue_running = True
-        font = pygame.font.Font(None, DIALOGUE_FONT_SIZE)
-        
-        lines = []
-        words = text.split()
-        current_line = ""
-        
-        # Word wrap
-        for word in words:
-            test_line = f"{current_line} {word}".strip()
-            if font.size(test_line)[0] <= DIALOGUE_LINE_WIDTH:
-                current_line = test_line
-            else:
-                lines.append(current_line)
-                current_line = word
-        lines.append(current_line)
-        
-        # Calculate dialogue box dimensions and position
-        dialogue_height = len(lines) * 30 + 20
-        dialogue_width = DIALOGUE_LINE_WIDTH + 20
-        dialogue_x = character_x * TILE_SIZE - dialogue_width / 2 + TILE_SIZE / 2
-        dialogue_y = character_y * TILE_SIZE - dialogue_height - 20
-        
-        # Adjust position to keep dialogue on screen
-        dialogue_x = max(10, min(dialogue_x, SCREEN_WIDTH - dialogue_width - 10))
-        dialogue_y = max(10, min(dialogue_y, SCREEN_HEIGHT - dialogue_height - 10))
+        self.overlay = (OVERLAY_DIALOGUE, text)
+        image, pos = self.layout_dialogue(text, character_x, character_y)
         
         while dialogue_running:
-            for event in pygame.event.get():
+            for event in self.display.get_events():
                 if event.type == QUIT:
                     pygame.quit()
                     sys.exit()
                 if event.type == KEYDOWN and event.key == K_SPACE:
                     dialogue_running = False
             
-            # Draw dialogue box
-            self.draw_game_screen()
-            pygame.draw.rect(self.screen, WHITE, (dialogue_x, dialogue_y, dialogue_width, dialogue_height))
-            pygame.draw.rect(self.screen, BLACK, (dialogue_x, dialogue_y, dialogue_width, dialogue_height), 2)
-            
-            # Draw text
-            for i, line in enumerate(lines):
-                text_surface = font.render(line, True, BLACK)
-                text_rect = text_surface.get_rect(
-                    center=(dialogue_x + dialogue_width/2, dialogue_y + 20 + i * 30)
-                )
-                self.screen.blit(text_surface, text_rect)
-            
-            pygame.display.flip()
+            self.draw_dialogue(image, pos)
+            self.display.present()
+            self.publish_state()
             self.clock.tick(60)
+        self.overlay = NO_OVERLAY
+        self.invalidate_screen()
+
+    def layout_dialogue(self, text, character_x, character_y):
+        """
+        Get the rendered dialogue box and place it next to the character
+        
+        Returns:
+            tuple: (image, pos), the box and its top-left corner
+        """
+        image = self.dialogue_layout.image(text)
+        dialogue_width, dialogue_height = image.get_size()
+        screen_x, screen_y = self.camera.to_screen(character_x, character_y)
+        dialogue_x = screen_x - dialogue_width / 2 + TILE_SIZE / 2
+        dialogue_y = screen_y - dialogue_height - 20
+        
+        # Adjust position to keep dialogue on screen
+        dialogue_x = max(10, min(dialogue_x, SCREEN_WIDTH - dialogue_width - 10))
+        dialogue_y = max(10, min(dialogue_y, SCREEN_HEIGHT - dialogue_height - 10))
+        
+        return image, (dialogue_x, dialogue_y)
+
+    def draw_dialogue(self, image, pos):
+        """Draw the game screen with the dialogue box on top"""
+        self.draw_game_screen()
+        self.screen.blit(image, pos)
 
     def show_congratulations_card(self):
         """Show victory card"""
         card_running = True
+        self.overlay = (OVERLAY_WON, "")
         card_width = 400
         card_height = 300
         card_x = SCREEN_WIDTH / 2 - card_width / 2
         card_y = SCREEN_HEIGHT / 2 - card_height / 2
         
         while card_running:
-            for event in pygame.event.get():
+            for event in self.display.get_events():
                 if event.type == QUIT:
                     pygame.quit()
                     sys.exit()
@@ -864,115 +1135,23 @@ class Game:
             self.draw_text("Has resuelto el misterio", 28, card_x + card_width/2, card_y + 100, BLACK)
             self.draw_text("Presiona ESPACIO para continuar", 20, card_x + card_width/2, card_y + 250, BLACK)
             
-            pygame.display.flip()
+            self.display.present()
+            self.publish_state()
             self.clock.tick(60)
-
-    def move_character_gradually(self, character_name):
-        """Move character gradually across the map"""
-        character = self.characters[character_name]
-        current_x, current_y = character["x"], character["y"]
-        
-        if character_name not in self.character_directions:
-            valid_directions = self.get_valid_directions(current_x, current_y)
-            if valid_directions:
-                self.character_directions[character_name] = random.choice(valid_directions)
-                self.character_steps[character_name] = 0
-                self.character_step_limits[character_name] = random.randint(5, 70)
-                self.character_last_positions[character_name] = (current_x, current_y)
-            else:
-                return
-        
-        dx, dy = self.character_directions[character_name]
-        new_x = current_x + dx * self.move_speed
-        new_y = current_y + dy * self.move_speed
-        
-        if self.is_position_valid(new_x, new_y):
-            character["x"], character["y"] = new_x, new_y
-            self.character_steps[character_name] += 1
-            if self.character_steps[character_name] >= self.character_step_limits[character_name]:
-                self._reset_character_movement(character_name)
-        else:
-            self._handle_invalid_movement(character_name, current_x, current_y)
-
-    def _handle_invalid_movement(self, character_name, current_x, current_y):
-        """Handle invalid character movement"""
-        valid_directions = self.get_valid_directions(current_x, current_y)
-        if valid_directions:
-            self.character_directions[character_name] = random.choice(valid_directions)
-            self.character_steps[character_name] = 0
-            self.character_step_limits[character_name] = random.randint(5, 70)
-            self.character_last_positions[character_name] = (current_x, current_y)
-        else:
-            self._reset_character_movement(character_name)
-
-    def _reset_character_movement(self, character_name):
-        """Reset character movement parameters"""
-        self.character_directions.pop(character_name, None)
-        self.character_steps.pop(character_name, None)
-        self.character_step_limits.pop(character_name, None)
-        self.character_last_positions.pop(character_name, None)
-        self.moving_character = None
-
-    def get_valid_directions(self, x, y):
-        """Get valid movement directions for a character"""
-        directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
-        valid_directions = []
-        for dx, dy in directions:
-            new_x, new_y = x + dx, y + dy
-            if self.is_position_valid(new_x, new_y):
-                valid_directions.append((dx, dy))
-        return valid_directions
-
-    def is_position_valid(self, x, y):
-        """Check if a position is valid for a character to move to"""
-        current_map = self.get_current_map()
-        # Convertir coordenadas flotantes a enteros
-        x = int(x)
-        y = int(y)
-        if 0 <= x < len(current_map[0]) and 0 <= y < len(current_map):
-            if current_map[y][x] != TILE_TYPES['WALL']:
-                return True
-        return False
-
-    def update_solver(self, statement, character):
-        """Update solver with new statements"""
-        if character == "Carla":
-            if statement == "Estaba en mi habitación toda la noche.":
-                self.solver.add(Implies(Not(self.C), Not(self.J)))
-            elif statement == "No vi a nadie en el pasillo.":
-                self.solver.add(Implies(Not(self.C), Not(self.J)))
-        elif character == "Juan":
-            if statement == "Vi a Carla en el pasillo.":
-                self.solver.add(Implies(Not(self.J), Not(self.C)))
-            elif statement == "Rodys estaba en la sala.":
-                self.solver.add(Implies(Not(self.J), Not(self.R)))
-        elif character == "Rodys":
-            if statement == "La tormenta deshabilitó las cámaras.":
-                self.solver.add(Implies(Not(self.R), Not(self.J)))
-            elif statement == "No vi a nadie sospechoso.":
-                self.solver.add(Implies(Not(self.R), Not(self.J)))
-
-    def determine_killer(self):
-        """Determine the killer based on gathered clues"""
-        if self.solver.check() == sat:
-            model = self.solver.model()
-            if model[self.C]:
-                return "Carla"
-            elif model[self.J]:
-                return "Juan"
-            elif model[self.R]:
-                return "Rodys"
-        return None
+        self.overlay = NO_OVERLAY
+        self.invalidate_screen()
 
     def show_controls(self):
-        """Show controls on screen"""
+        """Add the controls help to the gameplay overlay"""
         controls = [
             "Flechas: Mover",
             "E: Interactuar",
+            "M: Mapa",
             "ESC: Pausar/Menú",
             "ESPACIO: Continuar"
         ]
         
         y_offset = 20
+        font = self.get_font(20)
         for i, control in enumerate(controls):
-            self.draw_text(control, 20, 100, y_offset + i * 25)
+            self.sprites.add(TextSprite(font, control, (100, y_offset + i * 25)), layer=LAYER_OVERLAY)
@@ -13,12 +13,38 @@ RED = (255, 0, 0)
 
 # Game settings
 TILE_SIZE = 32
+MOVE_SPEED = 0.1  # Tiles a character walks per frame
 BUTTON_WIDTH = 200
 BUTTON_HEIGHT = 40
 DIALOGUE_FONT_SIZE = 24
 DIALOGUE_LINE_WIDTH = 250
+RENDER_QUALITY = 'smooth'  # 'scaled', 'smooth' or 'fast' window scaling
+RENDER_BACKEND = 'software'  # 'software' or 'texture' (pygame._sdl2 GPU renderer)
+NPC_ROOM = 'main'  # Room where the suspects walk around
+DEDUCTION_BACKEND = 'bitset'  # 'bitset' or 'z3' engine deducing the killer
+LANGUAGE = 'es'  # Text table in assets/data/text
+DARK_ROOMS = ('main', 'alexs_room')  # Rooms lit only by the player's light
+LIGHT_RADIUS = 6  # Tiles lit around the player in the dark rooms
+DARKNESS_ALPHA = 230  # Opacity of the unlit areas (0-255)
+LIGHT_CACHE_SIZE = 4096  # (room, tile) visibility results kept
+RAIN_ROOMS = ('outside',)  # Rooms where the storm's rain is shown
+MAX_RAIN_DROPS = 3000  # Raindrops drawn when frames have time to spare
+MIN_RAIN_DROPS = 200  # Raindrops kept on the slowest machines
+RAIN_FRAME_BUDGET_MS = 10  # Frame work time above which the rain thins out
+LIGHTNING_CHANCE = 1 / 400  # Chance of a lightning flash each frame
+MINIMAP_SIZE = (150, 100)  # Largest width and height of the minimap in pixels
+MINIMAP_MARGIN = 10  # Pixels between the minimap and the bottom-right corner
 
 # Game timing
 INITIAL_TIMER = 180  # 3 minutes
 REDUCED_TIMER = 90   # 1.5 minutes
 TIMER_BONUS = 60     # 1 minute bonus for clues
+AUTOSAVE_INTERVAL = 5  # Seconds between crash-recovery snapshots
+AUTOSAVE_FILE_NAME = "autosave.snap"
+
+# Server mode
+SERVER_TICK_RATE = 60  # Frames per second of every hosted session
+SESSION_IDLE_TIMEOUT = 30  # Seconds without commands before a session is parked
+SESSION_MAX_EVENTS = 32  # Events kept for a client that has not read them yet
+STREAM_PORT = 8766  # Local port spectators connect to
+NPC_PLANNER_CAPACITY = 1024  # NPC steps planned per batch by the planner process
@@ -82,3 +82,8 @@ TILE_TYPES = {
     'PLANT': 8,
     'BLOOD': 9
 }
+
+# Cells NPCs walk between, besides the doors of each room
+PATROL_WAYPOINTS = {
+    'main': [(5, 3), (19, 3), (12, 1), (5, 10), (19, 13), (12, 9)],
+}
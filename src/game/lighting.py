@@ -0,0 +1,203 @@
+"""
+Darkness and the player's light
+
+The dark rooms are covered by a darkness layer with a hole lit around the
+player. Walls block the light: the tiles the player can see are found with
+recursive shadowcasting over the part of the room within the light radius.
+Rooms don't change, so the result is cached per (room, tile) and walking
+back onto a tile is a dictionary lookup.
+
+The darkness image is built with NumPy: the visible tiles are scaled up to
+pixels, combined with a radial falloff computed once, and written to the
+alpha channel of the surface through pygame.surfarray in one assignment.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from .game_constants import DARKNESS_ALPHA, LIGHT_CACHE_SIZE, LIGHT_RADIUS
+from .game_maps import TILE_TYPES
+
+# (xx, xy, yx, yy) de cada octante: convierte (columna, fila) del octante en (dx, dy)
+OCTANTS = ((1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+           (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1))
+
+
+def shadowcast(opaque, x, y, radius):
+    """
+    Find the cells visible from a cell with recursive shadowcasting
+
+    Args:
+        opaque (list): Rows of booleans, True where light is blocked
+        x (int): Column of the viewer
+        y (int): Row of the viewer
+        radius (int): Sight radius in cells
+
+    Returns:
+        ndarray: Boolean array of the same shape as opaque
+    """
+    height, width = len(opaque), len(opaque[0])
+    visible = bytearray(width * height)
+    visible[y * width + x] = 1
+    for octant in OCTANTS:
+        _cast_light(opaque, visible, width, height, x, y, radius, 1, 1.0, 0.0, octant)
+    return np.frombuffer(visible, dtype=np.uint8).reshape(height, width).astype(bool)
+
+
+def _cast_light(opaque, visible, width, height, x, y, radius, row, start, end, octant):
+    """Light the rows of one octant between two slopes, recursing around walls"""
+    if start < end:
+        return
+    xx, xy, yx, yy = octant
+    radius_squared = radius * radius
+    new_start = start
+    for distance in range(row, radius + 1):
+        blocked = False
+        dy = -distance
+        for dx in range(-distance, 1):
+            left_slope = (dx - 0.5) / (dy + 0.5)
+            right_slope = (dx + 0.5) / (dy - 0.5)
+            if start < right_slope:
+                continue
+            if end > left_slope:
+                break
+            cell_x = x + dx * xx + dy * xy
+            cell_y = y + dx * yx + dy * yy
+            inside = 0 <= cell_x < width and 0 <= cell_y < height
+            if inside and dx * dx + dy * dy <= radius_squared:
+                visible[cell_y * width + cell_x] = 1
+            wall = not inside or opaque[cell_y][cell_x]
+            if blocked:
+                if wall:
+                    new_start = right_slope
+                    continue
+                blocked = False
+                start = new_start
+            elif wall and distance < radius:
+                # La pared corta el cono: seguir por encima de ella y después por detrás
+                blocked = True
+                _cast_light(opaque, visible, width, height, x, y, radius,
+                            distance + 1, start, left_slope, octant)
+                new_start = right_slope
+        if blocked:
+            break
+
+
+class Lighting:
+    def __init__(self, surface, tile_size, radius=LIGHT_RADIUS, darkness=DARKNESS_ALPHA,
+                 cache_size=LIGHT_CACHE_SIZE):
+        """
+        Initialize lighting
+
+        Args:
+            surface (Surface): Per-pixel alpha surface covering the view, drawn over the room
+            tile_size (int): Size of a tile in pixels
+            radius (int): Tiles lit around the player
+            darkness (int): Alpha of the unlit areas
+            cache_size (int): (room, tile) visibility results kept
+        """
+        self.surface = surface
+        self.tile_size = tile_size
+        self.radius = radius
+        self.darkness = darkness
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.shown = None
+        self.lit_area = pygame.Rect(0, 0, 0, 0)
+        self.hits = 0
+        self.misses = 0
+        surface.fill((0, 0, 0, darkness))
+
+        # Oscuridad de cada píxel de la ventana iluminada, más clara cerca del jugador
+        side = (2 * radius + 1) * tile_size
+        center = side / 2
+        offsets = (np.arange(side) + 0.5 - center) / (radius * tile_size + tile_size / 2)
+        distance_squared = offsets[:, None] ** 2 + offsets[None, :] ** 2
+        light = np.clip(1 - distance_squared, 0, 1)
+        self.falloff = np.rint(darkness * (1 - light)).astype(np.uint8)
+
+    def visibility(self, room, grid, x, y):
+        """
+        Get the tiles lit from a tile, from the cache when possible
+
+        Args:
+            room (str): Room name, part of the cache key
+            grid (ndarray): Room tiles (array or ChunkedWorld)
+            x (int): Player column
+            y (int): Player row
+
+        Returns:
+            tuple: (visible, x0, y0), the boolean window of the room within
+                the radius and the room tile of its top-left corner
+        """
+        key = (room, x, y)
+        result = self.cache.get(key)
+        if result is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return result
+        self.misses += 1
+        height, width = grid.shape
+        if not (0 <= x < width and 0 <= y < height):
+            # Fuera de la sala no se ve nada
+            result = (np.zeros((0, 0), dtype=bool), x, y)
+        else:
+            x0, y0 = max(0, x - self.radius), max(0, y - self.radius)
+            x1, y1 = min(width, x + self.radius + 1), min(height, y + self.radius + 1)
+            opaque = (np.asarray(grid[y0:y1, x0:x1]) == TILE_TYPES['WALL']).tolist()
+            result = (shadowcast(opaque, x - x0, y - y0, self.radius), x0, y0)
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    def forget(self, room):
+        """Drop the cached results of a room, for rooms that are unloaded or change"""
+        for key in [key for key in self.cache if key[0] == room]:
+            del self.cache[key]
+        if self.shown is not None and self.shown[0] == room:
+            self.shown = None
+
+    def update(self, room, grid, x, y, camera):
+        """
+        Redraw the darkness for the player on a tile
+
+        Only the lit window of the previous tile and the one of the new tile
+        are written, so the rest of the surface keeps its darkness.
+
+        Args:
+            room (str): Current room
+            grid (ndarray): Room tiles
+            x (int): Player column
+            y (int): Player row
+            camera (Camera): Camera of the view
+
+        Returns:
+            Rect: Area of the view that changed, None if nothing did
+        """
+        x, y = int(x), int(y)
+        key = (room, x, y, camera.origin)
+        if key == self.shown:
+            return None
+        self.shown = key
+        visible, x0, y0 = self.visibility(room, grid, x, y)
+        size = self.tile_size
+        lit = visible.repeat(size, axis=0).repeat(size, axis=1)
+        # Recortar la caída de luz si la ventana toca el borde de la sala
+        fx, fy = (x0 - (x - self.radius)) * size, (y0 - (y - self.radius)) * size
+        window = np.where(lit, self.falloff[fy:fy + lit.shape[0], fx:fx + lit.shape[1]], self.darkness)
+
+        left, top = camera.to_screen(x0, y0)
+        area = pygame.Rect(left, top, window.shape[1], window.shape[0]).clip(self.surface.get_rect())
+        # surfarray indexa (x, y)
+        alpha = pygame.surfarray.pixels_alpha(self.surface)
+        old = self.lit_area
+        alpha[old.left:old.right, old.top:old.bottom] = self.darkness
+        alpha[area.left:area.right, area.top:area.bottom] = \
+            window[area.top - top:area.bottom - top, area.left - left:area.right - left].T
+        del alpha
+        self.lit_area = area
+        if not old.width:
+            return area
+        return old.union(area) if area.width else old
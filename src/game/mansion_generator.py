@@ -0,0 +1,270 @@
+"""
+Procedural mansion generator
+
+Mansions are generated from a seed with the same tile ids as the hand-made
+maps (TILE_TYPES). The layout is split into rooms by walls with openings,
+furniture is placed with vectorized constraint masks (along walls, never
+next to openings or doors) and a body with its blood pool is added to one
+room. A single flood fill from the first door checks that every door and
+NPC spawn can be reached; layouts that fail are rejected.
+
+Batches of seeds are generated in a process pool and accepted mansions are
+cached on disk, one .npz file per seed.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .game_maps import TILE_TYPES
+from .navigation import NavigationGrid, UNREACHABLE
+from ..utils.path_manager import PathManager
+
+GENERATOR_VERSION = 1
+DEFAULT_WIDTH = 48
+DEFAULT_HEIGHT = 32
+MIN_ROOM_SIZE = 4
+FURNITURE_DENSITY = 0.35
+BLOOD_DENSITY = 0.4
+SPAWN_COUNT = 3
+
+EMPTY = TILE_TYPES['EMPTY']
+WALL = TILE_TYPES['WALL']
+DOOR = TILE_TYPES['DOOR']
+FURNITURE_TILES = np.array([TILE_TYPES['TABLE'], TILE_TYPES['CHAIR'], TILE_TYPES['BOOKSHELF'],
+                            TILE_TYPES['WARDROBE'], TILE_TYPES['PLANT']], dtype=np.uint8)
+
+
+class Mansion:
+    """Generated layout with its NPC spawns and body position"""
+
+    __slots__ = ('seed', 'tiles', 'doors', 'spawns', 'body')
+
+    def __init__(self, seed, tiles, doors, spawns, body):
+        """
+        Initialize mansion
+
+        Args:
+            seed (int): Seed it was generated from
+            tiles (ndarray): Tile ids, shape (height, width)
+            doors (list): (x, y) door tiles
+            spawns (list): (x, y) NPC spawn tiles
+            body (tuple): (x, y) tile of the body
+        """
+        self.seed = seed
+        self.tiles = tiles
+        self.doors = doors
+        self.spawns = spawns
+        self.body = body
+
+
+def _sides(mask):
+    """Masks shifted so each cell sees its (up, down, left, right) neighbour"""
+    padded = np.pad(mask, 1)
+    return padded[:-2, 1:-1], padded[2:, 1:-1], padded[1:-1, :-2], padded[1:-1, 2:]
+
+
+def _neighbours(mask):
+    """Cells with any of their four neighbours set"""
+    up, down, left, right = _sides(mask)
+    return up | down | left | right
+
+
+def _dilate(mask):
+    """Grow a mask by one cell in every direction, diagonals included"""
+    padded = np.pad(mask, 1)
+    height, width = mask.shape
+    grown = np.zeros_like(mask)
+    for dy in range(3):
+        for dx in range(3):
+            grown |= padded[dy:dy + height, dx:dx + width]
+    return grown
+
+
+def _split_rooms(tiles, rng):
+    """Split the interior into rooms with walls, leaving an opening in each wall"""
+    height, width = tiles.shape
+    areas = [(1, 1, width - 1, height - 1)]
+    while areas:
+        x0, y0, x1, y1 = areas.pop()
+        room_w, room_h = x1 - x0, y1 - y0
+        can_split_x = room_w >= 2 * MIN_ROOM_SIZE + 1
+        can_split_y = room_h >= 2 * MIN_ROOM_SIZE + 1
+        if not (can_split_x or can_split_y):
+            continue
+        vertical = can_split_x and (not can_split_y or room_w >= room_h)
+        if vertical:
+            wall = int(rng.integers(x0 + MIN_ROOM_SIZE, x1 - MIN_ROOM_SIZE))
+            tiles[y0:y1, wall] = WALL
+            gap = int(rng.integers(y0, y1 - 2))
+            tiles[gap:gap + int(rng.integers(1, 4)), wall] = EMPTY
+            areas += [(x0, y0, wall, y1), (wall + 1, y0, x1, y1)]
+        else:
+            wall = int(rng.integers(y0 + MIN_ROOM_SIZE, y1 - MIN_ROOM_SIZE))
+            tiles[wall, x0:x1] = WALL
+            gap = int(rng.integers(x0, x1 - 2))
+            tiles[wall, gap:gap + int(rng.integers(1, 4))] = EMPTY
+            areas += [(x0, y0, x1, wall), (x0, wall + 1, x1, y1)]
+
+
+def _choose_cells(rng, mask, count):
+    """Pick distinct (x, y) cells of a mask at random"""
+    ys, xs = np.nonzero(mask)
+    if len(ys) < count:
+        return []
+    picks = rng.choice(len(ys), size=count, replace=False)
+    return [(int(xs[i]), int(ys[i])) for i in picks]
+
+
+def generate_mansion(seed, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, spawn_count=SPAWN_COUNT):
+    """
+    Generate a mansion from a seed
+
+    Args:
+        seed (int): Random seed; the same seed always gives the same mansion
+        width (int): Width in tiles
+        height (int): Height in tiles
+        spawn_count (int): NPC spawn tiles to place
+
+    Returns:
+        Mansion: The mansion, or None if the layout failed validation
+    """
+    rng = np.random.default_rng(seed)
+    tiles = np.zeros((height, width), dtype=np.uint8)
+    tiles[[0, -1], :] = WALL
+    tiles[:, [0, -1]] = WALL
+    _split_rooms(tiles, rng)
+
+    # Doors next to the east wall, like in the hand-made maps
+    door_cells = np.zeros(tiles.shape, dtype=bool)
+    door_cells[1:-1, width - 2] = tiles[1:-1, width - 2] == EMPTY
+    doors = _choose_cells(rng, door_cells, 2)
+    if not doors:
+        return None
+    for x, y in doors:
+        tiles[y, x] = DOOR
+
+    # Keep openings, corridors and doors clear
+    floor = tiles == EMPTY
+    walls = tiles == WALL
+    up, down, left, right = _sides(walls)
+    passage = floor & ((up & down) | (left & right))
+    blocked = _dilate(passage | (tiles == DOOR))
+    along_walls = floor & _neighbours(walls) & ~blocked
+
+    # Checkerboard parity keeps furniture pieces from touching each other
+    ys, xs = np.indices(tiles.shape)
+    furniture = along_walls & ((xs + ys) % 2 == 0) & (rng.random(tiles.shape) < FURNITURE_DENSITY)
+    tiles[furniture] = rng.choice(FURNITURE_TILES, size=int(np.count_nonzero(furniture)))
+
+    # Body in open floor with a pool of blood around it
+    open_floor = (tiles == EMPTY) & ~_neighbours(tiles != EMPTY) & ~blocked
+    body_cells = _choose_cells(rng, open_floor, 1)
+    if not body_cells:
+        return None
+    body = body_cells[0]
+    tiles[body[1], body[0]] = TILE_TYPES['BODY']
+    pool = ((np.abs(xs - body[0]) <= 2) & (np.abs(ys - body[1]) <= 2) & (tiles == EMPTY) &
+            (rng.random(tiles.shape) < BLOOD_DENSITY))
+    tiles[pool] = TILE_TYPES['BLOOD']
+
+    spawns = _choose_cells(rng, (tiles == EMPTY) & ~blocked, spawn_count)
+    if len(spawns) < spawn_count:
+        return None
+
+    mansion = Mansion(seed, tiles, doors, spawns, body)
+    return mansion if is_connected(mansion) else None
+
+
+def is_connected(mansion):
+    """Check with one flood fill from the first door that every door and spawn is reachable"""
+    navigation = NavigationGrid(mansion.tiles.tolist())
+    field = np.frombuffer(navigation.distance_field(mansion.doors[0]), dtype=np.intc)
+    cells = np.array([y * navigation.width + x for x, y in mansion.doors + mansion.spawns + [mansion.body]])
+    return bool((field[cells] != UNREACHABLE).all())
+
+
+def cache_path(seed, width, height, cache_dir=None):
+    """Path of the cached file of a seed"""
+    if cache_dir is None:
+        cache_dir = PathManager.get_cache_path("mansions")
+    return os.path.join(cache_dir, f"v{GENERATOR_VERSION}_{width}x{height}_{seed}.npz")
+
+
+def save_mansion(mansion, path):
+    """Write an accepted mansion to disk, atomically so other workers never read half a file"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as mansion_file:
+        np.savez(mansion_file, seed=mansion.seed, tiles=mansion.tiles, doors=np.array(mansion.doors),
+                 spawns=np.array(mansion.spawns), body=np.array(mansion.body))
+    os.replace(temp_path, path)
+
+
+def load_mansion(path):
+    """Read a mansion written by save_mansion"""
+    with np.load(path) as data:
+        return Mansion(int(data["seed"]), data["tiles"],
+                       [tuple(map(int, cell)) for cell in data["doors"]],
+                       [tuple(map(int, cell)) for cell in data["spawns"]],
+                       tuple(map(int, data["body"])))
+
+
+def _generate_cached(args):
+    """Worker: load a seed from the cache or generate and cache it"""
+    seed, width, height, cache_dir = args
+    path = cache_path(seed, width, height, cache_dir)
+    if os.path.exists(path):
+        return load_mansion(path)
+    mansion = generate_mansion(seed, width, height)
+    if mansion is not None:
+        save_mansion(mansion, path)
+    return mansion
+
+
+def generate_batch(seeds, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, workers=None, cache_dir=None):
+    """
+    Generate many mansions in parallel, reusing cached ones
+
+    Args:
+        seeds (iterable): Seeds to generate
+        width (int): Width in tiles
+        height (int): Height in tiles
+        workers (int): Worker processes, one per CPU if None; 0 generates in this process
+        cache_dir (str): Directory of cached mansions, the game cache if None
+
+    Returns:
+        dict: Accepted mansions by seed
+    """
+    if cache_dir is None:
+        cache_dir = PathManager.get_cache_path("mansions")
+    jobs = [(seed, width, height, cache_dir) for seed in seeds]
+    if workers == 0:
+        results = map(_generate_cached, jobs)
+        return {mansion.seed: mansion for mansion in results if mansion is not None}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        results = pool.map(_generate_cached, jobs, chunksize=chunksize)
+        return {mansion.seed: mansion for mansion in results if mansion is not None}
+
+
+def main(argv=None):
+    """Pre-generate a range of seeds into the cache"""
+    parser = argparse.ArgumentParser(description="Pre-generate mansions into the cache")
+    parser.add_argument("--count", type=int, default=1000, help="number of seeds to try")
+    parser.add_argument("--start", type=int, default=0, help="first seed")
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH)
+    parser.add_argument("--height", type=int, default=DEFAULT_HEIGHT)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    mansions = generate_batch(range(args.start, args.start + args.count), args.width, args.height, args.workers)
+    elapsed = time.perf_counter() - start_time
+    print(f"{len(mansions)}/{args.count} mansions accepted in {elapsed:.1f} s "
+          f"({args.count / elapsed * 60:.0f} candidates per minute)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Procedural mystery generator
+
+A scenario is a set of suspects, the statements they make and the killer.
+Candidates are drawn from a seed: innocent suspects make true claims and the
+killer makes any claim. A candidate is accepted when its statements leave
+exactly one consistent killer.
+
+Each worker keeps one SolverSession: every distinct statement is added to
+its solver once, guarded by its own Bool literal, and a candidate is checked
+by passing the guards of its statements as assumptions, so the solver and
+what it learnt are reused across candidates.
+Candidates are checked in parallel worker processes, and the accepted ones
+are written to a JSON bank the game loads at startup.
+"""
+import argparse
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from .solver_session import SolverSession
+from .statements import CLAIM_ALIBI, CLAIM_EITHER, CLAIM_GUILTY, CLAIM_INNOCENT, Statement
+from ..utils.path_manager import PathManager
+
+BANK_VERSION = 1
+BANK_FILE_NAME = "scenarios.json"
+DEFAULT_SUSPECTS = ("Carla", "Juan", "Rodys")
+BATCH_SIZE = 64
+
+_worker_validator = None
+
+
+class Scenario:
+    """Validated mystery: suspects, their statements and the only possible killer"""
+
+    __slots__ = ('suspects', 'statements', 'killer')
+
+    def __init__(self, suspects, statements, killer):
+        """
+        Initialize scenario
+
+        Args:
+            suspects (list): Suspect names
+            statements (list): Statement objects, in the order they are told
+            killer (str): The only suspect consistent with the statements
+        """
+        self.suspects = list(suspects)
+        self.statements = list(statements)
+        self.killer = killer
+
+    def testimony(self, suspect):
+        """Statements made by one suspect"""
+        return [statement for statement in self.statements if statement.speaker == suspect]
+
+    def to_dict(self):
+        """Scenario as JSON-friendly data"""
+        return {"suspects": self.suspects, "killer": self.killer,
+                "statements": [statement.to_dict() for statement in self.statements]}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a scenario from to_dict data"""
+        return cls(data["suspects"], [Statement.from_dict(item) for item in data["statements"]],
+                   data["killer"])
+
+
+# Original hand-written mystery, used when no bank is available
+DEFAULT_SCENARIO = Scenario(DEFAULT_SUSPECTS, [
+    Statement("Carla", CLAIM_INNOCENT, "Juan", text="Estaba en mi habitación toda la noche."),
+    Statement("Juan", CLAIM_INNOCENT, "Carla", text="Vi a Carla en el pasillo."),
+    Statement("Rodys", CLAIM_INNOCENT, "Juan", text="La tormenta deshabilitó las cámaras."),
+], "Rodys")
+
+
+class ScenarioValidator(SolverSession):
+    """Solver session reused to check one candidate after another"""
+
+    def possible_killers(self, statements):
+        """Suspects who can be the killer given the statements"""
+        self.reset()
+        for statement in statements:
+            self.add(statement)
+        return self.possible_suspects()
+
+    def unique_killer(self, statements):
+        """The killer if exactly one suspect is consistent with the statements, else None"""
+        possible = self.possible_killers(statements)
+        return possible[0] if len(possible) == 1 else None
+
+
+def random_statement(rng, speaker, suspects, killer):
+    """
+    Draw a statement by a speaker about the other suspects
+
+    Innocent speakers only make true claims; the killer says anything.
+    """
+    others = [name for name in suspects if name != speaker]
+    while True:
+        claim = rng.choice((CLAIM_INNOCENT, CLAIM_GUILTY, CLAIM_EITHER, CLAIM_ALIBI))
+        if claim in (CLAIM_EITHER, CLAIM_ALIBI):
+            if len(others) < 2:
+                continue
+            a, b = rng.sample(others, 2)
+        else:
+            a, b = rng.choice(others), None
+        statement = Statement(speaker, claim, a, b)
+        if speaker == killer or statement.is_true(killer):
+            return statement
+
+
+def generate_candidate(seed, suspects=DEFAULT_SUSPECTS, statements_per_suspect=1):
+    """Draw the killer and the statements of a candidate scenario from a seed"""
+    rng = random.Random(seed)
+    killer = rng.choice(suspects)
+    statements = [random_statement(rng, speaker, suspects, killer)
+                  for speaker in suspects for _ in range(statements_per_suspect)]
+    return statements, killer
+
+
+def _init_worker(suspects):
+    """Create the solver each worker process reuses for all its candidates"""
+    global _worker_validator
+    _worker_validator = ScenarioValidator(suspects)
+
+
+def _validate_seeds(args):
+    """Worker: generate and validate a batch of seeds"""
+    seeds, suspects, statements_per_suspect = args
+    accepted = []
+    for seed in seeds:
+        statements, _ = generate_candidate(seed, suspects, statements_per_suspect)
+        killer = _worker_validator.unique_killer(statements)
+        if killer is not None:
+            accepted.append(Scenario(suspects, statements, killer))
+    return accepted
+
+
+def generate_bank(count, suspects=DEFAULT_SUSPECTS, statements_per_suspect=1, seed=0,
+                  workers=None, max_candidates=None):
+    """
+    Generate distinct validated scenarios
+
+    Args:
+        count (int): Scenarios wanted
+        suspects (tuple): Suspect names
+        statements_per_suspect (int): Statements each suspect makes
+        seed (int): First candidate seed
+        workers (int): Worker processes, one per CPU if None; 0 validates in this process
+        max_candidates (int): Candidates tried before giving up, 1000 per scenario if None
+
+    Returns:
+        list: Scenarios, possibly fewer than count if candidates ran out
+    """
+    suspects = tuple(suspects)
+    if max_candidates is None:
+        max_candidates = count * 1000
+    batches = [(range(start, min(start + BATCH_SIZE, seed + max_candidates)), suspects, statements_per_suspect)
+               for start in range(seed, seed + max_candidates, BATCH_SIZE)]
+    bank = []
+    seen = set()
+
+    def collect(results):
+        for batch in results:
+            for scenario in batch:
+                key = frozenset(statement.key for statement in scenario.statements)
+                if key not in seen:
+                    seen.add(key)
+                    bank.append(scenario)
+                    if len(bank) == count:
+                        return True
+        return False
+
+    if workers == 0:
+        _init_worker(suspects)
+        collect(map(_validate_seeds, batches))
+        return bank
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(suspects,)) as pool:
+        results = pool.map(_validate_seeds, batches)
+        if collect(results):
+            pool.shutdown(cancel_futures=True)
+    return bank
+
+
+def get_bank_path():
+    """Path of the scenario bank shipped with the game"""
+    return PathManager.get_data_path(BANK_FILE_NAME)
+
+
+def save_bank(scenarios, path=None):
+    """Write scenarios to a JSON bank"""
+    path = path or get_bank_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as bank_file:
+        json.dump({"version": BANK_VERSION, "scenarios": [scenario.to_dict() for scenario in scenarios]},
+                  bank_file, ensure_ascii=False, indent=1)
+        bank_file.write("\n")
+
+
+def load_bank(path=None):
+    """Read the scenarios of a JSON bank"""
+    with open(path or get_bank_path(), encoding="utf-8") as bank_file:
+        data = json.load(bank_file)
+    if data.get("version") != BANK_VERSION:
+        raise ValueError(f"Unsupported scenario bank version: {data.get('version')}")
+    return [Scenario.from_dict(item) for item in data["scenarios"]]
+
+
+def main(argv=None):
+    """Generate the scenario bank"""
+    parser = argparse.ArgumentParser(description="Generate the bank of validated mystery scenarios")
+    parser.add_argument("--count", type=int, default=100, help="scenarios to generate")
+    parser.add_argument("--suspects", nargs="+", default=list(DEFAULT_SUSPECTS))
+    parser.add_argument("--statements", type=int, default=1, help="statements per suspect")
+    parser.add_argument("--seed", type=int, default=0, help="first candidate seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--output", default=None, help=f"bank file (default: assets/data/{BANK_FILE_NAME})")
+    args = parser.parse_args(argv)
+
+    bank = generate_bank(args.count, args.suspects, args.statements, args.seed, args.workers)
+    save_bank(bank, args.output)
+    print(f"{len(bank)} scenarios written")
+
+
+if __name__ == "__main__":
+    main()
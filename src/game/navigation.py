@@ -0,0 +1,192 @@
+"""
+Navigation data for NPC movement
+
+A NavigationGrid holds the walkable cells of one room and caches BFS
+distance fields towards points of interest (doors, patrol waypoints, the
+player). Fields are flat arrays indexed by ``y * width + x``, so following
+a field towards its target costs O(1) per step.
+"""
+from array import array
+from collections import deque
+
+from .game_maps import TILE_TYPES
+
+UNREACHABLE = -1
+MAX_CACHED_FIELDS = 64
+
+# Order in which neighbours are tried when several are equally close
+DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+
+class NavigationGrid:
+    def __init__(self, grid, blocking_tiles=(TILE_TYPES['WALL'],), waypoints=()):
+        """
+        Initialize navigation grid
+
+        Args:
+            grid (list): Room tile rows, as in game_maps
+            blocking_tiles (tuple): Tile types characters cannot walk on
+            waypoints (iterable): Patrol waypoints as (x, y) cells
+        """
+        self.height = len(grid)
+        self.width = len(grid[0])
+        self.walkable = bytearray(
+            0 if tile in blocking_tiles else 1 for row in grid for tile in row
+        )
+        self.doors = [(x, y) for y, row in enumerate(grid)
+                      for x, tile in enumerate(row) if tile == TILE_TYPES['DOOR']]
+        self.waypoints = [cell for cell in waypoints if self.is_walkable(*cell)]
+        self.fields = {}
+        # Bumped whenever obstacles change, so copies of fields can be refreshed
+        self.version = 0
+
+    @property
+    def points_of_interest(self):
+        """Doors and patrol waypoints of the room"""
+        return self.doors + self.waypoints
+
+    def is_walkable(self, x, y):
+        """Check if a cell is inside the room and walkable"""
+        return 0 <= x < self.width and 0 <= y < self.height and self.walkable[y * self.width + x] == 1
+
+    def distance_field(self, target):
+        """
+        Get the distance field towards a target cell, computing it on first use
+
+        Args:
+            target (tuple): (x, y) cell
+
+        Returns:
+            array: Steps to the target for every cell, UNREACHABLE if none
+        """
+        field = self.fields.get(target)
+        if field is None:
+            if len(self.fields) >= MAX_CACHED_FIELDS:
+                # Drop the oldest field; doors and waypoints are recomputed cheaply
+                del self.fields[next(iter(self.fields))]
+            field = self._compute_field(target)
+            self.fields[target] = field
+        return field
+
+    def _compute_field(self, target):
+        """Breadth-first search from the target over walkable cells"""
+        width = self.width
+        walkable = self.walkable
+        field = array('i', [UNREACHABLE]) * (width * self.height)
+        if not self.is_walkable(*target):
+            return field
+        start = target[1] * width + target[0]
+        field[start] = 0
+        queue = deque([start])
+        self._spread(field, queue)
+        return field
+
+    def _spread(self, field, queue):
+        """Relax distances outwards from the queued cells"""
+        width = self.width
+        size = len(field)
+        walkable = self.walkable
+        while queue:
+            index = queue.popleft()
+            next_distance = field[index] + 1
+            x = index % width
+            for neighbour in (index - width, index + width,
+                              index - 1 if x > 0 else -1,
+                              index + 1 if x < width - 1 else -1):
+                if 0 <= neighbour < size and walkable[neighbour]:
+                    current = field[neighbour]
+                    if current == UNREACHABLE or current > next_distance:
+                        field[neighbour] = next_distance
+                        queue.append(neighbour)
+
+    def _neighbours(self, index):
+        """Indices of the walkable cells next to a cell"""
+        x = index % self.width
+        for neighbour in (index - self.width, index + self.width,
+                          index - 1 if x > 0 else -1,
+                          index + 1 if x < self.width - 1 else -1):
+            if 0 <= neighbour < len(self.walkable) and self.walkable[neighbour]:
+                yield neighbour
+
+    def _only_predecessor(self, field, index):
+        """Check if a neighbour reaches the target only through a cell
+
+        Any other cell whose shortest path used the cell goes through such a
+        neighbour, so if there is none no distance changes.
+        """
+        distance = field[index]
+        for neighbour in self._neighbours(index):
+            if field[neighbour] != distance + 1:
+                continue
+            if not any(field[other] == distance for other in self._neighbours(neighbour)
+                       if other != index):
+                return True
+        return False
+
+    def distance(self, x, y, target):
+        """Steps from a cell to a target, UNREACHABLE if there is no path"""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return UNREACHABLE
+        return self.distance_field(target)[y * self.width + x]
+
+    def next_step(self, x, y, target):
+        """
+        Direction of the first step from a cell towards a target
+
+        Returns:
+            tuple: (dx, dy), or None if the cell is the target or cannot reach it
+        """
+        field = self.distance_field(target)
+        width = self.width
+        here = field[y * width + x] if 0 <= x < width and 0 <= y < self.height else UNREACHABLE
+        if here == 0:
+            return None
+        best = None
+        best_distance = here
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < self.height:
+                distance = field[ny * width + nx]
+                if distance != UNREACHABLE and (best_distance == UNREACHABLE or distance < best_distance):
+                    best = (dx, dy)
+                    best_distance = distance
+        return best
+
+    def set_blocked(self, x, y, blocked):
+        """
+        Change an obstacle and update the cached fields
+
+        Opening a cell relaxes every field incrementally from that cell.
+        Closing one drops only the fields in which some neighbour's shortest
+        path has to go through it; they are recomputed the next time they
+        are needed. In the other fields only the closed cell changes.
+        """
+        index = y * self.width + x
+        if self.walkable[index] == (0 if blocked else 1):
+            return
+        self.walkable[index] = 0 if blocked else 1
+        self.version += 1
+
+        if blocked:
+            for target in list(self.fields):
+                field = self.fields[target]
+                if field[index] == UNREACHABLE:
+                    continue
+                if target == (x, y) or self._only_predecessor(field, index):
+                    del self.fields[target]
+                else:
+                    field[index] = UNREACHABLE
+            return
+
+        for target, field in self.fields.items():
+            if target == (x, y):
+                field[index] = 0
+            else:
+                distances = [field[ny * self.width + nx] for nx, ny in
+                             ((x + dx, y + dy) for dx, dy in DIRECTIONS)
+                             if 0 <= nx < self.width and 0 <= ny < self.height
+                             and field[ny * self.width + nx] != UNREACHABLE]
+                if not distances:
+                    continue
+                field[index] = min(distances) + 1
+            self._spread(field, deque([index]))
@@ -0,0 +1,334 @@
+"""
+NPC planning in a worker process
+
+NPCSystem only decides where an NPC goes when it stands on a tile, and it
+always knows which tile that will be: the one the NPC is walking to.
+NPCPlanner uses that to plan one tile ahead in another process. When an
+NPC starts walking to a tile, its destination, goal and errands left are
+written to a shared memory block; the worker runs the same
+NPCSystem._plan on its own copy of the room and writes back the step to
+take from there. When the NPC arrives, the main loop applies the answer
+and only interpolates.
+
+An answer is dropped when it no longer applies: the NPCs were placed,
+activated or removed since (NPCSystem.epoch changed), an obstacle changed,
+or the goal was the player and the player left the room. NPCs without a
+usable answer are planned in-process as before, and so is every NPC if the
+worker cannot be started or stops answering.
+"""
+import atexit
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .game_constants import NPC_PLANNER_CAPACITY
+from .game_maps import TILE_TYPES
+from .navigation import NavigationGrid
+from .npc_system import PLAYER_GOAL, NPCSystem
+
+# Header of the shared block: requests in the batch and the player tile (-1 if away)
+HEADER_FIELDS = 3
+REQUEST_DTYPE = np.dtype([('x', np.int16), ('y', np.int16), ('goal', np.int32), ('limit', np.int32)])
+RESULT_DTYPE = np.dtype([('dx', np.int8), ('dy', np.int8), ('active', np.bool_),
+                         ('goal', np.int32), ('limit', np.int32)])
+NO_CELL = -1
+
+
+def _views(buffer, capacity):
+    """Header, request and result arrays laid out on a shared buffer"""
+    header = np.ndarray(HEADER_FIELDS, dtype=np.int64, buffer=buffer)
+    offset = header.nbytes
+    requests = np.ndarray(capacity, dtype=REQUEST_DTYPE, buffer=buffer, offset=offset)
+    offset += requests.nbytes
+    results = np.ndarray(capacity, dtype=RESULT_DTYPE, buffer=buffer, offset=offset)
+    return header, requests, results
+
+
+def _block_size(capacity):
+    return HEADER_FIELDS * 8 + capacity * (REQUEST_DTYPE.itemsize + RESULT_DTYPE.itemsize)
+
+
+def _room_rows(navigation):
+    """Tile rows with the same walls and doors as a navigation grid"""
+    rows = [[TILE_TYPES['EMPTY'] if navigation.walkable[y * navigation.width + x] else TILE_TYPES['WALL']
+             for x in range(navigation.width)] for y in range(navigation.height)]
+    for x, y in navigation.doors:
+        rows[y][x] = TILE_TYPES['DOOR']
+    return rows
+
+
+def _worker(connection, memory_name, rows, waypoints, move_speed, capacity, seed):
+    """
+    Worker process: plan each batch of requests until told to stop
+
+    Messages from the game are a batch number (answered with the same
+    number once the results are written), the walkable cells as bytes when
+    obstacles changed, or None to stop.
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        header, requests, results = _views(memory.buf, capacity)
+        navigation = NavigationGrid(rows, waypoints=waypoints)
+        npcs = NPCSystem(navigation, move_speed, capacity=capacity, seed=seed)
+        while True:
+            message = connection.recv()
+            if message is None:
+                break
+            if isinstance(message, bytes):
+                changed = np.flatnonzero(np.frombuffer(message, dtype=np.uint8) != npcs.walkable)
+                for index in changed.tolist():
+                    navigation.set_blocked(index % navigation.width, index // navigation.width,
+                                           message[index] == 0)
+                continue
+            count = int(header[0])
+            npcs.set_player(None if header[1] < 0 else (header[1], header[2]))
+            batch = requests[:count]
+            npcs.x[:count] = batch['x']
+            npcs.y[:count] = batch['y']
+            npcs.goals[:count] = batch['goal']
+            npcs.limits[:count] = batch['limit']
+            npcs.active[:count] = True
+            npcs._plan(np.arange(count))
+            answer = results[:count]
+            answer['dx'] = npcs.dx[:count]
+            answer['dy'] = npcs.dy[:count]
+            answer['active'] = npcs.active[:count]
+            answer['goal'] = npcs.goals[:count]
+            answer['limit'] = npcs.limits[:count]
+            # Liberar las vistas antes de cerrar el bloque compartido
+            del batch, answer
+            connection.send(message)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        del header, requests, results
+        memory.close()
+
+
+class NPCPlanner:
+    def __init__(self, capacity=NPC_PLANNER_CAPACITY):
+        """
+        Initialize planner, without starting the worker
+
+        Args:
+            capacity (int): Requests per batch; NPCs beyond it are planned in-process
+        """
+        self.capacity = capacity
+        self.npcs = None
+        self.process = None
+        self.connection = None
+        self.memory = None
+        self.alive = False
+        self.error = None
+        self.batch = 0
+        self.in_flight = None
+        self.walkable_version = None
+        self.remote = 0
+        self.local = 0
+        self.dropped = 0
+        self._allocate(0)
+
+    def _allocate(self, capacity):
+        """Per-slot answers waiting for their NPC to arrive, keeping the current ones"""
+        old = getattr(self, 'ready', None)
+        arrays = {
+            'pending': np.zeros(capacity, dtype=bool),
+            'queued': np.zeros(capacity, dtype=REQUEST_DTYPE),
+            'ready': np.zeros(capacity, dtype=bool),
+            'cells': np.full(capacity, NO_CELL, dtype=np.int64),
+            'epochs': np.zeros(capacity, dtype=np.int64),
+            'versions': np.zeros(capacity, dtype=np.int64),
+            'answers': np.zeros(capacity, dtype=RESULT_DTYPE),
+        }
+        for name, array in arrays.items():
+            if old is not None:
+                array[:len(old)] = getattr(self, name)
+            setattr(self, name, array)
+
+    def start(self, npcs):
+        """
+        Start the worker and plan the NPCs of a system with it
+
+        Args:
+            npcs (NPCSystem): System whose NPCs are planned
+
+        Returns:
+            bool: False if the worker could not be started; npcs keeps planning in-process
+        """
+        navigation = npcs.navigation
+        try:
+            self.memory = shared_memory.SharedMemory(create=True, size=_block_size(self.capacity))
+            self.header, self.requests, self.results = _views(self.memory.buf, self.capacity)
+            # spawn también funciona en Windows y no copia el estado de pygame
+            context = multiprocessing.get_context('spawn')
+            self.connection, child = context.Pipe()
+            self.process = context.Process(
+                target=_worker, name="npc-planner", daemon=True,
+                args=(child, self.memory.name, _room_rows(navigation), navigation.waypoints,
+                      npcs.move_speed, self.capacity, int(npcs.rng.integers(1 << 32))))
+            self.process.start()
+            child.close()
+        except (OSError, ValueError) as error:
+            self.error = error
+            self.close()
+            return False
+        self.alive = True
+        self.walkable_version = navigation.version
+        self._allocate(npcs.capacity)
+        self.npcs = npcs
+        npcs.planner = self
+        atexit.register(self.close)
+        return True
+
+    def plan(self, npcs, index):
+        """
+        Apply the answers for NPCs that arrived on a tile
+
+        Args:
+            npcs (NPCSystem): System being updated
+            index (ndarray): Slots of the active NPCs standing on a tile
+
+        Returns:
+            ndarray: Slots without a usable answer, to be planned in-process
+        """
+        self._receive()
+        if len(self.ready) < npcs.capacity:
+            self._allocate(npcs.capacity)
+        cells = (np.rint(npcs.y[index]) * npcs.width + np.rint(npcs.x[index])).astype(np.int64)
+        answers = self.answers[index]
+        usable = (self.ready[index] & (self.cells[index] == cells) & (self.epochs[index] == npcs.epoch) &
+                  (self.versions[index] == npcs.navigation.version))
+        if npcs.player is None:
+            usable &= answers['goal'] != PLAYER_GOAL
+        self.dropped += int(np.count_nonzero(self.ready[index] & ~usable))
+        self.ready[index] = False
+        planned = index[usable]
+        if len(planned):
+            answers = answers[usable]
+            npcs.dx[planned] = answers['dx']
+            npcs.dy[planned] = answers['dy']
+            npcs.active[planned] = answers['active']
+            npcs.goals[planned] = answers['goal']
+            npcs.limits[planned] = answers['limit']
+            self.remote += len(planned)
+        rest = index[~usable]
+        self.local += len(rest)
+        return rest
+
+    def request(self, npcs, index):
+        """
+        Ask for the next step of NPCs that started walking to a tile
+
+        Args:
+            npcs (NPCSystem): System being updated
+            index (ndarray): Slots that were just planned
+        """
+        if not self.alive:
+            return
+        index = index[npcs.active[index] & ((npcs.dx[index] != 0) | (npcs.dy[index] != 0))]
+        if len(index):
+            # La casilla a la que van, donde la respuesta se usará
+            queued = self.queued[index]
+            queued['x'] = np.rint(npcs.x[index]) + npcs.dx[index]
+            queued['y'] = np.rint(npcs.y[index]) + npcs.dy[index]
+            queued['goal'] = npcs.goals[index]
+            queued['limit'] = npcs.limits[index]
+            self.queued[index] = queued
+            self.pending[index] = True
+        if self.in_flight is None:
+            self._send(npcs)
+
+    def _send(self, npcs):
+        """Write the pending requests to the shared block and wake the worker"""
+        slots = np.flatnonzero(self.pending)[:self.capacity]
+        if len(slots) == 0:
+            return
+        self.pending[slots] = False
+        requests = self.requests[:len(slots)]
+        requests[:] = self.queued[slots]
+        self.header[0] = len(slots)
+        self.header[1:3] = npcs.player if npcs.player is not None else (-1, -1)
+        self.in_flight = (slots, requests['y'].astype(np.int64) * npcs.width + requests['x'],
+                          npcs.epoch, npcs.navigation.version)
+        self.batch += 1
+        try:
+            if npcs.navigation.version != self.walkable_version:
+                self.connection.send(bytes(npcs.navigation.walkable))
+                self.walkable_version = npcs.navigation.version
+            self.connection.send(self.batch)
+        except OSError:
+            self._fail()
+
+    def _receive(self):
+        """Store the answer of the batch in flight, if it has arrived"""
+        if self.in_flight is None:
+            return
+        try:
+            if not self.connection.poll():
+                if not self.process.is_alive():
+                    self._fail()
+                return
+            self.connection.recv()
+        except (OSError, EOFError):
+            self._fail()
+            return
+        slots, cells, epoch, version = self.in_flight
+        self.in_flight = None
+        self.ready[slots] = True
+        self.cells[slots] = cells
+        self.epochs[slots] = epoch
+        self.versions[slots] = version
+        self.answers[slots] = self.results[:len(slots)]
+
+    def wait(self, timeout=None):
+        """
+        Wait for the batch in flight to be answered
+
+        Returns:
+            bool: True if no batch is left waiting
+        """
+        if self.in_flight is not None and self.alive:
+            try:
+                self.connection.poll(timeout)
+            except (OSError, EOFError):
+                pass
+            self._receive()
+        return self.in_flight is None
+
+    def _fail(self):
+        """Stop using a worker that died; the NPCs are planned in-process from now on"""
+        self.alive = False
+        self.close()
+
+    def stats(self):
+        """Steps planned by the worker and in-process, and answers dropped"""
+        return {"alive": self.alive, "remote": self.remote, "local": self.local, "dropped": self.dropped}
+
+    def close(self):
+        """Stop the worker, free the shared block and plan in-process again"""
+        atexit.unregister(self.close)
+        if self.npcs is not None:
+            self.npcs.planner = None
+            self.npcs = None
+        if self.connection is not None:
+            try:
+                if self.alive:
+                    self.connection.send(None)
+            except OSError:
+                pass
+            self.connection.close()
+            self.connection = None
+        if self.process is not None:
+            self.process.join(timeout=1)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        self.alive = False
+        self.in_flight = None
+        self.pending[:] = False
+        if self.memory is not None:
+            self.header = self.requests = self.results = None
+            self.memory.close()
+            self.memory.unlink()
+            self.memory = None
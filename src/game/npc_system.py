@@ -0,0 +1,362 @@
+"""
+Struct-of-arrays NPC movement
+
+Every NPC of a room lives in contiguous NumPy arrays (position, step
+direction, sub-step counter, goal and errands left). One call to update()
+advances all active NPCs at once: the ones standing on a tile choose their
+next step from the room's distance fields in a single batch, checking the
+neighbouring tiles against the walkable grid, and then everybody moves.
+
+NPCs spawned with an entity (a Character) get their position written back
+to the entity's x and y after each update, in one pass over the NPCs that
+moved, so reading a character's position is a plain attribute access.
+
+The planning of NPCs standing on a tile can be handed to an NPCPlanner
+(see npc_planner), which plans one tile ahead in a worker process. epoch
+is bumped whenever NPCs are placed, started or removed, so plans made
+before are not applied.
+"""
+import numpy as np
+
+from .navigation import UNREACHABLE
+
+NO_GOAL = -1
+PLAYER_GOAL = -2
+WANDER_FOREVER = -1
+
+# Neighbour offsets, in the same order as navigation.DIRECTIONS
+STEP_X = np.array([0, 0, -1, 1], dtype=np.int8)
+STEP_Y = np.array([-1, 1, 0, 0], dtype=np.int8)
+FAR = np.iinfo(np.int32).max
+
+# Per-NPC arrays: name, dtype, value of an empty slot
+NPC_ARRAYS = (
+    ('x', np.float64, 0),
+    ('y', np.float64, 0),
+    ('dx', np.int8, 0),
+    ('dy', np.int8, 0),
+    ('steps', np.int16, 0),
+    ('limits', np.int32, 0),
+    ('goals', np.int32, NO_GOAL),
+    ('active', np.bool_, False),
+    ('bound', np.bool_, False),
+)
+
+
+class NPCSystem:
+    def __init__(self, navigation, move_speed=0.1, capacity=16, seed=None):
+        """
+        Initialize NPC system
+
+        Args:
+            navigation (NavigationGrid): Navigation data of the room the NPCs walk in
+            move_speed (float): Tiles walked per update
+            capacity (int): Initial number of NPC slots, grown as needed
+            seed (int): Seed for goal and wandering choices
+        """
+        self.navigation = navigation
+        self.width = navigation.width
+        self.height = navigation.height
+        # View of the navigation grid, so obstacle changes are seen without copies
+        self.walkable = np.frombuffer(navigation.walkable, dtype=np.uint8)
+        self.move_speed = move_speed
+        self.steps_per_tile = max(1, int(round(1 / move_speed)))
+        self.rng = np.random.default_rng(seed)
+        self.player = None
+        self.planner = None
+        self.epoch = 0
+        self.count = 0
+        self.names = []
+        self.entities = []
+        self.slots = {}
+        self.goal_cells = list(navigation.points_of_interest)
+        self._goal_fields = None
+        self._fields_version = None
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Create the per-NPC arrays, keeping the current NPCs"""
+        for name, dtype, empty in NPC_ARRAYS:
+            array = np.full(capacity, empty, dtype=dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                array[:self.count] = old[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def spawn(self, name, x, y, entity=None):
+        """
+        Add an idle NPC on a tile
+
+        Args:
+            name (str): Unique NPC name
+            x (int): Tile column
+            y (int): Tile row
+            entity (object): Object whose x and y follow the NPC, if any
+
+        Returns:
+            int: Slot of the new NPC
+        """
+        if name in self.slots:
+            raise ValueError(f"NPC already exists: {name}")
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+        slot = self.count
+        for array_name, _, empty in NPC_ARRAYS:
+            getattr(self, array_name)[slot] = empty
+        self.x[slot] = x
+        self.y[slot] = y
+        self.bound[slot] = entity is not None
+        self.names.append(name)
+        self.entities.append(entity)
+        self.slots[name] = slot
+        self.count += 1
+        self.epoch += 1
+        self._write_back(slot)
+        return slot
+
+    def spawn_crowd(self, count, prefix="NPC", errands=WANDER_FOREVER):
+        """
+        Add NPCs on random free tiles and start them walking
+
+        Args:
+            count (int): Number of NPCs to add
+            prefix (str): Names are prefix followed by a number
+            errands (int): Goals each NPC visits before stopping
+
+        Returns:
+            list: Names of the new NPCs
+        """
+        occupied = (np.rint(self.y[:self.count]) * self.width + np.rint(self.x[:self.count])).astype(np.intp)
+        free = np.setdiff1d(np.flatnonzero(self.walkable), occupied)
+        cells = self.rng.choice(free, size=count, replace=count > len(free))
+        names = []
+        number = self.count
+        for cell in cells:
+            while f"{prefix}{number}" in self.slots:
+                number += 1
+            name = f"{prefix}{number}"
+            slot = self.spawn(name, cell % self.width, cell // self.width)
+            self.active[slot] = True
+            self.limits[slot] = errands
+            names.append(name)
+        return names
+
+    def remove(self, name):
+        """Remove an NPC, moving the last one into its slot"""
+        slot = self.slots.pop(name)
+        last = self.count - 1
+        if slot != last:
+            for array_name, _, _ in NPC_ARRAYS:
+                array = getattr(self, array_name)
+                array[slot] = array[last]
+            self.names[slot] = self.names[last]
+            self.entities[slot] = self.entities[last]
+            self.slots[self.names[slot]] = slot
+        self.names.pop()
+        self.entities.pop()
+        self.count -= 1
+        self.epoch += 1
+
+    def place(self, name, x, y):
+        """Put an NPC on a tile and stop it"""
+        slot = self.slots[name]
+        self.x[slot] = x
+        self.y[slot] = y
+        self.dx[slot] = self.dy[slot] = self.steps[slot] = 0
+        self.goals[slot] = NO_GOAL
+        self.active[slot] = False
+        self.epoch += 1
+        self._write_back(slot)
+
+    def get_arrays(self):
+        """Get the per-NPC arrays of the current NPCs, in NPC_ARRAYS order"""
+        return [getattr(self, name)[:self.count] for name, _, _ in NPC_ARRAYS]
+
+    def set_arrays(self, names, arrays, entities):
+        """
+        Replace every NPC with saved state
+
+        Args:
+            names (list): NPC names in slot order
+            arrays (list): Per-NPC arrays in NPC_ARRAYS order, as from get_arrays
+            entities (list): Entity of each NPC, or None
+        """
+        count = len(names)
+        if count > self.capacity:
+            self._allocate(count)
+        for (name, dtype, empty), values in zip(NPC_ARRAYS, arrays):
+            array = getattr(self, name)
+            array[:count] = values
+            array[count:] = empty
+        self.count = count
+        self.names = list(names)
+        self.entities = list(entities)
+        self.slots = {name: slot for slot, name in enumerate(self.names)}
+        self.epoch += 1
+        self._write_back(np.arange(count))
+
+    def position(self, name):
+        """Get the (x, y) position of an NPC in tiles"""
+        slot = self.slots[name]
+        return float(self.x[slot]), float(self.y[slot])
+
+    def positions(self):
+        """Iterate over (name, x, y) of every NPC"""
+        return zip(self.names, self.x[:self.count].tolist(), self.y[:self.count].tolist())
+
+    def is_active(self, name):
+        """Check if an NPC is walking"""
+        return bool(self.active[self.slots[name]])
+
+    def activate(self, name, errands=1, goal=None):
+        """
+        Start an NPC walking
+
+        Args:
+            name (str): NPC name
+            errands (int): Goals to visit before stopping, WANDER_FOREVER for no limit
+            goal (tuple): First goal, one of goal_cells; random if None
+        """
+        slot = self.slots[name]
+        self.active[slot] = True
+        self.limits[slot] = errands
+        self.goals[slot] = NO_GOAL if goal is None else self.goal_cells.index(goal)
+        self.epoch += 1
+
+    def activate_all(self, errands=WANDER_FOREVER):
+        """Start every NPC walking"""
+        self.active[:self.count] = True
+        self.limits[:self.count] = errands
+        self.epoch += 1
+
+    def set_player(self, position):
+        """Set the player tile NPCs can walk to, None if the player is elsewhere"""
+        self.player = None if position is None else (int(position[0]), int(position[1]))
+
+    def update(self):
+        """Advance every active NPC by one movement step"""
+        n = self.count
+        if not self.active[:n].any():
+            return
+        on_tile = self.active[:n] & (self.steps[:n] == 0)
+        if on_tile.any():
+            index = np.flatnonzero(on_tile)
+            if self.planner is None:
+                self._plan(index)
+            else:
+                rest = self.planner.plan(self, index)
+                if len(rest):
+                    self._plan(rest)
+                self.planner.request(self, index)
+
+        moving = self.active[:n] & ((self.dx[:n] != 0) | (self.dy[:n] != 0))
+        if not moving.any():
+            return
+        index = np.flatnonzero(moving)
+        self.x[index] += self.dx[index] * self.move_speed
+        self.y[index] += self.dy[index] * self.move_speed
+        self.steps[index] += 1
+
+        # Snap NPCs that finished a tile so rounding errors don't build up
+        arrived = index[self.steps[index] >= self.steps_per_tile]
+        self.x[arrived] = np.rint(self.x[arrived])
+        self.y[arrived] = np.rint(self.y[arrived])
+        self.steps[arrived] = 0
+        self.dx[arrived] = 0
+        self.dy[arrived] = 0
+        self._write_back(index)
+
+    def _write_back(self, index):
+        """Copy the positions of NPCs with an entity to the entity"""
+        index = np.atleast_1d(index)
+        index = index[self.bound[index]]
+        if len(index) == 0:
+            return
+        entities = self.entities
+        for slot, x, y in zip(index.tolist(), self.x[index].tolist(), self.y[index].tolist()):
+            entity = entities[slot]
+            entity.x = x
+            entity.y = y
+
+    def _plan(self, index):
+        """Choose the next step of NPCs standing on a tile"""
+        cells = (np.rint(self.y[index]) * self.width + np.rint(self.x[index])).astype(np.intp)
+        goals = self.goals[index]
+        if self.player is None:
+            goals[goals == PLAYER_GOAL] = NO_GOAL
+        needs_goal = goals == NO_GOAL
+        if needs_goal.any():
+            goals[needs_goal] = self._random_goals(np.count_nonzero(needs_goal))
+        here = self._distances(goals, cells)
+
+        reached = (here == 0) | ((goals == PLAYER_GOAL) & (here == 1))
+        if reached.any():
+            limits = self.limits[index]
+            limits[reached & (limits > 0)] -= 1
+            self.limits[index] = limits
+            done = reached & (limits == 0)
+            self.active[index[done]] = False
+            retarget = reached & ~done
+            if retarget.any():
+                goals[retarget] = self._random_goals(np.count_nonzero(retarget))
+                here[retarget] = self._distances(goals[retarget], cells[retarget])
+            walking = ~done
+            index, cells, goals, here = index[walking], cells[walking], goals[walking], here[walking]
+            if len(index) == 0:
+                return
+
+        # Batched test of the four neighbours of every NPC
+        count = len(index)
+        neighbour_x = (cells % self.width)[None, :] + STEP_X[:, None]
+        neighbour_y = (cells // self.width)[None, :] + STEP_Y[:, None]
+        inside = ((neighbour_x >= 0) & (neighbour_x < self.width) &
+                  (neighbour_y >= 0) & (neighbour_y < self.height))
+        neighbours = np.where(inside, neighbour_y * self.width + neighbour_x, 0)
+        is_open = inside & (self.walkable[neighbours] == 1)
+
+        distances = self._distances(np.tile(goals, 4), neighbours.ravel()).reshape(4, count)
+        distances = np.where(is_open & (distances != UNREACHABLE), distances, FAR)
+        best = distances.argmin(axis=0)
+        columns = np.arange(count)
+        best_distance = distances[best, columns]
+        downhill = (best_distance < FAR) & ((here == UNREACHABLE) | (best_distance < here))
+
+        # Without a gradient (no goal or unreachable goal) take a random open step
+        direction = np.where(downhill, best, self.rng.integers(4, size=count))
+        can_move = is_open[direction, columns]
+        self.dx[index] = np.where(can_move, STEP_X[direction], 0)
+        self.dy[index] = np.where(can_move, STEP_Y[direction], 0)
+        goals[~downhill] = NO_GOAL
+        self.goals[index] = goals
+
+    def _random_goals(self, count):
+        """Pick random goals: a point of interest, or the player if present"""
+        options = len(self.goal_cells) + (1 if self.player is not None else 0)
+        if options == 0:
+            return np.full(count, NO_GOAL, dtype=np.int32)
+        goals = self.rng.integers(options, size=count).astype(np.int32)
+        goals[goals == len(self.goal_cells)] = PLAYER_GOAL
+        return goals
+
+    def _goal_field_table(self):
+        """Distance fields of the points of interest, one row per goal"""
+        if self._goal_fields is None or self._fields_version != self.navigation.version:
+            size = self.width * self.height
+            rows = [np.frombuffer(self.navigation.distance_field(cell), dtype=np.intc)
+                    for cell in self.goal_cells]
+            self._goal_fields = np.stack(rows) if rows else np.empty((0, size), dtype=np.intc)
+            self._fields_version = self.navigation.version
+        return self._goal_fields
+
+    def _distances(self, goals, cells):
+        """Distance from each cell to the matching goal, UNREACHABLE if none"""
+        distances = np.full(len(goals), UNREACHABLE, dtype=np.int32)
+        known = goals >= 0
+        if known.any():
+            distances[known] = self._goal_field_table()[goals[known], cells[known]]
+        to_player = goals == PLAYER_GOAL
+        if to_player.any() and self.player is not None:
+            field = np.frombuffer(self.navigation.distance_field(self.player), dtype=np.intc)
+            distances[to_player] = field[cells[to_player]]
+        return distances
@@ -0,0 +1,270 @@
+"""
+Game rules, independent of the display
+
+GameRules holds what happens in a round: moving the player, talking to the
+suspects, deducing the killer and running the timer. It never draws or
+plays sounds; whatever the player should see is announced through the
+on_* hooks, which Game implements with its cards and dialogue boxes and a
+headless session records as events for a remote client.
+
+Classes using it provide the state it works on: player, characters, npcs,
+scenario, scenarios, solver, dialogue_db, clues, timer, timer_active,
+points, first_win, mystery_solved, state, rooms, navigation, logger and
+deduction_backend.
+"""
+import random
+
+from .deduction import create_session
+from .game_constants import INITIAL_TIMER, NPC_ROOM, REDUCED_TIMER, TIMER_BONUS
+from .game_maps import ALEXS_ROOM_START_POS, MAIN_MAP, PATROL_WAYPOINTS, TILE_TYPES
+from .game_state import GameState
+from .mystery_generator import DEFAULT_SCENARIO
+from .navigation import NavigationGrid
+
+
+class GameRules:
+    """Rules of the mystery shared by the game and the headless sessions"""
+
+    __slots__ = ()
+
+    @property
+    def player_x(self):
+        """Player column in tiles"""
+        return self.player.x
+
+    @player_x.setter
+    def player_x(self, value):
+        self.player.x = value
+
+    @property
+    def player_y(self):
+        """Player row in tiles"""
+        return self.player.y
+
+    @player_y.setter
+    def player_y(self, value):
+        self.player.y = value
+
+    @property
+    def current_map(self):
+        """Name of the room the player is in"""
+        return self.player.room
+
+    @current_map.setter
+    def current_map(self, room_name):
+        self.player.room = room_name
+
+    # Hooks, called when something the player should see happens
+
+    def on_room_changed(self, room_name):
+        """The player went through a door"""
+
+    def on_dialogue(self, name, line_id, x, y):
+        """A character at (x, y) said a dialogue line"""
+
+    def on_killer_revealed(self, killer, explanation):
+        """The statements heard name a single killer"""
+
+    def on_round_won(self):
+        """The mystery was solved and a new round started"""
+
+    def on_lost(self):
+        """The time ran out before finding any clue"""
+
+    # Mystery
+
+    def setup_mystery(self):
+        """Pick a scenario and start a new round with it"""
+        self.set_scenario(random.choice(self.scenarios) if self.scenarios else DEFAULT_SCENARIO)
+
+    def set_scenario(self, scenario):
+        """Give each suspect the IDs of their statements and reset the solver"""
+        self.scenario = scenario
+        for name, character in self.characters.items():
+            testimony = [self.dialogue_db.statement_id(statement)
+                         for statement in self.scenario.testimony(name)]
+            # Las primeras frases del juego original son la declaración de DEFAULT_SCENARIO;
+            # las demás siguen como charla, sin efecto en el solver
+            character.dialogues = testimony + self.dialogue_db.small_talk[name]
+            character.dialogue_index = 0
+        self.setup_solver()
+
+    def setup_solver(self):
+        """Start a new round of the deduction session, creating it on first use"""
+        if self.solver is None:
+            self.solver = create_session(self.scenario.suspects, self.deduction_backend)
+        else:
+            self.solver.reset(self.scenario.suspects)
+        self.possible_suspects = list(self.scenario.suspects)
+        self.heard = []
+
+    def update_solver(self, line_id):
+        """Add the statement of a dialogue line to the solver, if the line is one"""
+        statement = self.dialogue_db.statements.get(line_id)
+        if statement is not None:
+            self.solver.add(statement)
+            self.heard.append(line_id)
+        self.possible_suspects = self.solver.possible_suspects()
+
+    def determine_killer(self):
+        """Determine the killer from the statements heard so far
+
+        Returns:
+            str: The only suspect consistent with what was heard, or None
+            while the statements still allow several suspects
+        """
+        return self.solver.killer()
+
+    def interact(self):
+        """Handle player interactions with characters and objects"""
+        for name, character in self.characters.items():
+            if self.player.is_near(character.x, character.y):
+                line_id = character.next_dialogue()
+                self.on_dialogue(name, line_id, character.x, character.y)
+                self.update_solver(line_id)
+                if name not in self.clues and name in self.scenario.suspects:
+                    self.clues.append(name)
+                    self.timer += TIMER_BONUS
+                self.npcs.activate(name)
+
+                if len(self.clues) == len(self.scenario.suspects):
+                    self.solve_mystery()
+
+    def solve_mystery(self):
+        """Attempt to solve the mystery"""
+        killer = self.determine_killer()
+        if killer:
+            self.logger.info("Solver queries: %(queries)d, mean %(mean_ms).2f ms, "
+                             "p95 %(p95_ms).2f ms, max %(max_ms).2f ms", self.solver.latency_stats())
+            explanation = f"Basado en las declaraciones, {killer} es el asesino."
+            self.on_killer_revealed(killer, explanation)
+            self.mystery_solved = True
+            self.points += 1
+            self.clues = []
+            self.setup_mystery()
+            if self.first_win:
+                self.timer = REDUCED_TIMER
+                self.first_win = False
+            self.on_round_won()
+
+    def restart_round(self):
+        """Reset the timer, score streak and suspects for a new game"""
+        self.timer = INITIAL_TIMER
+        self.timer_active = True
+        self.clues = []
+        self.setup_mystery()
+        self.first_win = True
+        self.place_characters_randomly()  # Reubicar personajes al reiniciar
+
+    # Characters
+
+    def get_valid_positions(self):
+        """Get list of free floor positions in the room the characters walk in"""
+        valid_positions = []
+        current_map = self.get_room_map(NPC_ROOM)
+        occupied = {(int(character.x), int(character.y)) for character in self.characters.values()}
+
+        for y in range(len(current_map)):
+            for x in range(len(current_map[0])):
+                # Verificar si la posición es válida (no es pared ni puerta)
+                # y que no haya otro personaje en esta posición
+                if current_map[y][x] == 0 and (x, y) not in occupied:
+                    valid_positions.append((x, y))
+
+        return valid_positions
+
+    def place_characters_randomly(self):
+        """Place characters in random valid positions"""
+        valid_positions = self.get_valid_positions()
+
+        for character in self.characters.values():
+            if valid_positions:
+                # Seleccionar una posición aleatoria
+                new_pos = random.choice(valid_positions)
+                # Remover la posición seleccionada para evitar superposiciones
+                valid_positions.remove(new_pos)
+                # Asignar nueva posición al personaje
+                character.place(*new_pos)
+
+    def remove_character(self, name):
+        """Remove a character from the game"""
+        del self.characters[name]
+        self.npcs.remove(name)
+
+    # Movement and rooms
+
+    def move_player(self, dx, dy):
+        """Move player by delta x and y"""
+        new_x = self.player_x + dx
+        new_y = self.player_y + dy
+        current_map = self.get_current_map()
+        if 0 <= new_x < len(current_map[0]) and 0 <= new_y < len(current_map):
+            if current_map[new_y][new_x] != TILE_TYPES['WALL']:
+                self.player_x, self.player_y = new_x, new_y
+
+    def get_current_map(self):
+        """Get current map based on game state"""
+        return self.get_room_map(self.current_map)
+
+    def get_room_map(self, room_name):
+        """Get the map of a room by name"""
+        return self.rooms.get(room_name, MAIN_MAP)
+
+    def get_navigation(self, room_name):
+        """Get the navigation grid of a room, building it on first use"""
+        navigation = self.navigation.get(room_name)
+        if navigation is None:
+            navigation = NavigationGrid(self.get_room_map(room_name),
+                                        waypoints=PATROL_WAYPOINTS.get(room_name, ()))
+            self.navigation[room_name] = navigation
+        return navigation
+
+    def is_position_valid(self, x, y):
+        """Check if a position is valid for a character to move to"""
+        current_map = self.get_current_map()
+        # Convertir coordenadas flotantes a enteros
+        x = int(x)
+        y = int(y)
+        if 0 <= x < len(current_map[0]) and 0 <= y < len(current_map):
+            if current_map[y][x] != TILE_TYPES['WALL']:
+                return True
+        return False
+
+    def check_door_interaction(self):
+        """Check and handle door interactions"""
+        current_map = self.get_current_map()
+        if current_map[self.player_y][self.player_x] == TILE_TYPES['DOOR']:
+            if self.current_map == 'main':
+                if self.player_x == 23 and self.player_y == 5:
+                    self.transition_to_room('alexs_room', ALEXS_ROOM_START_POS)
+                elif self.player_x == 23 and self.player_y == 15:
+                    self.transition_to_room('outside', (7, 15))
+            elif self.current_map == 'alexs_room':
+                self.transition_to_room('main', (23, 4))
+            elif self.current_map == 'outside':
+                self.transition_to_room('main', (23, 14))
+
+    def transition_to_room(self, room_name, position):
+        """Handle room transitions"""
+        self.current_map = room_name
+        self.player_x, self.player_y = position
+        self.on_room_changed(room_name)
+
+    # Frame update
+
+    def _update_characters(self):
+        """Move every walking character in one step of the NPC system"""
+        in_npc_room = self.current_map == NPC_ROOM
+        self.npcs.set_player((self.player_x, self.player_y) if in_npc_room else None)
+        self.npcs.update()
+
+    def _update_timer(self):
+        """Update game timer"""
+        if self.timer_active:
+            self.timer -= 1 / 60  # Restar un segundo cada 60 frames
+            if self.timer <= 0:
+                self.timer = 0
+                self.timer_active = False
+                if len(self.clues) == 0:
+                    self.on_lost()
+                    self.state = GameState.LOST
@@ -0,0 +1,304 @@
+"""
+Compact binary snapshots of the game state
+
+A snapshot is a fixed header followed by a payload packed with struct and
+the raw bytes of the NPC arrays:
+
+    header: magic, format version, flags, payload size, CRC-32 of the payload
+    payload: game state, player, timer and score, scenario (killer and
+             statement line IDs), clues, heard line IDs, dialogue indexes,
+             NPC arrays, and the state of the random and NPC generators
+
+The payload may be zlib-compressed (FLAG_ZLIB). Taking a snapshot copies a
+few hundred bytes and writing it to disk is left to SnapshotWriter, which
+keeps only the latest snapshot and writes it from a background thread.
+"""
+import os
+import random
+import struct
+import threading
+import zlib
+from array import array
+
+import numpy as np
+
+from .game_state import GameState
+from .mystery_generator import Scenario
+from .npc_system import NPC_ARRAYS
+
+SNAPSHOT_MAGIC = b'MSNP'
+SNAPSHOT_VERSION = 1
+FLAG_ZLIB = 1
+
+HEADER = struct.Struct('<4sHHII')
+GAME = struct.Struct('<BIid??ii')
+RANDOM_STATE = struct.Struct('<B?d')
+NPC_RNG = struct.Struct('<16s16sBI')
+BOOL = struct.Struct('<?')
+USHORT = struct.Struct('<H')
+UINT = struct.Struct('<I')
+MT_STATE_SIZE = 625
+
+
+class _Packer:
+    """Append packed values to a byte buffer"""
+
+    def __init__(self):
+        self.parts = []
+
+    def pack(self, layout, *values):
+        self.parts.append(layout.pack(*values))
+
+    def string(self, text):
+        encoded = text.encode('utf-8')
+        self.parts.append(USHORT.pack(len(encoded)))
+        self.parts.append(encoded)
+
+    def strings(self, texts):
+        self.parts.append(USHORT.pack(len(texts)))
+        for text in texts:
+            self.string(text)
+
+    def array(self, values):
+        """Raw bytes of a typed array, prefixed with their size"""
+        data = values.tobytes()
+        self.parts.append(UINT.pack(len(data)))
+        self.parts.append(data)
+
+    def getvalue(self):
+        return b''.join(self.parts)
+
+
+class _Unpacker:
+    """Read values back in the order they were packed"""
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, layout):
+        if self.offset + layout.size > len(self.data):
+            raise ValueError("Truncated snapshot")
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def _take(self, size):
+        if self.offset + size > len(self.data):
+            raise ValueError("Truncated snapshot")
+        chunk = self.data[self.offset:self.offset + size]
+        self.offset += size
+        return chunk
+
+    def string(self):
+        size, = self.unpack(USHORT)
+        return str(self._take(size), 'utf-8')
+
+    def strings(self):
+        count, = self.unpack(USHORT)
+        return [self.string() for _ in range(count)]
+
+    def array(self, typecode):
+        size, = self.unpack(UINT)
+        values = array(typecode)
+        values.frombytes(self._take(size))
+        return values
+
+    def ndarray(self, dtype):
+        size, = self.unpack(UINT)
+        return np.frombuffer(self._take(size), dtype=dtype).copy()
+
+
+def take_snapshot(game, compress=False):
+    """
+    Serialize the state of a game
+
+    Args:
+        game (Game): Game to save
+        compress (bool): Compress the payload with zlib
+
+    Returns:
+        bytes: Snapshot
+    """
+    packer = _Packer()
+    db = game.dialogue_db
+    scenario = game.scenario
+    packer.pack(GAME, game.state.value, game.frame_count, game.points, game.timer,
+                game.timer_active, game.first_win, game.player.x, game.player.y)
+    packer.string(game.current_map)
+    packer.pack(BOOL, game.mystery_solved)
+
+    packer.strings(scenario.suspects)
+    packer.string(scenario.killer)
+    packer.array(array('I', [db.statement_id(statement) for statement in scenario.statements]))
+    packer.strings(game.clues)
+    packer.array(array('I', game.heard))
+
+    names = list(game.characters)
+    packer.strings(names)
+    packer.array(array('H', [game.characters[name].dialogue_index for name in names]))
+
+    npcs = game.npcs
+    packer.strings(npcs.names)
+    for values in npcs.get_arrays():
+        packer.array(values)
+
+    version, mt_state, gauss = random.getstate()
+    packer.pack(RANDOM_STATE, version, gauss is not None, gauss or 0.0)
+    packer.array(array('I', mt_state))
+    state = npcs.rng.bit_generator.state
+    packer.pack(NPC_RNG, state['state']['state'].to_bytes(16, 'little'),
+                state['state']['inc'].to_bytes(16, 'little'), state['has_uint32'], state['uinteger'])
+
+    payload = packer.getvalue()
+    checksum = zlib.crc32(payload)
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 1)
+        flags |= FLAG_ZLIB
+    return HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags, len(payload), checksum) + payload
+
+
+def restore_snapshot(game, data):
+    """
+    Restore a game from a snapshot taken with take_snapshot
+
+    Raises:
+        ValueError: If the snapshot is damaged, from another format version
+            or from a game with other characters
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Truncated snapshot")
+    magic, version, flags, size, checksum = HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a game snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+    payload = bytes(data[HEADER.size:HEADER.size + size])
+    if len(payload) != size:
+        raise ValueError("Truncated snapshot")
+    if flags & FLAG_ZLIB:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error as e:
+            raise ValueError(f"Damaged compressed snapshot: {e}") from e
+    if zlib.crc32(payload) != checksum:
+        raise ValueError("Snapshot checksum mismatch")
+
+    reader = _Unpacker(payload)
+    state, frame_count, points, timer, timer_active, first_win, player_x, player_y = reader.unpack(GAME)
+    room = reader.string()
+    mystery_solved, = reader.unpack(BOOL)
+
+    suspects = reader.strings()
+    killer = reader.string()
+    db = game.dialogue_db
+    try:
+        statements = [db.statements[line_id] for line_id in reader.array('I')]
+    except KeyError as e:
+        raise ValueError(f"Unknown statement line in snapshot: {e}") from None
+    clues = reader.strings()
+    heard = reader.array('I').tolist()
+
+    names = reader.strings()
+    dialogue_indexes = reader.array('H')
+    if sorted(names) != sorted(game.characters):
+        raise ValueError("Snapshot characters do not match the game")
+
+    npc_names = reader.strings()
+    arrays = [reader.ndarray(dtype) for _, dtype, _ in NPC_ARRAYS]
+
+    mt_version, has_gauss, gauss = reader.unpack(RANDOM_STATE)
+    mt_state = tuple(reader.array('I'))
+    if len(mt_state) != MT_STATE_SIZE:
+        raise ValueError("Damaged random state")
+    rng_state, rng_inc, has_uint32, uinteger = reader.unpack(NPC_RNG)
+
+    # Todo leído y validado: ahora se aplica al juego
+    game.state = GameState(state)
+    game.frame_count = frame_count
+    game.points = points
+    game.timer = timer
+    game.timer_active = timer_active
+    game.first_win = first_win
+    game.mystery_solved = mystery_solved
+    game.player.x, game.player.y = player_x, player_y
+    game.current_map = room
+
+    game.set_scenario(Scenario(suspects, statements, killer))
+    for name, index in zip(names, dialogue_indexes):
+        game.characters[name].dialogue_index = index
+    game.clues = clues
+    for line_id in heard:
+        game.update_solver(line_id)
+
+    game.npcs.set_arrays(npc_names, arrays, [game.characters.get(name) for name in npc_names])
+    random.setstate((mt_version, mt_state, gauss if has_gauss else None))
+    game.npcs.rng.bit_generator.state = {
+        'bit_generator': game.npcs.rng.bit_generator.state['bit_generator'],
+        'state': {'state': int.from_bytes(rng_state, 'little'), 'inc': int.from_bytes(rng_inc, 'little')},
+        'has_uint32': has_uint32,
+        'uinteger': uinteger,
+    }
+    game.invalidate_screen()
+
+
+def read_snapshot_file(path):
+    """Read the bytes of a snapshot file"""
+    with open(path, 'rb') as snapshot_file:
+        return snapshot_file.read()
+
+
+def write_snapshot_file(path, data):
+    """Write a snapshot atomically, so a crash never leaves half a file"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as snapshot_file:
+        snapshot_file.write(data)
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+    os.replace(temp_path, path)
+
+
+class SnapshotWriter:
+    """Background thread writing the latest submitted snapshot to a file"""
+
+    def __init__(self, path):
+        """
+        Initialize writer and start its thread
+
+        Args:
+            path (str): Snapshot file, replaced on every write
+        """
+        self.path = path
+        self.writes = 0
+        self._pending = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, data):
+        """Queue a snapshot, replacing one not written yet"""
+        with self._condition:
+            self._pending = data
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                data, self._pending = self._pending, None
+                closed = self._closed
+            if data is not None:
+                write_snapshot_file(self.path, data)
+                self.writes += 1
+            if closed and data is None:
+                return
+
+    def close(self):
+        """Write the pending snapshot and stop the thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
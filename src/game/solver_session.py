@@ -0,0 +1,115 @@
+"""
+Long-lived z3 session for the statements heard in a round
+
+The solver is created once with the "exactly one killer" constraint. Every
+distinct statement is added a single time behind its own guard literal, and
+the statements heard in the current round are passed as assumptions, so a
+new round only clears the list of heard guards instead of rebuilding the
+solver. The suspects still possible can only shrink while statements are
+added, so each query re-checks only the suspects that were still possible.
+"""
+import time
+from collections import deque
+
+from z3 import Bool, Implies, Solver, sat
+
+from .statements import exactly_one_killer, suspect_variables
+
+LATENCY_SAMPLES = 256
+
+
+class SolverSession:
+    def __init__(self, suspects):
+        """
+        Initialize session
+
+        Args:
+            suspects (list): Suspect names
+        """
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.queries = 0
+        self._build(suspects)
+
+    def _build(self, suspects):
+        """Create the solver and the base constraints for a set of suspects"""
+        self.suspects = list(suspects)
+        self.variables = suspect_variables(self.suspects)
+        self.solver = Solver()
+        self.solver.add(exactly_one_killer(self.variables))
+        self.guards = {}
+        self.heard = []
+        self._possible = list(self.suspects)
+        self._checked = True
+
+    def reset(self, suspects=None):
+        """
+        Forget the heard statements and start a new round
+
+        Args:
+            suspects (list): Suspects of the new round; the solver is only
+                rebuilt when they differ from the current ones
+        """
+        if suspects is not None and list(suspects) != self.suspects:
+            self._build(suspects)
+            return
+        self.heard = []
+        self._possible = list(self.suspects)
+        self._checked = True
+
+    def guard(self, statement):
+        """Get the assumption literal enabling a statement, adding it on first use"""
+        literal = self.guards.get(statement.key)
+        if literal is None:
+            literal = Bool(f"said_{len(self.guards)}")
+            self.solver.add(Implies(literal, statement.to_z3(self.variables)))
+            self.guards[statement.key] = literal
+        return literal
+
+    def add(self, statement):
+        """Assert a statement heard in this round"""
+        literal = self.guard(statement)
+        if literal not in self.heard:
+            self.heard.append(literal)
+            self._checked = False
+
+    def possible_suspects(self):
+        """Suspects who can still be the killer given the statements heard"""
+        if not self._checked:
+            start = time.perf_counter()
+            self._possible = [name for name in self._possible
+                              if self.solver.check(*self.heard, self.variables[name]) == sat]
+            self.latencies.append(time.perf_counter() - start)
+            self.queries += 1
+            self._checked = True
+        return list(self._possible)
+
+    def killer(self):
+        """The only possible suspect, or None while several remain or none does"""
+        possible = self.possible_suspects()
+        return possible[0] if len(possible) == 1 else None
+
+    def latency_stats(self):
+        """Latency of the recent queries, see summarize_latency"""
+        return summarize_latency(self.latencies, self.queries)
+
+
+def summarize_latency(latencies, queries):
+    """
+    Summarize query latencies
+
+    Args:
+        latencies (iterable): Recent query times in seconds
+        queries (int): Total number of queries
+
+    Returns:
+        dict: Number of queries and mean, 95th percentile and max latency in ms
+    """
+    samples = sorted(latencies)
+    if not samples:
+        return {"queries": queries, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    return {
+        "queries": queries,
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+        "max_ms": samples[-1] * 1000,
+    }
@@ -0,0 +1,140 @@
+"""
+Sprites for the gameplay screen
+
+Everything drawn during gameplay lives in one pygame.sprite.LayeredDirty
+group. Images and labels are rendered once and only sprites marked dirty
+(moved, changed or overlapped by a change) are redrawn each frame.
+"""
+import pygame
+from pygame.sprite import DirtySprite
+
+from .game_constants import WHITE
+
+# Drawing order, bottom to top
+LAYER_FLOOR = 0
+LAYER_BLOOD = 1
+LAYER_FURNITURE = 2
+LAYER_ACTORS = 3
+LAYER_DARKNESS = 4
+LAYER_WEATHER = 5
+LAYER_OVERLAY = 6
+
+
+class GameSprite(DirtySprite):
+    """Dirty sprite that only marks itself dirty when something changes"""
+
+    def show(self, visible):
+        """Show or hide the sprite"""
+        visible = 1 if visible else 0
+        if visible != self.visible:
+            self.visible = visible
+            self.dirty = 1
+
+
+class ImageSprite(GameSprite):
+    """Sprite showing a prepared image at a position"""
+
+    def __init__(self, image, pos=(0, 0)):
+        """
+        Initialize sprite
+
+        Args:
+            image (Surface): Image to show
+            pos (tuple): Top-left position
+        """
+        super().__init__()
+        self.image = image
+        self.rect = image.get_rect(topleft=pos)
+
+    def set_image(self, image):
+        """Change the image, marking the sprite dirty only if it differs"""
+        if image is not self.image:
+            self.image = image
+            self.rect.size = image.get_size()
+            self.dirty = 1
+
+    def move_to(self, x, y):
+        """Move the top-left corner, marking the sprite dirty only if it moved"""
+        x, y = int(x), int(y)
+        if x != self.rect.x or y != self.rect.y:
+            self.rect.topleft = (x, y)
+            self.dirty = 1
+
+
+class TextSprite(GameSprite):
+    """Text centered on a point, rendered again only when it changes"""
+
+    def __init__(self, font, text, center, color=WHITE):
+        """
+        Initialize sprite
+
+        Args:
+            font (Font): Font used to render the text
+            text (str): Initial text
+            center (tuple): Center position
+            color (tuple): RGB color tuple
+        """
+        super().__init__()
+        self.font = font
+        self.color = color
+        self.text = None
+        self.image = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.center = (int(center[0]), int(center[1]))
+        self.set_text(text)
+
+    def set_text(self, text):
+        """Change the text"""
+        if text == self.text:
+            return
+        self.text = text
+        self.image = self.font.render(text, True, self.color)
+        self.rect = self.image.get_rect(center=self.center)
+        self.dirty = 1
+
+    def move_to(self, x, y):
+        """Move the center point"""
+        center = (int(x), int(y))
+        if center != self.center:
+            self.center = center
+            self.rect.center = center
+            self.dirty = 1
+
+
+class ActorSprite(ImageSprite):
+    """Player or NPC image with an optional name label above it"""
+
+    def __init__(self, image, tile_size, label_font=None, name=None):
+        """
+        Initialize sprite
+
+        Args:
+            image (Surface): Actor image, already scaled to tile_size
+            tile_size (int): Size of a map tile in pixels
+            label_font (Font): Font for the name label
+            name (str): Name shown above the actor
+        """
+        super().__init__(image)
+        self.tile_size = tile_size
+        self.label = None
+        if name is not None:
+            self.label = TextSprite(label_font, name, (0, 0))
+
+    def place(self, tile_x, tile_y):
+        """Move the actor (and its label) to a map position in tiles"""
+        self.move_to(tile_x * self.tile_size, tile_y * self.tile_size)
+        if self.label is not None:
+            self.label.move_to(tile_x * self.tile_size + self.tile_size / 2,
+                               tile_y * self.tile_size - 15)
+
+    def kill(self):
+        """Remove the actor and its label from all groups"""
+        super().kill()
+        if self.label is not None:
+            self.label.kill()
+
+    def show(self, visible):
+        """Show or hide the actor and its label"""
+        super().show(visible)
+        if self.label is not None:
+            self.label.show(visible)
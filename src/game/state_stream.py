@@ -0,0 +1,537 @@
+"""
+Delta-encoded game state stream
+
+Once per frame the game captures a small StreamState (room, player tile,
+timer seconds, points, overlay and NPC positions) and StateEncoder turns
+it into a message holding only the fields that changed since the previous
+frame. Nothing is sent for a frame where nothing changed. Every message is
+length-prefixed:
+
+    length (uint32), type, frame number, field mask, then each field
+    present in the mask: room name, player tile, timer seconds, points,
+    overlay kind and text, NPC names, moved NPCs as (slot, x, y) with
+    positions in hundredths of a tile
+
+A keyframe has every field and lets a subscriber start from nothing. Its
+NPC names give the slot order used by the deltas that follow.
+
+StatePublisher encodes each frame's delta once on the game thread and a
+dispatcher thread hands it to every subscriber. Each subscriber has its
+own sending thread and a bounded buffer. A subscriber that falls behind has its backlog dropped
+and gets a keyframe instead, so slow spectators never block the game loop.
+SceneState decodes the stream back into the scene a viewer draws.
+"""
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from .solver_session import LATENCY_SAMPLES, summarize_latency
+
+MSG_KEYFRAME = 1
+MSG_DELTA = 2
+
+FIELD_ROOM = 1
+FIELD_PLAYER = 2
+FIELD_TIMER = 4
+FIELD_POINTS = 8
+FIELD_OVERLAY = 16
+FIELD_NAMES = 32
+FIELD_NPCS = 64
+ALL_FIELDS = 127
+
+# What is drawn over the scene
+OVERLAY_NONE = 0
+OVERLAY_BODY = 1       # close-up of the body
+OVERLAY_DIALOGUE = 2   # dialogue box, text is the line
+OVERLAY_KILLER = 3     # killer reveal card, text is the explanation
+OVERLAY_WON = 4        # victory card
+OVERLAY_LOST = 5       # game over card
+NO_OVERLAY = (OVERLAY_NONE, "")
+
+LENGTH = struct.Struct('<I')
+HEADER = struct.Struct('<BIB')
+PLAYER = struct.Struct('<ii')
+USHORT = struct.Struct('<H')
+BYTE = struct.Struct('<B')
+NPC_MOVE = np.dtype([('slot', '<u2'), ('x', '<i4'), ('y', '<i4')])
+POSITION_SCALE = 100
+
+MAX_SUBSCRIBER_BUFFER = 64 * 1024  # Bytes queued for a subscriber before it is resynced
+
+
+class StreamState:
+    """What a spectator sees in one frame"""
+
+    __slots__ = ('room', 'player', 'timer', 'points', 'overlay', 'names', 'positions')
+
+    def __init__(self, room, player, timer, points, overlay, names, positions):
+        """
+        Initialize state
+
+        Args:
+            room (str): Room the player is in
+            player (tuple): Player tile (x, y)
+            timer (int): Whole seconds left
+            points (int): Score
+            overlay (tuple): (kind, text) of what is drawn over the scene
+            names (tuple): NPC names in slot order
+            positions (ndarray): NPC positions, int32 (count, 2) in hundredths of a tile
+        """
+        self.room = room
+        self.player = player
+        self.timer = timer
+        self.points = points
+        self.overlay = overlay
+        self.names = names
+        self.positions = positions
+
+
+def capture_state(game):
+    """Capture the StreamState of a game"""
+    npcs = game.npcs
+    count = npcs.count
+    positions = np.empty((count, 2), dtype=np.int32)
+    # int32 en centésimas llega a más de 21 millones de casillas; int16 se daba la vuelta a las 327
+    np.rint(npcs.x[:count] * POSITION_SCALE, out=positions[:, 0], casting='unsafe')
+    np.rint(npcs.y[:count] * POSITION_SCALE, out=positions[:, 1], casting='unsafe')
+    overlay = game.overlay
+    body = game.body
+    if overlay[0] == OVERLAY_NONE and body.fullscreen and game.current_map == body.room:
+        overlay = (OVERLAY_BODY, "")
+    return StreamState(game.current_map, (int(game.player_x), int(game.player_y)), int(game.timer),
+                       game.points, overlay, tuple(npcs.names), positions)
+
+
+def _pack_string(parts, text):
+    encoded = text.encode('utf-8')
+    parts.append(USHORT.pack(len(encoded)))
+    parts.append(encoded)
+
+
+class StateEncoder:
+    """Encode frames as deltas against the previous frame"""
+
+    def __init__(self):
+        self.previous = None
+
+    def encode(self, frame, state, previous=None):
+        """
+        Encode a state against an older one
+
+        Args:
+            frame (int): Frame number
+            state (StreamState): State to encode
+            previous (StreamState): State the receiver has, None for a keyframe
+
+        Returns:
+            bytes: Message, or None if nothing changed
+        """
+        mask = ALL_FIELDS
+        moved = None
+        if previous is not None:
+            mask = 0
+            if state.room != previous.room:
+                mask |= FIELD_ROOM
+            if state.player != previous.player:
+                mask |= FIELD_PLAYER
+            if state.timer != previous.timer:
+                mask |= FIELD_TIMER
+            if state.points != previous.points:
+                mask |= FIELD_POINTS
+            if state.overlay != previous.overlay:
+                mask |= FIELD_OVERLAY
+            if state.names != previous.names:
+                mask |= FIELD_NAMES | FIELD_NPCS
+            else:
+                moved = np.flatnonzero((state.positions != previous.positions).any(axis=1))
+                if len(moved):
+                    mask |= FIELD_NPCS
+            if not mask:
+                return None
+        if moved is None:
+            moved = np.arange(len(state.names))
+
+        parts = [HEADER.pack(MSG_KEYFRAME if previous is None else MSG_DELTA, frame, mask)]
+        if mask & FIELD_ROOM:
+            _pack_string(parts, state.room)
+        if mask & FIELD_PLAYER:
+            parts.append(PLAYER.pack(*state.player))
+        if mask & FIELD_TIMER:
+            parts.append(USHORT.pack(state.timer))
+        if mask & FIELD_POINTS:
+            parts.append(USHORT.pack(state.points))
+        if mask & FIELD_OVERLAY:
+            parts.append(BYTE.pack(state.overlay[0]))
+            _pack_string(parts, state.overlay[1])
+        if mask & FIELD_NAMES:
+            parts.append(USHORT.pack(len(state.names)))
+            for name in state.names:
+                _pack_string(parts, name)
+        if mask & FIELD_NPCS:
+            moves = np.empty(len(moved), dtype=NPC_MOVE)
+            moves['slot'] = moved
+            moves['x'] = state.positions[moved, 0]
+            moves['y'] = state.positions[moved, 1]
+            parts.append(USHORT.pack(len(moves)))
+            parts.append(moves.tobytes())
+        body = b''.join(parts)
+        return LENGTH.pack(len(body)) + body
+
+    def delta(self, frame, state):
+        """Encode a state against the one given on the previous call"""
+        message = None
+        if self.previous is not None:
+            message = self.encode(frame, state, self.previous)
+        self.previous = state
+        return message
+
+
+class Subscriber:
+    """One receiver of the stream, fed by its own thread"""
+
+    def __init__(self, write, close, name, max_buffer=MAX_SUBSCRIBER_BUFFER):
+        """
+        Initialize subscriber and start its thread
+
+        Args:
+            write (callable): Blocking write of bytes
+            close (callable): Release the connection
+            name (str): Description used in the stats
+            max_buffer (int): Bytes queued before the backlog is dropped
+        """
+        self.write = write
+        self.close_connection = close
+        self.name = name
+        self.max_buffer = max_buffer
+        self.chunks = deque()
+        self.buffered = 0
+        self.needs_keyframe = True
+        self.closed = False
+        self.started = time.perf_counter()
+        self.bytes_sent = 0
+        self.messages = 0
+        self.resyncs = 0
+        self.cpu_time = 0.0
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name=f"stream-{name}", daemon=True)
+        self.thread.start()
+
+    def offer(self, delta, keyframe):
+        """
+        Queue the message of a frame
+
+        Args:
+            delta (bytes): Delta against the previous frame, None if nothing changed
+            keyframe (callable): Get the keyframe of the frame, encoded on first call
+        """
+        with self.condition:
+            if self.closed:
+                return
+            if self.needs_keyframe:
+                data = keyframe()
+                self.needs_keyframe = False
+            elif delta is None:
+                return
+            else:
+                data = delta
+            if self.buffered + len(data) > self.max_buffer:
+                # Espectador lento: descartar lo pendiente y reenviar un keyframe
+                self.chunks.clear()
+                self.buffered = 0
+                self.needs_keyframe = True
+                self.resyncs += 1
+                return
+            self.chunks.append(data)
+            self.buffered += len(data)
+            self.condition.notify()
+
+    def _run(self):
+        cpu_start = time.thread_time()
+        while True:
+            with self.condition:
+                while not self.chunks and not self.closed:
+                    self.condition.wait()
+                if not self.chunks:
+                    break
+                count = len(self.chunks)
+                data = b''.join(self.chunks)
+                self.chunks.clear()
+                self.buffered = 0
+            try:
+                self.write(data)
+            except (OSError, ValueError):
+                with self.condition:
+                    self.closed = True
+                break
+            self.bytes_sent += len(data)
+            self.messages += count
+            self.cpu_time = time.thread_time() - cpu_start
+        try:
+            self.close_connection()
+        except OSError:
+            pass
+
+    def close(self):
+        """Stop the thread once the queued messages are sent"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+    def stats(self):
+        """Bytes, messages, resyncs and CPU time of this subscriber"""
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {"name": self.name, "bytes": self.bytes_sent, "messages": self.messages,
+                "bytes_per_second": self.bytes_sent / elapsed, "resyncs": self.resyncs,
+                "cpu_ms": self.cpu_time * 1000}
+
+
+class StatePublisher:
+    """Encode the game state once per frame and send it to every subscriber"""
+
+    def __init__(self, max_buffer=MAX_SUBSCRIBER_BUFFER):
+        """
+        Initialize publisher and start its dispatcher thread
+
+        Args:
+            max_buffer (int): Bytes queued per subscriber before it is resynced
+        """
+        self.max_buffer = max_buffer
+        self.encoder = StateEncoder()
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.listener = None
+        self.publish_times = deque(maxlen=LATENCY_SAMPLES)
+        self.frames = 0
+        self.pending = deque()
+        self.dispatching = False
+        self.closed = False
+        self.condition = threading.Condition()
+        self.dispatcher = threading.Thread(target=self._dispatch, name="stream-dispatch", daemon=True)
+        self.dispatcher.start()
+
+    def add_subscriber(self, write, close, name):
+        """Add a receiver given its write and close functions"""
+        subscriber = Subscriber(write, close, name, self.max_buffer)
+        with self.lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def add_pipe(self, pipe, name="pipe"):
+        """Send the stream to a binary file object, e.g. a viewer's stdin"""
+        def write(data):
+            pipe.write(data)
+            pipe.flush()
+        return self.add_subscriber(write, pipe.close, name)
+
+    def add_socket(self, sock, name="socket"):
+        """Send the stream to a connected socket"""
+        return self.add_subscriber(sock.sendall, sock.close, name)
+
+    def listen(self, host="127.0.0.1", port=0):
+        """
+        Accept spectators on a TCP socket from a background thread
+
+        Returns:
+            int: Port listened on
+        """
+        self.listener = socket.create_server((host, port))
+        threading.Thread(target=self._accept, args=(self.listener,), name="stream-accept", daemon=True).start()
+        return self.listener.getsockname()[1]
+
+    def _accept(self, listener):
+        while True:
+            try:
+                sock, address = listener.accept()
+            except OSError:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.add_socket(sock, f"{address[0]}:{address[1]}")
+
+    def publish(self, frame, state):
+        """
+        Send a frame to every subscriber
+
+        Only the delta is encoded here, on the game thread; handing it to the
+        subscribers and encoding their keyframes is left to the dispatcher
+        thread, so the cost for the game does not grow with the spectators.
+
+        Args:
+            frame (int): Frame number
+            state (StreamState): State of the frame, from capture_state
+        """
+        start = time.perf_counter()
+        if not self.subscribers:
+            # Sin espectadores no hay nada que codificar
+            self.encoder.previous = state
+        else:
+            delta = self.encoder.delta(frame, state)
+            with self.condition:
+                self.pending.append((frame, state, delta))
+                self.condition.notify()
+        self.frames += 1
+        self.publish_times.append(time.perf_counter() - start)
+
+    def _dispatch(self):
+        """Dispatcher thread: offer each published frame to the subscribers"""
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                frames = list(self.pending)
+                self.pending.clear()
+                self.dispatching = True
+            with self.lock:
+                self.subscribers = [subscriber for subscriber in self.subscribers if not subscriber.closed]
+                subscribers = list(self.subscribers)
+            for frame, state, delta in frames:
+                keyframe_cache = []
+
+                def keyframe():
+                    if not keyframe_cache:
+                        keyframe_cache.append(self.encoder.encode(frame, state))
+                    return keyframe_cache[0]
+
+                for subscriber in subscribers:
+                    subscriber.offer(delta, keyframe)
+            with self.condition:
+                self.dispatching = False
+                self.condition.notify_all()
+
+    def flush(self):
+        """Wait until every published frame has been offered to the subscribers"""
+        with self.condition:
+            while (self.pending or self.dispatching) and self.dispatcher.is_alive():
+                self.condition.wait(0.1)
+
+    def stats(self):
+        """
+        Cost of the stream
+
+        Returns:
+            dict: Frames published, time spent on the game thread per frame
+            (see summarize_latency) and the stats of each subscriber
+        """
+        publish = summarize_latency(self.publish_times, self.frames)
+        with self.lock:
+            subscribers = [subscriber.stats() for subscriber in self.subscribers]
+        return {"frames": publish.pop("queries"), "publish": publish, "subscribers": subscribers}
+
+    def close(self):
+        """Stop accepting spectators and disconnect them after the frames already published"""
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.dispatcher.join()
+        with self.lock:
+            subscribers, self.subscribers = self.subscribers, []
+        for subscriber in subscribers:
+            subscriber.close()
+
+
+class SceneState:
+    """Scene rebuilt from the stream by a viewer"""
+
+    def __init__(self):
+        self.frame = 0
+        self.room = None
+        self.player = (0, 0)
+        self.timer = 0
+        self.points = 0
+        self.overlay = NO_OVERLAY
+        self.names = []
+        self.positions = {}
+        self.synced = False
+
+    def apply(self, body):
+        """
+        Apply one message, without its length prefix
+
+        Deltas are ignored until the first keyframe.
+
+        Raises:
+            ValueError: If the message is damaged
+        """
+        try:
+            kind, frame, mask = HEADER.unpack_from(body)
+        except struct.error:
+            raise ValueError("Truncated stream message") from None
+        if kind == MSG_DELTA and not self.synced:
+            return
+        if kind not in (MSG_KEYFRAME, MSG_DELTA):
+            raise ValueError(f"Unknown stream message type: {kind}")
+        offset = HEADER.size
+        view = memoryview(body)
+
+        def unpack(layout):
+            nonlocal offset
+            try:
+                values = layout.unpack_from(view, offset)
+            except struct.error:
+                raise ValueError("Truncated stream message") from None
+            offset += layout.size
+            return values
+
+        def string():
+            nonlocal offset
+            size, = unpack(USHORT)
+            if offset + size > len(view):
+                raise ValueError("Truncated stream message")
+            text = str(view[offset:offset + size], 'utf-8')
+            offset += size
+            return text
+
+        if mask & FIELD_ROOM:
+            self.room = string()
+        if mask & FIELD_PLAYER:
+            self.player = unpack(PLAYER)
+        if mask & FIELD_TIMER:
+            self.timer, = unpack(USHORT)
+        if mask & FIELD_POINTS:
+            self.points, = unpack(USHORT)
+        if mask & FIELD_OVERLAY:
+            overlay_kind, = unpack(BYTE)
+            self.overlay = (overlay_kind, string())
+        if mask & FIELD_NAMES:
+            count, = unpack(USHORT)
+            self.names = [string() for _ in range(count)]
+            self.positions = {name: self.positions[name] for name in self.names if name in self.positions}
+        if mask & FIELD_NPCS:
+            count, = unpack(USHORT)
+            size = count * NPC_MOVE.itemsize
+            if offset + size > len(view):
+                raise ValueError("Truncated stream message")
+            moves = np.frombuffer(view[offset:offset + size], dtype=NPC_MOVE)
+            offset += size
+            for slot, x, y in moves.tolist():
+                if slot >= len(self.names):
+                    raise ValueError(f"Unknown NPC slot in stream: {slot}")
+                self.positions[self.names[slot]] = (x / POSITION_SCALE, y / POSITION_SCALE)
+        self.frame = frame
+        self.synced = True
+
+
+def read_messages(stream):
+    """
+    Yield the messages of a binary stream, without their length prefix
+
+    Args:
+        stream: Binary file object, e.g. a socket's makefile('rb') or stdin
+    """
+    while True:
+        prefix = stream.read(LENGTH.size)
+        if len(prefix) < LENGTH.size:
+            return
+        size, = LENGTH.unpack(prefix)
+        body = stream.read(size)
+        if len(body) < size:
+            return
+        yield body
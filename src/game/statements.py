@@ -0,0 +1,118 @@
+"""
+Suspect statements and their logical meaning
+
+A statement is a claim a suspect makes about the others. Innocent suspects
+always tell the truth and the killer may lie, so a statement by ``speaker``
+means ``Implies(Not(speaker), claim)``, where the suspects' Bool variables
+are true for the killer. Exactly one suspect is the killer.
+"""
+from z3 import And, Bool, Implies, Not, Or, PbEq
+
+# Claims, with the suspects they mention
+CLAIM_INNOCENT = 'innocent'   # a is not the killer
+CLAIM_GUILTY = 'guilty'       # a is the killer
+CLAIM_EITHER = 'either'       # the killer is a or b
+CLAIM_ALIBI = 'alibi'         # a and b were together, neither is the killer
+CLAIMS = (CLAIM_INNOCENT, CLAIM_GUILTY, CLAIM_EITHER, CLAIM_ALIBI)
+PAIR_CLAIMS = (CLAIM_EITHER, CLAIM_ALIBI)
+
+# Spanish lines used when a statement has no text of its own
+CLAIM_TEXTS = {
+    CLAIM_INNOCENT: "{a} estuvo conmigo toda la noche, no pudo ser.",
+    CLAIM_GUILTY: "Vi a {a} salir de la habitación de Alex.",
+    CLAIM_EITHER: "Solo {a} o {b} pudieron llegar a la habitación.",
+    CLAIM_ALIBI: "{a} y {b} estuvieron juntos en la sala.",
+}
+
+
+class Statement:
+    """One claim made by a suspect"""
+
+    __slots__ = ('speaker', 'claim', 'a', 'b', 'text')
+
+    def __init__(self, speaker, claim, a, b=None, text=None):
+        """
+        Initialize statement
+
+        Args:
+            speaker (str): Suspect making the claim
+            claim (str): One of CLAIMS
+            a (str): Suspect the claim is about
+            b (str): Second suspect, for CLAIM_EITHER and CLAIM_ALIBI
+            text (str): Line the speaker says, from CLAIM_TEXTS if None
+        """
+        if claim not in CLAIMS:
+            raise ValueError(f"Unknown claim: {claim}")
+        if (b is None) == (claim in PAIR_CLAIMS):
+            raise ValueError(f"Claim {claim} needs {'two suspects' if claim in PAIR_CLAIMS else 'one suspect'}")
+        self.speaker = speaker
+        self.claim = claim
+        self.a = a
+        self.b = b
+        self.text = text if text is not None else CLAIM_TEXTS[claim].format(a=a, b=b)
+
+    @property
+    def key(self):
+        """Hashable identity of the claim, ignoring the text and the order of a pair"""
+        if self.b is not None and self.b < self.a:
+            return self.speaker, self.claim, self.b, self.a
+        return self.speaker, self.claim, self.a, self.b
+
+    def __eq__(self, other):
+        return isinstance(other, Statement) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"Statement{self.key}"
+
+    def is_true(self, killer):
+        """Check if the claim holds when a given suspect is the killer"""
+        if self.claim == CLAIM_INNOCENT:
+            return killer != self.a
+        if self.claim == CLAIM_GUILTY:
+            return killer == self.a
+        if self.claim == CLAIM_EITHER:
+            return killer in (self.a, self.b)
+        return killer not in (self.a, self.b)
+
+    def to_z3(self, variables):
+        """
+        Build the constraint of the statement
+
+        Args:
+            variables (dict): z3 Bool of each suspect, true for the killer
+        """
+        a = variables[self.a]
+        if self.claim == CLAIM_INNOCENT:
+            claim = Not(a)
+        elif self.claim == CLAIM_GUILTY:
+            claim = a
+        elif self.claim == CLAIM_EITHER:
+            claim = Or(a, variables[self.b])
+        else:
+            claim = And(Not(a), Not(variables[self.b]))
+        return Implies(Not(variables[self.speaker]), claim)
+
+    def to_dict(self):
+        """Statement as JSON-friendly data"""
+        data = {"speaker": self.speaker, "claim": self.claim, "a": self.a, "text": self.text}
+        if self.b is not None:
+            data["b"] = self.b
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a statement from to_dict data"""
+        return cls(data["speaker"], data["claim"], data["a"], data.get("b"), data.get("text"))
+
+
+def suspect_variables(suspects):
+    """Create the z3 Bool of each suspect, true for the killer"""
+    return {name: Bool(name) for name in suspects}
+
+
+def exactly_one_killer(variables):
+    """Constraint saying exactly one suspect is the killer"""
+    return PbEq([(variable, 1) for variable in variables.values()], 1)
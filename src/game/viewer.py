@@ -0,0 +1,218 @@
+"""
+Spectator viewer
+
+A separate process that rebuilds the game screen from the state stream of
+a running game (see state_stream). It only receives the changes of each
+frame and draws them with the game's own tile and character images: the
+room tiles are drawn once per room into a background surface, and each
+frame blits the background, the characters, the player, the labels and
+the overlay.
+
+    python -m src.game.viewer                 connect to localhost:STREAM_PORT
+    python -m src.game.viewer --stdin         read the stream from a pipe
+
+Rooms are drawn from game_maps; rooms the game loaded at runtime are shown
+without tiles.
+"""
+import argparse
+import os
+import queue
+import socket
+import sys
+import threading
+
+import pygame
+
+from .camera import Camera
+from .game_constants import BLACK, SCREEN_HEIGHT, SCREEN_WIDTH, STREAM_PORT, TILE_SIZE, WHITE
+from .game_maps import ALEXS_ROOM, MAIN_MAP, OUTSIDE_MAP, TILE_TYPES
+from .state_stream import (OVERLAY_BODY, OVERLAY_DIALOGUE, OVERLAY_KILLER, OVERLAY_LOST, OVERLAY_NONE,
+                           OVERLAY_WON, SceneState, read_messages)
+from ..utils.resource_manager import ResourceManager
+
+ROOMS = {'main': MAIN_MAP, 'alexs_room': ALEXS_ROOM, 'outside': OUTSIDE_MAP}
+FLOORS = {'outside': 'outside.png', 'alexs_room': 'dark_floor.png'}
+TILE_IMAGES = {
+    TILE_TYPES['WALL']: 'wall.png',
+    TILE_TYPES['DOOR']: 'door.png',
+    TILE_TYPES['TABLE']: 'table.png',
+    TILE_TYPES['CHAIR']: 'chair.png',
+    TILE_TYPES['BOOKSHELF']: 'bookshelf.png',
+    TILE_TYPES['WARDROBE']: 'wardrobe.png',
+    TILE_TYPES['PLANT']: 'plant.png',
+}
+CARD_TITLES = {
+    OVERLAY_KILLER: "¡Misterio Resuelto!",
+    OVERLAY_WON: "¡Felicidades!",
+    OVERLAY_LOST: "¡Has Perdido!",
+}
+
+
+class Viewer:
+    def __init__(self, stream):
+        """
+        Initialize viewer and start reading the stream
+
+        Args:
+            stream: Binary file object the state stream is read from
+        """
+        pygame.init()
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("El Secreto de la Mansión Oscura - Espectador")
+        self.clock = pygame.time.Clock()
+        assets_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                   "assets")
+        self.resources = ResourceManager(assets_path)
+        self.images = {}
+        self.fonts = {}
+        self.camera = Camera((SCREEN_WIDTH, SCREEN_HEIGHT), TILE_SIZE)
+        self.background = None
+        self.background_key = None
+        self.scene = SceneState()
+        self.messages = queue.Queue()
+        self.reader = threading.Thread(target=self._read, args=(stream,), name="viewer-reader", daemon=True)
+        self.reader.start()
+
+    def _read(self, stream):
+        """Reader thread: queue each message until the stream ends"""
+        try:
+            for message in read_messages(stream):
+                self.messages.put(message)
+        except OSError:
+            pass
+        self.messages.put(None)
+
+    def image(self, name, size=(TILE_SIZE, TILE_SIZE)):
+        """Get an asset image at a size, loading and scaling it only once"""
+        key = (name, size)
+        image = self.images.get(key)
+        if image is None:
+            image = self.resources.load_image(name, scale=size).convert_alpha()
+            self.images[key] = image
+        return image
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
+
+    def receive(self):
+        """
+        Apply the messages that arrived since the last frame
+
+        Returns:
+            bool: False once the stream has ended
+        """
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                return True
+            if message is None:
+                return False
+            self.scene.apply(message)
+
+    def draw_background(self):
+        """Draw the floor and tiles of the room, only when the room or camera changes"""
+        scene = self.scene
+        grid = ROOMS.get(scene.room)
+        if grid is not None:
+            self.camera.set_world(len(grid[0]), len(grid))
+            self.camera.follow(*scene.player)
+        key = (scene.room, self.camera.origin)
+        if key == self.background_key:
+            return
+        self.background_key = key
+        self.background = self.image(FLOORS.get(scene.room, 'floor.png'), (SCREEN_WIDTH, SCREEN_HEIGHT)).copy()
+        if grid is None:
+            return
+        rows, columns = self.camera.visible_slices()
+        for y in range(rows.start, min(rows.stop, len(grid))):
+            for x in range(columns.start, min(columns.stop, len(grid[0]))):
+                tile = grid[y][x]
+                pos = self.camera.to_screen(x, y)
+                if tile in TILE_IMAGES:
+                    self.background.blit(self.image(TILE_IMAGES[tile]), pos)
+                elif tile == TILE_TYPES['BODY']:
+                    self.background.blit(self.image('blood.png', (TILE_SIZE * 3, TILE_SIZE * 3)),
+                                         (pos[0] - TILE_SIZE, pos[1] - TILE_SIZE))
+                    self.background.blit(self.image('body.png', (TILE_SIZE * 2, TILE_SIZE * 2)),
+                                         (pos[0] - TILE_SIZE // 2, pos[1] - TILE_SIZE // 2))
+
+    def draw_text(self, text, size, center, color=WHITE):
+        surface = self.font(size).render(text, True, color)
+        self.screen.blit(surface, surface.get_rect(center=center))
+
+    def draw(self):
+        """Draw the scene as the game shows it"""
+        scene = self.scene
+        self.screen.fill(BLACK)
+        if not scene.synced:
+            self.draw_text("Esperando la partida...", 28, (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2))
+            return
+        self.draw_background()
+        self.screen.blit(self.background, (0, 0))
+        if scene.room == 'main':
+            for name, (x, y) in scene.positions.items():
+                pos = self.camera.to_screen(x, y)
+                self.screen.blit(self.image(f"{name.lower()}.png"), pos)
+                self.draw_text(name, 20, (pos[0] + TILE_SIZE / 2, pos[1] - 10))
+        self.screen.blit(self.image('player.png'), self.camera.to_screen(*scene.player))
+        minutes, seconds = divmod(scene.timer, 60)
+        self.draw_text(f"Puntos: {scene.points}", 20, (SCREEN_WIDTH - 60, 30))
+        self.draw_text(f"Tiempo: {minutes}:{seconds:02d}", 20, (SCREEN_WIDTH - 60, 60))
+        self.draw_overlay()
+
+    def draw_overlay(self):
+        kind, text = self.scene.overlay
+        if kind == OVERLAY_NONE:
+            return
+        if kind == OVERLAY_BODY:
+            self.screen.blit(self.image('body.png', (SCREEN_WIDTH, SCREEN_HEIGHT)), (0, 0))
+            return
+        if kind == OVERLAY_DIALOGUE:
+            box = pygame.Rect(100, SCREEN_HEIGHT - 120, SCREEN_WIDTH - 200, 80)
+            pygame.draw.rect(self.screen, WHITE, box)
+            pygame.draw.rect(self.screen, BLACK, box, 2)
+            self.draw_text(text, 24, box.center, BLACK)
+            return
+        card = pygame.Rect(SCREEN_WIDTH / 2 - 200, SCREEN_HEIGHT / 2 - 150, 400, 300)
+        pygame.draw.rect(self.screen, WHITE, card)
+        pygame.draw.rect(self.screen, BLACK, card, 2)
+        self.draw_text(CARD_TITLES.get(kind, ""), 36, (card.centerx, card.y + 30), BLACK)
+        if text:
+            self.draw_text(text, 24, (card.centerx, card.y + 150), BLACK)
+
+    def run(self):
+        """Draw the stream until it ends or the window is closed"""
+        running = True
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+            if not self.receive():
+                running = False
+            self.draw()
+            pygame.display.flip()
+            self.clock.tick(60)
+        pygame.quit()
+
+
+def main(argv=None):
+    """Watch a running game"""
+    parser = argparse.ArgumentParser(description="Watch a game through its state stream")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=STREAM_PORT)
+    parser.add_argument("--stdin", action="store_true", help="read the stream from stdin")
+    args = parser.parse_args(argv)
+    if args.stdin:
+        stream = sys.stdin.buffer
+    else:
+        stream = socket.create_connection((args.host, args.port)).makefile('rb')
+    Viewer(stream).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Storm over the mansion
+
+Rain falls over the rooms in RAIN_ROOMS and lightning flashes everywhere,
+lighting up the dark rooms through their windows. Raindrops are NumPy
+arrays of positions and speeds, moved in one vectorized update. They are
+drawn as short streaks by writing all their pixels at once into the
+surface through pygame.surfarray, clearing only last frame's streaks, so
+thousands of drops cost a few array operations per frame.
+
+The number of drops follows the frame time: record_frame_time() takes the
+milliseconds the last frame spent working, and when the average goes over
+RAIN_FRAME_BUDGET_MS the rain thins out, down to MIN_RAIN_DROPS; with time
+to spare it grows back up to the capacity.
+"""
+import numpy as np
+import pygame
+
+from .game_constants import (LIGHTNING_CHANCE, MAX_RAIN_DROPS, MIN_RAIN_DROPS, RAIN_FRAME_BUDGET_MS)
+
+RAIN_COLOR = (170, 185, 210)
+RAIN_ALPHA = 150
+STREAK_LENGTH = 8
+WIND = 0.15  # Horizontal pixels per pixel of fall
+FALL_SPEED = (10.0, 18.0)  # Pixels per frame, slowest and fastest drops
+# Intensidad de un relámpago en cada fotograma: dos destellos y un apagado lento
+LIGHTNING_FRAMES = (170, 60, 140, 110, 80, 55, 35, 20, 10)
+INDOOR_FLASH = 0.4  # Part of a flash seen through the windows
+BUDGET_AVERAGING = 0.1  # Weight of the newest frame time in the average
+BUDGET_INTERVAL = 30  # Frames between changes of the number of drops
+
+
+class Storm:
+    def __init__(self, surface, capacity=MAX_RAIN_DROPS, budget_ms=RAIN_FRAME_BUDGET_MS,
+                 lightning_chance=LIGHTNING_CHANCE, seed=None):
+        """
+        Initialize storm
+
+        Args:
+            surface (Surface): Per-pixel alpha surface covering the view, drawn over the room
+            capacity (int): Most raindrops drawn
+            budget_ms (float): Frame time above which the rain thins out
+            lightning_chance (float): Chance of a flash starting each frame
+            seed (int): Seed for drops and lightning
+        """
+        self.surface = surface
+        self.width, self.height = surface.get_size()
+        self.capacity = capacity
+        self.budget_ms = budget_ms
+        self.lightning_chance = lightning_chance
+        self.count = capacity
+        self.rng = np.random.default_rng(seed)
+        self.frame_ms = None
+        self.frames = 0
+        self.flash = None
+        self.flashed = False
+        self.shown = False
+        self.drawn = np.empty(0, dtype=np.int32)
+        surface.fill(RAIN_COLOR + (0,))
+
+        self.x = self.rng.uniform(0, self.width, capacity).astype(np.float32)
+        self.y = self.rng.uniform(0, self.height, capacity).astype(np.float32)
+        self.speed = self.rng.uniform(*FALL_SPEED, capacity).astype(np.float32)
+        # Píxeles de un trazo, detrás de la gota en la dirección en que cae
+        steps = np.arange(STREAK_LENGTH)
+        self.streak_x = -np.rint(steps * WIND).astype(np.int32)
+        self.streak_offsets = -steps.astype(np.int32) * self.width + self.streak_x
+
+    def update(self, raining):
+        """
+        Advance the storm one frame and redraw its surface
+
+        Only the pixels of last frame's streaks are cleared, unless a flash
+        lit the whole surface.
+
+        Args:
+            raining (bool): Whether the current room is outdoors; indoors only
+                part of the lightning is seen, through the windows
+
+        Returns:
+            bool: True if the surface changed
+        """
+        flash = self._lightning()
+        if not raining:
+            flash = int(flash * INDOOR_FLASH)
+        if not raining and not flash and not self.shown:
+            return False
+
+        # Superficie de 32 bits sin relleno entre filas: los píxeles son un array plano, fila a fila
+        pixels = pygame.surfarray.pixels2d(self.surface).T.reshape(-1)
+        if flash or self.flashed:
+            pixels.fill(self._pixel(flash))
+        else:
+            pixels[self.drawn] = self._pixel(0)
+        self.flashed = flash > 0
+        if raining:
+            self._fall()
+            self.drawn = self._streaks()
+            pixels[self.drawn] = self._pixel(max(RAIN_ALPHA, flash))
+        else:
+            self.drawn = self.drawn[:0]
+        del pixels
+        self.shown = raining or self.flashed
+        return True
+
+    def _pixel(self, alpha):
+        """Pixel value of the rain color with an alpha, as stored in the surface"""
+        return self.surface.map_rgb(RAIN_COLOR + (alpha,)) & 0xFFFFFFFF
+
+    def _streaks(self):
+        """Flat pixel indices of the streaks of the drops fully inside the view"""
+        n = self.count
+        x = self.x[:n].astype(np.int32)
+        y = self.y[:n].astype(np.int32)
+        inside = (x >= -self.streak_x[-1]) & (x < self.width) & (y >= STREAK_LENGTH - 1) & (y < self.height)
+        return ((y * self.width + x)[inside, None] + self.streak_offsets).ravel()
+
+    def _fall(self):
+        """Move every drop, and drops that left the view back to the top"""
+        n = self.count
+        self.y[:n] += self.speed[:n]
+        self.x[:n] += self.speed[:n] * WIND
+        fallen = np.flatnonzero(self.y[:n] >= self.height + STREAK_LENGTH)
+        if len(fallen):
+            self.y[fallen] -= self.height + STREAK_LENGTH
+            self.x[fallen] = self.rng.uniform(-self.height * WIND, self.width, len(fallen))
+        # El viento las saca por la derecha: volver a entrar por la izquierda
+        self.x[:n][self.x[:n] >= self.width] -= self.width
+
+    def _lightning(self):
+        """Intensity of the lightning this frame, 0 if none"""
+        if self.flash is None:
+            if self.rng.random() >= self.lightning_chance:
+                return 0
+            self.flash = 0
+        intensity = LIGHTNING_FRAMES[self.flash]
+        self.flash += 1
+        if self.flash == len(LIGHTNING_FRAMES):
+            self.flash = None
+        return intensity
+
+    def record_frame_time(self, milliseconds):
+        """
+        Adapt the number of drops to the time frames take
+
+        Args:
+            milliseconds (float): Time the last frame spent working, without waiting
+        """
+        if self.frame_ms is None:
+            self.frame_ms = float(milliseconds)
+        else:
+            self.frame_ms += (milliseconds - self.frame_ms) * BUDGET_AVERAGING
+        self.frames += 1
+        if self.frames % BUDGET_INTERVAL:
+            return
+        if self.frame_ms > self.budget_ms:
+            self.count = max(MIN_RAIN_DROPS, int(self.count * 0.75))
+        elif self.frame_ms < self.budget_ms * 0.6:
+            self.count = min(self.capacity, int(self.count * 1.1) + 1)
@@ -0,0 +1,233 @@
+"""
+Chunked world storage for very large rooms
+
+A world is a 2D grid of tile ids stored on disk chunk by chunk
+(CHUNK_SIZE x CHUNK_SIZE tiles) in a memory-mapped .npy file, with its size
+in a small JSON file next to it. Only the most recently used chunks stay in
+memory, and a background thread loads the chunks around the camera before
+they are needed. A ChunkedWorld is indexed like the room lists
+(``world[y][x]``) and sliced like a 2D array (``world[y0:y1, x0:x1]``), so
+the rest of the game uses it as any other room map.
+"""
+import json
+import queue
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .game_maps import TILE_TYPES
+
+CHUNK_SIZE = 32
+MAX_RESIDENT_CHUNKS = 64
+META_SUFFIX = ".json"
+
+
+def save_world(path, tiles, chunk_size=CHUNK_SIZE, fill=TILE_TYPES['WALL']):
+    """
+    Write a 2D tile grid to a chunked world file
+
+    Args:
+        path (str): Path of the .npy chunk file; the size goes to path + META_SUFFIX
+        tiles (array): Tile ids, one row per list or array row
+        chunk_size (int): Tiles per chunk side
+        fill (int): Tile used to pad the last row and column of chunks
+    """
+    tiles = np.asarray(tiles, dtype=np.uint8)
+    height, width = tiles.shape
+    chunks_y = -(-height // chunk_size)
+    chunks_x = -(-width // chunk_size)
+    padded = np.full((chunks_y * chunk_size, chunks_x * chunk_size), fill, dtype=np.uint8)
+    padded[:height, :width] = tiles
+
+    store = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8,
+                                      shape=(chunks_y, chunks_x, chunk_size, chunk_size))
+    # (rows, columns) -> (chunk row, chunk column, row in chunk, column in chunk)
+    store[:] = padded.reshape(chunks_y, chunk_size, chunks_x, chunk_size).swapaxes(1, 2)
+    store.flush()
+    del store
+
+    with open(path + META_SUFFIX, "w", encoding="utf-8") as meta_file:
+        json.dump({"width": width, "height": height, "chunk_size": chunk_size}, meta_file)
+
+
+class WorldRow:
+    """One row of a ChunkedWorld, so ``world[y][x]`` reads a single tile"""
+
+    __slots__ = ('world', 'y')
+
+    def __init__(self, world, y):
+        self.world = world
+        self.y = y
+
+    def __getitem__(self, x):
+        return self.world[self.y, x]
+
+    def __len__(self):
+        return self.world.width
+
+
+class ChunkedWorld:
+    ndim = 2
+    dtype = np.dtype(np.uint8)
+
+    def __init__(self, path, max_resident=MAX_RESIDENT_CHUNKS):
+        """
+        Open a chunked world file
+
+        Args:
+            path (str): Path given to save_world
+            max_resident (int): Chunks kept in memory before the least recently used is dropped
+        """
+        with open(path + META_SUFFIX, encoding="utf-8") as meta_file:
+            meta = json.load(meta_file)
+        self.width = meta["width"]
+        self.height = meta["height"]
+        self.chunk_size = meta["chunk_size"]
+        self.store = np.load(path, mmap_mode='r')
+        self.max_resident = max_resident
+        self.loads = 0
+        self._chunks = OrderedDict()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._requests = queue.SimpleQueue()
+        self._loader = threading.Thread(target=self._load_requested, name="world-loader", daemon=True)
+        self._loader.start()
+
+    @property
+    def shape(self):
+        """(height, width) in tiles"""
+        return self.height, self.width
+
+    @property
+    def resident_chunks(self):
+        """Number of chunks currently in memory"""
+        return len(self._chunks)
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            if not 0 <= key < self.height:
+                raise IndexError(f"Row {key} outside the world")
+            return WorldRow(self, key)
+        y, x = key
+        if isinstance(y, slice) or isinstance(x, slice):
+            return self._area(y, x)
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"Tile {(x, y)} outside the world")
+        size = self.chunk_size
+        return self.chunk(x // size, y // size)[y % size, x % size]
+
+    def chunk(self, chunk_x, chunk_y):
+        """Get the tiles of a chunk, reading it from disk if it is not resident"""
+        key = (chunk_x, chunk_y)
+        with self._lock:
+            data = self._chunks.get(key)
+            if data is not None:
+                self._chunks.move_to_end(key)
+                return data
+        data = np.array(self.store[chunk_y, chunk_x])
+        with self._lock:
+            return self._keep(key, data)
+
+    def _keep(self, key, data):
+        """Make a loaded chunk resident, evicting the least recently used ones"""
+        resident = self._chunks.get(key)
+        if resident is not None:
+            # Loaded by the other thread in the meantime
+            self._chunks.move_to_end(key)
+            return resident
+        self._chunks[key] = data
+        self.loads += 1
+        while len(self._chunks) > self.max_resident:
+            self._chunks.popitem(last=False)
+        return data
+
+    def _area(self, rows, columns):
+        """Copy a rectangle of tiles, assembled from the chunks it covers"""
+        if not isinstance(rows, slice):
+            rows = slice(rows, rows + 1)
+        if not isinstance(columns, slice):
+            columns = slice(columns, columns + 1)
+        y0, y1, y_step = rows.indices(self.height)
+        x0, x1, x_step = columns.indices(self.width)
+        if y_step != 1 or x_step != 1:
+            raise IndexError("Only contiguous slices of the world are supported")
+        y1, x1 = max(y0, y1), max(x0, x1)
+        area = np.empty((y1 - y0, x1 - x0), dtype=np.uint8)
+        size = self.chunk_size
+        for chunk_y in range(y0 // size, -(-y1 // size)):
+            top = max(y0, chunk_y * size)
+            bottom = min(y1, (chunk_y + 1) * size)
+            for chunk_x in range(x0 // size, -(-x1 // size)):
+                left = max(x0, chunk_x * size)
+                right = min(x1, (chunk_x + 1) * size)
+                data = self.chunk(chunk_x, chunk_y)
+                area[top - y0:bottom - y0, left - x0:right - x0] = \
+                    data[top - chunk_y * size:bottom - chunk_y * size,
+                         left - chunk_x * size:right - chunk_x * size]
+        return area
+
+    def sample(self, step):
+        """
+        Read every step-th tile of every step-th row, for overviews of the whole world
+
+        The tiles are gathered straight from the file, so the resident chunks
+        around the camera are kept.
+
+        Args:
+            step (int): Tiles between samples along each side
+
+        Returns:
+            ndarray: Sampled tile ids, one row per sampled row
+        """
+        size = self.chunk_size
+        ys = np.arange(0, self.height, step)[:, None]
+        xs = np.arange(0, self.width, step)[None, :]
+        return np.asarray(self.store[ys // size, xs // size, ys % size, xs % size], dtype=np.uint8)
+
+    def prefetch(self, rows, columns):
+        """Ask the background thread to load the chunks under an area"""
+        size = self.chunk_size
+        y0, y1, _ = rows.indices(self.height)
+        x0, x1, _ = columns.indices(self.width)
+        with self._lock:
+            for chunk_y in range(y0 // size, -(-y1 // size)):
+                for chunk_x in range(x0 // size, -(-x1 // size)):
+                    key = (chunk_x, chunk_y)
+                    if key not in self._chunks and key not in self._pending:
+                        self._pending.add(key)
+                        self._requests.put(key)
+
+    def _load_requested(self):
+        """Background thread loading the prefetched chunks"""
+        while True:
+            key = self._requests.get()
+            if key is None:
+                return
+            if isinstance(key, threading.Event):
+                key.set()
+                continue
+            with self._lock:
+                resident = key in self._chunks
+            if not resident:
+                data = np.array(self.store[key[1], key[0]])
+                with self._lock:
+                    self._keep(key, data)
+            with self._lock:
+                self._pending.discard(key)
+
+    def wait_for_prefetch(self, timeout=5.0):
+        """Block until every requested chunk was loaded, mostly for tests"""
+        done = threading.Event()
+        self._requests.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Stop the loader thread and release the memory map"""
+        self._requests.put(None)
+        self._loader.join()
+        self._chunks.clear()
+        self.store = None
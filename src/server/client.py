@@ -0,0 +1,158 @@
+"""
+Test client of the game server
+
+GameClient sends the JSON requests of src.server.server and reads their
+answers, over a TCP connection or over the stdin/stdout of a server it
+starts itself. Run as a script it plays one session from the keyboard:
+
+    python -m src.server.client            server on localhost:8765
+    python -m src.server.client --spawn    private server over stdin/stdout
+
+Commands: w/a/s/d move, e talks, state, stats, restart, quit.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from .server import DEFAULT_HOST, DEFAULT_PORT
+
+MOVES = {"w": (0, -1), "s": (0, 1), "a": (-1, 0), "d": (1, 0)}
+
+
+class GameClient:
+    def __init__(self, reader, writer, process=None):
+        """
+        Initialize client on open streams
+
+        Args:
+            reader (StreamReader): Answers from the server
+            writer (StreamWriter): Requests to the server
+            process (Process): Server started by spawn(), stopped by close()
+        """
+        self.reader = reader
+        self.writer = writer
+        self.process = process
+        self.session = None
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Connect to a running server"""
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    @classmethod
+    async def spawn(cls):
+        """Start a private server talking over its stdin and stdout"""
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "src.server.server", "--stdio",
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE)
+        return cls(process.stdout, process.stdin, process)
+
+    async def request(self, op, **fields):
+        """
+        Send a request and wait for its answer
+
+        Raises:
+            ConnectionError: If the server closed the connection
+        """
+        self.writer.write((json.dumps({"op": op, **fields}) + "\n").encode("utf-8"))
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection")
+        return json.loads(line)
+
+    async def new_game(self):
+        """Start a session and address the next requests to it"""
+        answer = await self.request("new")
+        self.session = answer["session"]
+        return answer
+
+    async def move(self, dx, dy):
+        return await self.request("move", session=self.session, dx=dx, dy=dy)
+
+    async def interact(self):
+        return await self.request("interact", session=self.session)
+
+    async def state(self):
+        return await self.request("state", session=self.session)
+
+    async def restart(self):
+        return await self.request("restart", session=self.session)
+
+    async def stats(self):
+        return await self.request("stats")
+
+    async def close(self):
+        """Close the session and the connection"""
+        if self.session is not None:
+            await self.request("close", session=self.session)
+            self.session = None
+        self.writer.close()
+        if self.process is not None:
+            await self.process.wait()
+
+
+def _print_answer(answer):
+    if not answer.get("ok"):
+        print(f"Error: {answer.get('error')}")
+        return
+    for event in answer.get("events", ()):
+        if event["type"] == "dialogue":
+            print(f"{event['speaker']}: {event['text']}")
+        elif event["type"] == "killer":
+            print(f"¡Misterio resuelto! {event['explanation']}")
+        elif event["type"] == "won":
+            print(f"Puntos: {event['points']}")
+        elif event["type"] == "lost":
+            print("¡Has perdido! Se acabó el tiempo")
+        elif event["type"] == "room":
+            print(f"Entras en {event['room']}")
+    state = answer.get("state")
+    if state is not None:
+        print(f"[{state['room']} {state['player']}] tiempo {state['timer']} "
+              f"puntos {state['points']} pistas {state['clues']}")
+    elif "stats" in answer:
+        print(answer["stats"])
+
+
+async def _play(args):
+    client = await (GameClient.spawn() if args.spawn else GameClient.connect(args.host, args.port))
+    try:
+        _print_answer(await client.new_game())
+        loop = asyncio.get_running_loop()
+        while True:
+            command = (await loop.run_in_executor(None, sys.stdin.readline)).strip().lower()
+            if command in ("", "quit", "q"):
+                break
+            if command in MOVES:
+                answer = await client.move(*MOVES[command])
+            elif command == "e":
+                answer = await client.interact()
+            elif command == "state":
+                answer = await client.state()
+            elif command == "stats":
+                answer = await client.stats()
+            elif command == "restart":
+                answer = await client.restart()
+            else:
+                print("Comandos: w/a/s/d, e, state, stats, restart, quit")
+                continue
+            _print_answer(answer)
+    finally:
+        await client.close()
+
+
+def main(argv=None):
+    """Play a session of the game server from the terminal"""
+    parser = argparse.ArgumentParser(description="Play the mystery on a game server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--spawn", action="store_true", help="start a private server over stdin/stdout")
+    args = parser.parse_args(argv)
+    asyncio.run(_play(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Multi-session game server
+
+One asyncio task ticks every active session SERVER_TICK_RATE times per
+second. A session that gets no command for SESSION_IDLE_TIMEOUT seconds,
+or whose game is over, is parked: it keeps its state but is not ticked
+until its next command, so idle players cost no CPU.
+
+Clients talk newline-delimited JSON, over a local TCP socket or over
+stdin/stdout. Each request is an object with an "op" and, except for
+"new" and "stats", the "session" it addresses:
+
+    {"op": "new"}                                 start a game
+    {"op": "move", "session": 1, "dx": 1, "dy": 0}
+    {"op": "interact", "session": 1}
+    {"op": "state", "session": 1}
+    {"op": "restart", "session": 1}               new game after losing
+    {"op": "close", "session": 1}
+    {"op": "stats"}                               sessions and tick time
+
+Every answer has "ok". Session answers carry the session "state" and the
+"events" queued since the previous answer (dialogue lines, room changes,
+the killer reveal, a won round, a lost game); errors carry "error". A
+connection can only address the sessions it created, and they are closed
+when it disconnects.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+
+from ..game.game_constants import SERVER_TICK_RATE, SESSION_IDLE_TIMEOUT
+from ..game.solver_session import LATENCY_SAMPLES, summarize_latency
+from ..utils.logger import get_logger
+from .session import GameSession, SessionWorld
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_LAG_TICKS = 30  # Frames the scheduler may fall behind before skipping them
+
+
+class RequestError(Exception):
+    """Request that cannot be served, reported to the client"""
+
+
+class GameServer:
+    def __init__(self, world=None, tick_rate=SERVER_TICK_RATE, idle_timeout=SESSION_IDLE_TIMEOUT):
+        """
+        Initialize server
+
+        Args:
+            world (SessionWorld): Data shared by the sessions, loaded if None
+            tick_rate (int): Session frames per second
+            idle_timeout (float): Seconds without commands before a session is parked
+        """
+        self.logger = get_logger()
+        self.world = world or SessionWorld()
+        self.tick_rate = tick_rate
+        self.idle_ticks = int(idle_timeout * tick_rate)
+        self.sessions = {}
+        self.active = {}
+        self.next_id = 1
+        self.tick_count = 0
+        self.tick_times = deque(maxlen=LATENCY_SAMPLES)
+        self.scheduler = None
+
+    # Sessions
+
+    def create_session(self):
+        """Start a new game session and tick it"""
+        session = GameSession(self.next_id, self.world)
+        self.next_id += 1
+        self.sessions[session.session_id] = session
+        self.wake(session)
+        return session
+
+    def close_session(self, session_id):
+        """Forget a session"""
+        self.sessions.pop(session_id, None)
+        self.active.pop(session_id, None)
+
+    def wake(self, session):
+        """Mark a session as used now, ticking it again if it was parked"""
+        session.last_active = self.tick_count
+        if session.is_playing:
+            self.active[session.session_id] = session
+
+    def tick(self):
+        """Advance every active session one frame and park the idle ones"""
+        start = time.perf_counter()
+        self.tick_count += 1
+        idle_since = self.tick_count - self.idle_ticks
+        parked = []
+        for session_id, session in self.active.items():
+            session.tick()
+            if not session.is_playing or session.last_active < idle_since:
+                parked.append(session_id)
+        for session_id in parked:
+            del self.active[session_id]
+        self.tick_times.append(time.perf_counter() - start)
+
+    async def run_scheduler(self):
+        """Tick the sessions at the tick rate until cancelled"""
+        loop = asyncio.get_running_loop()
+        period = 1 / self.tick_rate
+        next_tick = loop.time()
+        while True:
+            self.tick()
+            next_tick += period
+            delay = next_tick - loop.time()
+            if delay < -MAX_LAG_TICKS * period:
+                # Demasiado atrasado: saltar frames en vez de ponerse al día de golpe
+                self.logger.warning("Server fell %.0f ms behind, skipping frames", -delay * 1000)
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(max(0, delay))
+
+    def stop(self):
+        """Stop ticking the sessions"""
+        if self.scheduler is not None:
+            self.scheduler.cancel()
+            self.scheduler = None
+
+    def stats(self):
+        """Number of sessions and time spent per tick"""
+        tick = summarize_latency(self.tick_times, self.tick_count)
+        return {"sessions": len(self.sessions), "active": len(self.active), "ticks": tick.pop("queries"),
+                "tick": tick}
+
+    # Protocol
+
+    def handle(self, request, owned):
+        """
+        Serve one request
+
+        Args:
+            request (dict): Decoded request
+            owned (set): IDs of the sessions of the connection, updated by new and close
+
+        Returns:
+            dict: Answer
+        """
+        op = request.get("op")
+        if op == "new":
+            session = self.create_session()
+            owned.add(session.session_id)
+            return self._answer(session)
+        if op == "stats":
+            return {"ok": True, "stats": self.stats()}
+
+        session_id = request.get("session")
+        # bool es subclase de int, y las listas u objetos no se pueden buscar en un set
+        if not isinstance(session_id, int) or isinstance(session_id, bool):
+            raise RequestError(f"Invalid session: {session_id!r}")
+        if session_id not in owned or session_id not in self.sessions:
+            raise RequestError(f"Unknown session: {session_id}")
+        session = self.sessions[session_id]
+        if op == "move":
+            dx, dy = request.get("dx", 0), request.get("dy", 0)
+            if not isinstance(dx, int) or not isinstance(dy, int) or abs(dx) + abs(dy) != 1:
+                raise RequestError("move needs dx and dy for one step")
+            if session.is_playing:
+                session.move_player(dx, dy)
+        elif op == "interact":
+            if session.is_playing:
+                session.interact()
+        elif op == "restart":
+            session.restart()
+        elif op == "close":
+            self.close_session(session_id)
+            owned.discard(session_id)
+            return {"ok": True, "session": session_id}
+        elif op != "state":
+            raise RequestError(f"Unknown op: {op}")
+        self.wake(session)
+        return self._answer(session)
+
+    def _answer(self, session):
+        return {"ok": True, "session": session.session_id, "state": session.describe(),
+                "events": session.take_events()}
+
+    def handle_line(self, line, owned):
+        """Serve one JSON request line and encode the answer"""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise RequestError("Request must be a JSON object")
+            answer = self.handle(request, owned)
+        except RequestError as e:
+            answer = {"ok": False, "error": str(e)}
+        except ValueError as e:
+            # JSON mal formado o bytes que no son UTF-8
+            answer = {"ok": False, "error": f"Invalid JSON: {e}"}
+        return json.dumps(answer, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    async def serve_lines(self, reader, write):
+        """
+        Serve the requests of one client until it disconnects
+
+        Args:
+            reader (StreamReader): Request lines
+            write (callable): Send one encoded answer, may return an awaitable
+        """
+        owned = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                result = write(self.handle_line(line, owned))
+                if asyncio.iscoroutine(result):
+                    await result
+        finally:
+            for session_id in owned:
+                self.close_session(session_id)
+
+    async def _serve_connection(self, reader, writer):
+        async def write(text):
+            writer.write(text.encode("utf-8"))
+            await writer.drain()
+
+        try:
+            await self.serve_lines(reader, write)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Start the scheduler and listen on a TCP socket
+
+        Returns:
+            Server: asyncio server; its sockets give the port when port is 0
+        """
+        self.scheduler = asyncio.ensure_future(self.run_scheduler())
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+    async def serve_stdio(self):
+        """Serve a single client on stdin/stdout until stdin closes"""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+        def write(text):
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+        self.scheduler = asyncio.ensure_future(self.run_scheduler())
+        try:
+            await self.serve_lines(reader, write)
+        finally:
+            self.stop()
+
+
+async def _serve_forever(args):
+    server = GameServer()
+    if args.stdio:
+        await server.serve_stdio()
+        return
+    listener = await server.start(args.host, args.port)
+    server.logger.info("Serving games on %s:%d", args.host, args.port)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    """Run the game server"""
+    parser = argparse.ArgumentParser(description="Host many headless games for thin clients")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--stdio", action="store_true", help="serve one client on stdin/stdout")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve_forever(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Headless game sessions
+
+A GameSession plays the mystery with the rules of Game (GameRules) but
+without a display: what Game would show in a card or a dialogue box is
+queued as an event for the remote client instead.
+
+Everything that does not change while playing (room maps, navigation
+grids, the dialogue database and the scenario bank) lives once in a
+SessionWorld shared by all the sessions of a server, so a session only
+holds its player, its characters and their NPC arrays, the deduction
+bitset of its round and a bounded event queue.
+"""
+from collections import deque
+
+from ..game.dialogue_db import DialogueDatabase
+from ..game.entities import Character, Player
+from ..game.game_constants import (DEDUCTION_BACKEND, INITIAL_TIMER, MOVE_SPEED, NPC_ROOM,
+                                   SESSION_MAX_EVENTS)
+from ..game.game_maps import ALEXS_ROOM, MAIN_MAP, OUTSIDE_MAP
+from ..game.game_state import GameState
+from ..game.mystery_generator import load_bank
+from ..game.npc_system import NPCSystem
+from ..game.rules import GameRules
+from ..utils.logger import get_logger
+
+
+class SessionWorld:
+    """Read-only game data shared by every session of a server"""
+
+    def __init__(self, deduction_backend=DEDUCTION_BACKEND):
+        """
+        Initialize world
+
+        Args:
+            deduction_backend (str): 'bitset' or 'z3' engine of the sessions
+        """
+        self.logger = get_logger()
+        self.deduction_backend = deduction_backend
+        self.rooms = {'main': MAIN_MAP, 'alexs_room': ALEXS_ROOM, 'outside': OUTSIDE_MAP}
+        self.navigation = {}
+        self.dialogue_db = DialogueDatabase()
+        self.scenarios = self.load_scenarios()
+
+    def load_scenarios(self):
+        """Load the validated scenarios whose suspects are the game characters"""
+        try:
+            scenarios = load_bank()
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning("Scenario bank not available: %s", e)
+            return []
+        suspects = set(self.dialogue_db.small_talk)
+        return [scenario for scenario in scenarios if set(scenario.suspects) == suspects]
+
+
+class GameSession(GameRules):
+    """One player's game, advanced by tick() and driven by commands"""
+
+    __slots__ = ('session_id', 'world', 'state', 'points', 'mystery_solved', 'player', 'clues',
+                 'solver', 'first_win', 'frame_count', 'timer', 'timer_active', 'npcs',
+                 'characters', 'scenario', 'possible_suspects', 'heard', 'events', 'last_active')
+
+    def __init__(self, session_id, world):
+        """
+        Initialize session and start its first round
+
+        Args:
+            session_id (int): Identifier given by the server
+            world (SessionWorld): Shared game data
+        """
+        self.session_id = session_id
+        self.world = world
+        # Como en Game después de la introducción: el jugador empieza afuera
+        self.state = GameState.OUTSIDE
+        self.points = 0
+        self.mystery_solved = False
+        self.player = Player(1, 17, 'outside')
+        self.clues = []
+        self.solver = None
+        self.first_win = True
+        self.frame_count = 0
+        self.timer = INITIAL_TIMER
+        self.timer_active = True
+        self.events = deque(maxlen=SESSION_MAX_EVENTS)
+        self.last_active = 0
+
+        self.npcs = NPCSystem(self.get_navigation(NPC_ROOM), MOVE_SPEED)
+        self.characters = {name: Character(name, self.npcs, list(lines))
+                           for name, lines in self.dialogue_db.small_talk.items()}
+        self.setup_mystery()
+        self.place_characters_randomly()
+
+    # Shared data, read from the world so sessions don't copy it
+
+    @property
+    def rooms(self):
+        return self.world.rooms
+
+    @property
+    def navigation(self):
+        return self.world.navigation
+
+    @property
+    def dialogue_db(self):
+        return self.world.dialogue_db
+
+    @property
+    def scenarios(self):
+        return self.world.scenarios
+
+    @property
+    def logger(self):
+        return self.world.logger
+
+    @property
+    def deduction_backend(self):
+        return self.world.deduction_backend
+
+    @property
+    def is_playing(self):
+        """Whether the session still has a running game to tick"""
+        return self.state in (GameState.PLAYING, GameState.OUTSIDE)
+
+    def tick(self):
+        """Advance one frame: doors, walking characters and the timer"""
+        self.frame_count += 1
+        self.check_door_interaction()
+        self._update_characters()
+        self._update_timer()
+
+    def restart(self):
+        """Start a new game after losing"""
+        self.state = GameState.OUTSIDE
+        self.player = Player(1, 17, 'outside')
+        self.restart_round()
+
+    # Hooks of GameRules: queue what Game would show
+
+    def on_room_changed(self, room_name):
+        self.events.append({"type": "room", "room": room_name})
+
+    def on_dialogue(self, name, line_id, x, y):
+        self.events.append({"type": "dialogue", "speaker": name, "line": line_id,
+                            "text": self.dialogue_db.text(line_id)})
+
+    def on_killer_revealed(self, killer, explanation):
+        self.events.append({"type": "killer", "killer": killer, "explanation": explanation})
+
+    def on_round_won(self):
+        self.events.append({"type": "won", "points": self.points})
+
+    def on_lost(self):
+        self.events.append({"type": "lost"})
+
+    def take_events(self):
+        """Get and clear the events queued since the last call"""
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+    def describe(self):
+        """
+        Get the state a client needs to draw the game
+
+        Returns:
+            dict: JSON-friendly state
+        """
+        return {
+            "state": self.state.name.lower(),
+            "room": self.current_map,
+            "player": [self.player_x, self.player_y],
+            "timer": round(self.timer, 1),
+            "points": self.points,
+            "clues": list(self.clues),
+            "possible": list(self.possible_suspects),
+            "characters": {name: [round(character.x, 2), round(character.y, 2)]
+                           for name, character in self.characters.items()},
+        }
@@ -0,0 +1,185 @@
+"""
+Minimap UI component
+
+Each room is drawn once from its tile grid: the tile ids index a palette
+array, the colors are scaled up (or the grid sampled down, for big
+generated maps) to fit the minimap, and the result is written to the
+surface with a single pygame.surfarray.blit_array call. The image is kept
+until the player enters another room. Every frame only the dots of the
+player and the NPCs are moved, by restoring the room pixels under the old
+dots and writing the new ones through a flat view of the surface.
+"""
+import numpy as np
+import pygame
+
+from ..game.game_constants import MINIMAP_SIZE
+from ..game.game_maps import TILE_TYPES
+
+TILE_COLORS = {
+    'EMPTY': (92, 76, 60),
+    'WALL': (30, 28, 34),
+    'DOOR': (200, 160, 60),
+    'BODY': (150, 150, 150),
+    'TABLE': (120, 84, 50),
+    'CHAIR': (120, 84, 50),
+    'BOOKSHELF': (100, 64, 40),
+    'WARDROBE': (100, 64, 40),
+    'PLANT': (60, 130, 60),
+    'BLOOD': (140, 20, 20),
+}
+UNKNOWN_COLOR = (255, 0, 255)  # Tiles without a color, easy to spot
+# Suelo propio de cada sala
+ROOM_FLOORS = {'outside': (56, 96, 48)}
+PLAYER_COLOR = (255, 255, 255)
+NPC_COLOR = (220, 60, 60)
+MIN_DOT = 3  # Smallest dot side in pixels
+MAX_DOT_RECTS = 16  # Moved dots repainted one by one; with more, the whole minimap is
+
+
+def palette(room):
+    """
+    Colors of every tile id in a room
+
+    Args:
+        room (str): Room name, for its floor color
+
+    Returns:
+        ndarray: (256, 3) uint8 colors indexed by tile id
+    """
+    colors = np.empty((256, 3), dtype=np.uint8)
+    colors[:] = UNKNOWN_COLOR
+    for name, color in TILE_COLORS.items():
+        colors[TILE_TYPES[name]] = color
+    colors[TILE_TYPES['EMPTY']] = ROOM_FLOORS.get(room, TILE_COLORS['EMPTY'])
+    return colors
+
+
+def sample_tiles(grid, step):
+    """
+    Get every step-th tile of every step-th row of a room
+
+    Args:
+        grid: Room tiles (list of rows, array or ChunkedWorld)
+        step (int): Tiles per sample along each side
+
+    Returns:
+        ndarray: Sampled tile ids, one row per sampled row
+    """
+    if hasattr(grid, 'sample'):
+        return grid.sample(step)
+    return np.asarray(grid, dtype=np.uint8)[::step, ::step]
+
+
+class Minimap:
+    def __init__(self, size=MINIMAP_SIZE):
+        """
+        Initialize minimap
+
+        Args:
+            size (tuple): Largest width and height in pixels
+        """
+        self.max_width, self.max_height = size
+        self.room = None
+        self.surface = None
+        self.scale = 1.0
+        self.dot = MIN_DOT
+        self.builds = 0
+        self.background = None
+        self.npc_pixel = self.player_pixel = 0
+        self.dot_offsets = None
+        self.drawn = np.empty(0, dtype=np.intp)
+        self.shown = None
+
+    def set_room(self, room, grid):
+        """
+        Draw a room into a new surface, unless it is already shown
+
+        Args:
+            room (str): Room name
+            grid: Room tiles (list of rows, array or ChunkedWorld)
+
+        Returns:
+            bool: True if the surface was replaced
+        """
+        if room == self.room:
+            return False
+        height, width = grid.shape if hasattr(grid, 'shape') else (len(grid), len(grid[0]))
+        cell = min(self.max_width // width, self.max_height // height)
+        if cell >= 1:
+            step = 1
+        else:
+            # Sala más grande que el minimapa: un píxel por cada step casillas
+            cell = 1
+            step = max(-(-width // self.max_width), -(-height // self.max_height))
+        tiles = sample_tiles(grid, step)
+        colors = palette(room)[tiles]
+        if cell > 1:
+            colors = colors.repeat(cell, axis=0).repeat(cell, axis=1)
+
+        surface = pygame.Surface((colors.shape[1], colors.shape[0]), 0, 32)
+        # surfarray indexa (x, y)
+        pygame.surfarray.blit_array(surface, colors.swapaxes(0, 1))
+        self.background = pygame.surfarray.pixels2d(surface).T.reshape(-1).copy()
+        self.npc_pixel = surface.map_rgb(NPC_COLOR) & 0xFFFFFFFF
+        self.player_pixel = surface.map_rgb(PLAYER_COLOR) & 0xFFFFFFFF
+        self.surface = surface
+        self.room = room
+        self.scale = cell / step
+        self.dot = max(MIN_DOT, cell)
+        steps = np.arange(self.dot)
+        self.dot_offsets = (steps[:, None] * surface.get_width() + steps[None, :]).ravel()
+        self.drawn = self.drawn[:0]
+        self.shown = None
+        self.builds += 1
+        return True
+
+    def forget(self, room):
+        """Drop the image of a room, for rooms that are unloaded or change"""
+        if room == self.room:
+            self.room = None
+
+    def update(self, player, npcs=None):
+        """
+        Move the dots to the current positions
+
+        Args:
+            player (tuple): Player (x, y) in tiles
+            npcs (tuple): (x, y) arrays of the NPCs in the room, or None
+
+        Returns:
+            list: Rects of the surface that changed, empty if none did
+        """
+        width, height = self.surface.get_size()
+        scale, half, dot = self.scale, self.dot // 2, self.dot
+        # Centro del punto sobre el centro de la casilla, sin salirse de la superficie
+        left = min(max(int((player[0] + 0.5) * scale) - half, 0), width - dot)
+        top = min(max(int((player[1] + 0.5) * scale) - half, 0), height - dot)
+        corners = np.array([top * width + left], dtype=np.intp)
+        if npcs is not None and len(npcs[0]):
+            # np.clip es varias veces más lento que minimum y maximum en arrays tan pequeños
+            left = np.minimum(np.maximum(((npcs[0] + 0.5) * scale).astype(np.intp) - half, 0), width - dot)
+            top = np.minimum(np.maximum(((npcs[1] + 0.5) * scale).astype(np.intp) - half, 0), height - dot)
+            corners = np.concatenate((top * width + left, corners))
+        shown = self.shown
+        if shown is not None and len(shown) == len(corners):
+            moved = (shown != corners).nonzero()[0]
+            if len(moved) == 0:
+                return []
+        else:
+            moved = None
+        self.shown = corners
+
+        pixels = pygame.surfarray.pixels2d(self.surface).T.reshape(-1)
+        pixels[self.drawn] = self.background[self.drawn]
+        self.drawn = (corners[:, None] + self.dot_offsets).ravel()
+        npc_dots = (len(corners) - 1) * len(self.dot_offsets)
+        pixels[self.drawn[:npc_dots]] = self.npc_pixel
+        # El jugador, el último, se dibuja encima
+        pixels[self.drawn[npc_dots:]] = self.player_pixel
+        del pixels
+
+        if moved is None or len(moved) > MAX_DOT_RECTS:
+            return [self.surface.get_rect()]
+        # Solo cambian los píxeles de donde estaban y donde están los puntos que se movieron
+        return [pygame.Rect(corner % width, corner // width, dot, dot)
+                for corner in np.concatenate((shown[moved], corners[moved])).tolist()]
@@ -1,48 +1,177 @@
 """
 Logger utility for game debugging
+
+Records are handed to a queue on the calling thread and written to disk and
+console by a background QueueListener, so logging never blocks the game loop.
+The log file holds one JSON object per line and rotates by size.
 """
+import atexit
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import time
+
+from .path_manager import PathManager
+
+LOGGER_NAME = "mansion"
+LOG_FILE_NAME = "game.log"
+MAX_LOG_BYTES = 1024 * 1024  # 1 MB per file
+LOG_BACKUP_COUNT = 3
+WARNING_RATE_LIMIT = 5.0  # seconds between repeated warnings
+
+_shared_logger = None
+
+
+class FrameContextFilter(logging.Filter):
+    """Attach the current frame number and room to every record"""
+
+    def __init__(self):
+        super().__init__()
+        self.frame = 0
+        self.room = None
+
+    def filter(self, record):
+        record.frame = self.frame
+        record.room = self.room
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Drop warnings repeated within an interval and count them"""
+
+    def __init__(self, interval=WARNING_RATE_LIMIT, level=logging.WARNING):
+        """
+        Initialize filter
+
+        Args:
+            interval (float): Seconds before the same message is logged again
+            level (int): Minimum level that is rate limited
+        """
+        super().__init__()
+        self.interval = interval
+        self.level = level
+        self.last_seen = {}
+        self.suppressed = {}
+
+    def filter(self, record):
+        if record.levelno < self.level:
+            return True
+        key = (record.levelno, record.getMessage())
+        now = time.monotonic()
+        last = self.last_seen.get(key)
+        if last is not None and now - last < self.interval:
+            self.suppressed[key] = self.suppressed.get(key, 0) + 1
+            return False
+        self.last_seen[key] = now
+        record.suppressed = self.suppressed.pop(key, 0)
+        return True
+
+    def take_suppressed(self):
+        """Get and clear the counts of messages that never came back after being dropped"""
+        suppressed, self.suppressed = self.suppressed, {}
+        return suppressed
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "frame": getattr(record, "frame", None),
+            "room": getattr(record, "room", None),
+        }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        return json.dumps(entry, ensure_ascii=False)
+
 
 class GameLogger:
-    def __init__(self, log_file=None):
+    def __init__(self, log_file=None, name=LOGGER_NAME, console=True):
         """
         Initialize logger
-        
+
         Args:
             log_file (str): Path to log file
+            name (str): Name of the underlying logging.Logger
+            console (bool): Also write records to the console
         """
         if log_file is None:
-            log_dir = "logs"
-            os.makedirs(log_dir, exist_ok=True)
-            date_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-            log_file = os.path.join(log_dir, f"game_{date_str}.log")
-
-        # Configure logger
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler()
-            ]
+            log_file = os.path.join(PathManager.get_log_path(), LOG_FILE_NAME)
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUP_COUNT,
+            encoding="utf-8"
         )
-        
-        self.logger = logging.getLogger(__name__)
+        file_handler.setFormatter(JsonLineFormatter())
+        handlers = [file_handler]
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(
+                logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+            handlers.append(console_handler)
+
+        # The game thread only enqueues; the listener thread does the I/O
+        self.queue = queue.SimpleQueue()
+        self.context = FrameContextFilter()
+        self.rate_limit = RateLimitFilter()
+        queue_handler = logging.handlers.QueueHandler(self.queue)
+        queue_handler.addFilter(self.rate_limit)
+        queue_handler.addFilter(self.context)
+        self.listener = logging.handlers.QueueListener(
+            self.queue, *handlers, respect_handler_level=True)
+
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+        self.logger.addHandler(queue_handler)
+        self.listener.start()
+        self.running = True
+
+    def set_frame(self, frame, room=None):
+        """Set the frame context attached to following records"""
+        self.context.frame = frame
+        self.context.room = room
 
-    def info(self, message):
+    def stop(self):
+        """Flush pending records and stop the background thread"""
+        if not self.running:
+            return
+        for (level, message), count in self.rate_limit.take_suppressed().items():
+            self.logger.log(level, "%s (repeated %d more times)", message, count)
+        self.running = False
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+    def info(self, message, *args):
         """Log info message"""
-        self.logger.info(message)
+        self.logger.info(message, *args)
 
-    def error(self, message, exc_info=True):
+    def error(self, message, *args, exc_info=True):
         """Log error message"""
-        self.logger.error(message, exc_info=exc_info)
+        self.logger.error(message, *args, exc_info=exc_info)
 
-    def warning(self, message):
+    def warning(self, message, *args):
         """Log warning message"""
-        self.logger.warning(message)
+        self.logger.warning(message, *args)
 
-    def debug(self, message):
+    def debug(self, message, *args):
         """Log debug message"""
-        self.logger.debug(message)
+        self.logger.debug(message, *args)
+
+
+def get_logger():
+    """Get the logger shared by the whole game, creating it on first use"""
+    global _shared_logger
+    if _shared_logger is None:
+        _shared_logger = GameLogger()
+        atexit.register(_shared_logger.stop)
+    return _shared_logger
@@ -15,6 +15,22 @@ class PathManager:
             # Running in normal Python environment
             return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+    @staticmethod
+    def get_user_data_path():
+        """Get a persistent, writable directory for logs and generated data
+
+        The bundle directory of a compiled build is a temporary extraction
+        folder removed on exit, so compiled builds write to the user's data
+        directory instead.
+        """
+        if getattr(sys, 'frozen', False):
+            if sys.platform == "win32":
+                root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+            else:
+                root = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+            return os.path.join(root, "MansionOscura")
+        return os.getcwd()
+
     @staticmethod
     def get_assets_path():
         """Get assets directory path"""
@@ -30,9 +46,28 @@ class PathManager:
         """Get full path for a sound file"""
         return os.path.join(PathManager.get_assets_path(), "sounds", filename)
 
+    @staticmethod
+    def get_data_path(filename):
+        """Get full path for a data file"""
+        return os.path.join(PathManager.get_assets_path(), "data", filename)
+
     @staticmethod
     def get_log_path():
         """Get log directory path"""
-        log_dir = os.path.join(PathManager.get_base_path(), "logs")
+        log_dir = os.path.join(PathManager.get_user_data_path(), "logs")
         os.makedirs(log_dir, exist_ok=True)
         return log_dir
+
+    @staticmethod
+    def get_save_path(filename):
+        """Get full path for a save file, creating the saves directory if needed"""
+        save_dir = os.path.join(PathManager.get_user_data_path(), "saves")
+        os.makedirs(save_dir, exist_ok=True)
+        return os.path.join(save_dir, filename)
+
+    @staticmethod
+    def get_cache_path(*parts):
+        """Get a directory for generated data, created if needed"""
+        cache_dir = os.path.join(PathManager.get_user_data_path(), "cache", *parts)
+        os.makedirs(cache_dir, exist_ok=True)
+        return cache_dir
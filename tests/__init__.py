@@ -1,3 +1,8 @@
 """
 Test package initialization
 """
+import os
+
+# Run every test headless: no window and no audio device are required
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
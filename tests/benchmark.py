@@ -0,0 +1,173 @@
+"""
+Benchmark harness shared by the test modules
+
+Benchmarks live next to the functional tests of their subsystem, in
+classes derived from BenchmarkCase (or GameBenchmarkCase, for benchmarks
+of a running game). Each benchmark runs something repeatedly on the SDL
+dummy video driver and compares the measured frames per second against
+tests/benchmark_baseline.json. A benchmark fails when its throughput drops
+below the baseline by more than the tolerance. The numbers depend on the
+machine the baseline was recorded on, so the benchmarks only run when
+asked for.
+
+The tolerance is the same for every benchmark and is only changed here or
+with BENCHMARK_TOLERANCE, never by a single benchmark.
+
+Environment variables:
+    BENCHMARK: Set to 1 to run the benchmarks
+    BENCHMARK_TOLERANCE: Allowed relative regression (default 0.3 = 30%)
+    BENCHMARK_SECONDS: Measuring time per benchmark (default 0.5)
+    BENCHMARK_UPDATE_BASELINE: Set to 1 to store the measured values as the new baseline
+"""
+import json
+import os
+import time
+import unittest
+import pygame
+from src.game.entities import Character
+from src.game.game import Game
+from src.game.game_constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from src.game.game_state import GameState
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+TOLERANCE = float(os.environ.get("BENCHMARK_TOLERANCE", "0.3"))
+MEASURE_SECONDS = float(os.environ.get("BENCHMARK_SECONDS", "0.5"))
+UPDATE_BASELINE = os.environ.get("BENCHMARK_UPDATE_BASELINE") == "1"
+RUN_BENCHMARKS = os.environ.get("BENCHMARK") == "1" or UPDATE_BASELINE
+WARMUP_FRAMES = 10
+MEASURE_ROUNDS = 5
+MIN_FRAMES = 10
+
+
+def measure_fps(draw_frame):
+    """
+    Measure how many frames per second a draw function sustains
+
+    The measuring time is split into rounds and the best round is kept,
+    which filters out pauses caused by other processes.
+
+    Args:
+        draw_frame (callable): Function drawing and presenting one frame
+    """
+    for _ in range(WARMUP_FRAMES):
+        draw_frame()
+    best_fps = 0.0
+    for _ in range(MEASURE_ROUNDS):
+        frames = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < MEASURE_SECONDS / MEASURE_ROUNDS or frames < MIN_FRAMES:
+            draw_frame()
+            frames += 1
+            elapsed = time.perf_counter() - start
+        best_fps = max(best_fps, frames / elapsed)
+    return best_fps
+
+
+def load_baseline():
+    """Load stored baseline results"""
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, encoding="utf-8") as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(results):
+    """Store measured results in the baseline, keeping the other benchmarks' values"""
+    baseline = load_baseline()
+    baseline.update({name: round(fps, 1) for name, fps in results.items()})
+    with open(BASELINE_PATH, "w", encoding="utf-8") as baseline_file:
+        json.dump(baseline, baseline_file, indent=4, sort_keys=True)
+        baseline_file.write("\n")
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, "Benchmarks run with BENCHMARK=1")
+class BenchmarkCase(unittest.TestCase):
+    """Benchmarks compared with the stored baseline"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.baseline = load_baseline()
+        cls.results = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        """Store the new baseline when requested"""
+        if UPDATE_BASELINE and cls.results:
+            save_baseline(cls.results)
+
+    def check_throughput(self, name, draw_frame):
+        """Measure a benchmark and compare it with the baseline"""
+        fps = measure_fps(draw_frame)
+        self.results[name] = fps
+        expected = self.baseline.get(name)
+        if UPDATE_BASELINE:
+            return
+        if expected is None:
+            self.skipTest(f"No baseline recorded for {name} ({fps:.1f} FPS)")
+        minimum = expected * (1 - TOLERANCE)
+        self.assertGreaterEqual(
+            fps, minimum,
+            f"{name}: {fps:.1f} FPS is below {minimum:.1f} FPS "
+            f"(baseline {expected:.1f} FPS, tolerance {TOLERANCE:.0%})"
+        )
+
+
+class GameBenchmarkCase(BenchmarkCase):
+    """Benchmarks of a game playing in the main hall"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create one game shared by the benchmarks of the class"""
+        super().setUpClass()
+        pygame.init()
+        cls.game = Game()
+        # Random lightning flashes would make the measurements noisy
+        cls.game.storm.lightning_chance = 0
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        pygame.quit()
+
+    def setUp(self):
+        """Reset the scene to a known state"""
+        self.game.state = GameState.PLAYING
+        self.game.current_map = 'main'
+        self.game.player_x, self.game.player_y = 12, 8
+        self.game.body.fullscreen = False
+        self.set_window_size((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    def set_window_size(self, size):
+        """Resize the game window"""
+        self.game.display.resize(size)
+
+    def set_npc_count(self, count):
+        """Keep the three suspects and add generic NPCs up to count"""
+        characters = self.game.characters
+        for name in [name for name in characters if name.startswith("NPC")]:
+            self.game.remove_character(name)
+        template = characters["Carla"]
+        for i in range(count - 3):
+            name = f"NPC{i}"
+            characters[name] = Character(name, self.game.npcs, template.dialogues, image=template.image)
+        self.game.place_characters_randomly()
+        self.game.npcs.activate_all()
+
+    def draw_game_frame(self):
+        """Draw and present one gameplay frame"""
+        self.game.draw_game_screen()
+        self.game.display.present(self.game.dirty_rects)
+
+    def draw_full_frame(self):
+        """Draw and present one gameplay frame with every sprite redrawn
+
+        An unchanged scene redraws nothing, so static scenes are invalidated
+        first to measure the cost of drawing the room.
+        """
+        self.game.invalidate_screen()
+        self.draw_game_frame()
+
+    def walk_npcs(self):
+        """Move every character one step of the NPC system"""
+        self.game._update_characters()
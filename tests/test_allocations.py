@@ -0,0 +1,194 @@
+"""
+Allocation budget of the gameplay loop
+
+Runs frames of Game.game_loop headless under tracemalloc and checks that
+steady-state gameplay does not keep allocating. After some warm-up frames,
+the memory still held after the measured frames is grouped by the line of
+the game code that allocated it, and each line may only grow by a small
+budget per frame. Objects piling up from frame to frame are what
+make the garbage collector run, so a full collection during the measured
+frames fails too. On failure the worst call sites are reported with their
+tracebacks.
+
+Temporaries freed within the frame are not counted. CPython, NumPy and
+pygame keep some freed blocks for reuse, which shows up as growth until
+their pools are full; measure_frames tells them apart from leaks.
+
+Environment variables:
+    ALLOCATION_FRAMES: Frames in each of the two measured windows (default 200)
+"""
+import gc
+import linecache
+import os
+import tracemalloc
+import unittest
+import pygame
+from src.game.game import Game
+from src.game.game_state import GameState
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+TRACE_DEPTH = 8
+WARMUP_FRAMES = 120
+MEASURE_FRAMES = int(os.environ.get("ALLOCATION_FRAMES", "200"))
+SITE_BUDGET_BYTES = 64  # Bytes a call site may keep per frame
+SITE_BUDGET_BLOCKS = 0.5  # Memory blocks a call site may keep per frame; a leak keeps at least one
+REPORT_SITES = 10
+
+
+def call_site(traceback):
+    """Innermost frame of the game code in a traceback, or the innermost frame if none"""
+    for frame in reversed(traceback):
+        if frame.filename.startswith(SOURCE_DIR):
+            return frame
+    return traceback[-1]
+
+
+def held_by_site(snapshot):
+    """
+    Group the memory held in a snapshot by call site
+
+    Returns:
+        dict: (filename, lineno) -> [bytes, blocks, example traceback]
+    """
+    sites = {}
+    for trace in snapshot.traces:
+        site = call_site(trace.traceback)
+        held = sites.get((site.filename, site.lineno))
+        if held is None:
+            sites[(site.filename, site.lineno)] = [trace.size, 1, trace.traceback]
+        else:
+            held[0] += trace.size
+            held[1] += 1
+    return sites
+
+
+def measure_frames(run_frames, frames, warmup=WARMUP_FRAMES):
+    """
+    Measure what running frames leaves allocated, per call site
+
+    The frames are measured in two windows one after the other, and a site
+    only counts with the smaller growth of the two: a leak grows in both,
+    while a pool of freed blocks kept for reuse fills up once and stops.
+
+    Args:
+        run_frames (callable): Runs a number of frames
+        frames (int): Frames measured in each window
+        warmup (int): Frames run first, so caches and pools are filled
+
+    Returns:
+        tuple: (growth, collections), the (site, bytes per frame, blocks per
+            frame, traceback) of every site that grew in both windows,
+            largest first, and the generations of the garbage collections
+            during the measured frames
+    """
+    collections = []
+
+    def record(phase, info):
+        if phase == "start":
+            collections.append(info["generation"])
+
+    tracemalloc.start(TRACE_DEPTH)
+    try:
+        gc.collect()
+        run_frames(warmup)
+        snapshots = [tracemalloc.take_snapshot()]
+        gc.callbacks.append(record)
+        try:
+            for _ in range(2):
+                run_frames(frames)
+                snapshots.append(tracemalloc.take_snapshot())
+        finally:
+            gc.callbacks.remove(record)
+    finally:
+        tracemalloc.stop()
+
+    # Agrupar con tracemalloc parado, para no contar los propios diccionarios
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, linecache.__file__)]
+    start, middle, end = (held_by_site(snapshot.filter_traces(filters)) for snapshot in snapshots)
+    growth = []
+    for site, (size, blocks, traceback) in end.items():
+        first_size, first_blocks, _ = start.get(site, (0, 0, None))
+        middle_size, middle_blocks, _ = middle.get(site, (0, 0, None))
+        size_growth = min(middle_size - first_size, size - middle_size)
+        block_growth = min(middle_blocks - first_blocks, blocks - middle_blocks)
+        if size_growth > 0 or block_growth > 0:
+            growth.append((site, size_growth / frames, block_growth / frames, traceback))
+    growth.sort(key=lambda item: item[1], reverse=True)
+    return growth, collections
+
+
+def format_report(growth):
+    """Describe the call sites that grew the most, with the code that allocated"""
+    lines = [f"Memory kept per frame, worst {REPORT_SITES} call sites "
+             f"(budget {SITE_BUDGET_BYTES} B and {SITE_BUDGET_BLOCKS} blocks per frame):"]
+    for (filename, lineno), size, blocks, traceback in growth[:REPORT_SITES]:
+        lines.append(f"  {size:+.1f} B/frame, {blocks:+.2f} blocks/frame  "
+                     f"{os.path.relpath(filename)}:{lineno}: {linecache.getline(filename, lineno).strip()}")
+        # Quién llamó a la línea que reservó la memoria
+        frames = list(traceback)
+        callers = frames[:frames.index(call_site(traceback))][-2:]
+        for frame in reversed(callers):
+            lines.append(f"      called from {os.path.relpath(frame.filename)}:{frame.lineno}")
+    return "\n".join(lines)
+
+
+class TestAllocationBudget(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Create one game shared by all scenes"""
+        pygame.init()
+        cls.game = Game()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def setUp(self):
+        """Start playing in the main hall with every suspect walking"""
+        self.game.state = GameState.PLAYING
+        self.game.current_map = 'main'
+        self.game.player_x, self.game.player_y = 12, 8
+        self.game.body.fullscreen = False
+        self.game.npcs.activate_all()
+
+    def run_frames(self, frames):
+        """Run gameplay frames as fast as possible, failing if the loop stops early"""
+        self.assertEqual(self.game.game_loop(max_frames=frames, frame_rate=0), frames)
+
+    def check_budget(self):
+        """Measure the gameplay frames and fail with a report if they keep memory or collect"""
+        growth, collections = measure_frames(self.run_frames, MEASURE_FRAMES)
+        over = [site for site in growth if site[1] > SITE_BUDGET_BYTES or site[2] > SITE_BUDGET_BLOCKS]
+        if over:
+            self.fail(f"{len(over)} call sites over the allocation budget\n{format_report(growth)}")
+        if 2 in collections:
+            self.fail(f"Full garbage collection during {2 * MEASURE_FRAMES} frames "
+                      f"(generations collected: {collections})\n{format_report(growth)}")
+
+    def test_main_hall(self):
+        """Test the dark main hall with the suspects walking keeps no memory from frame to frame"""
+        self.check_budget()
+
+    def test_outside_in_the_rain(self):
+        """Test the rain outside keeps no memory from frame to frame"""
+        self.game.current_map = 'outside'
+        self.game.player_x, self.game.player_y = 1, 17
+        self.check_budget()
+
+    def test_leaks_are_reported(self):
+        """Test a line keeping one object per frame is over the budget and named in the report"""
+        kept = []
+
+        def leaking_frames(frames):
+            for _ in range(frames):
+                kept.append([0])
+
+        growth, _ = measure_frames(leaking_frames, 100, warmup=10)
+        (filename, lineno), size, blocks, _ = growth[0]
+        self.assertEqual((filename, lineno), (__file__, leaking_frames.__code__.co_firstlineno + 2))
+        self.assertGreater(blocks, SITE_BUDGET_BLOCKS)
+        self.assertIn(f"test_allocations.py:{lineno}: kept.append([0])", format_report(growth))
+
+
+if __name__ == '__main__':
+    unittest.main()
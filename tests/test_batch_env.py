@@ -0,0 +1,122 @@
+import unittest
+import numpy as np
+from src.game.batch_env import (ACTION_DOWN, ACTION_INTERACT, ACTION_LEFT, ACTION_NONE, ACTION_RIGHT,
+                                ACTION_UP, BatchEnv)
+from src.game.game_constants import REDUCED_TIMER, TIMER_BONUS
+from src.game.game_maps import TILE_TYPES
+from src.server.session import GameSession, SessionWorld
+from tests import benchmark
+
+MOVES = {ACTION_UP: (0, -1), ACTION_DOWN: (0, 1), ACTION_LEFT: (-1, 0), ACTION_RIGHT: (1, 0)}
+
+
+class TestBatchEnv(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.world = SessionWorld()
+
+    def setUp(self):
+        self.session = GameSession(1, self.world)
+        self.env = BatchEnv(1, seed=0)
+        for index, name in enumerate(self.env.suspects):
+            character = self.session.characters[name]
+            self.env.npc_x[0, index], self.env.npc_y[0, index] = int(character.x), int(character.y)
+
+    def assert_same_game(self):
+        session, env = self.session, self.env
+        self.assertEqual(env.room_names[env.room[0]], session.current_map)
+        self.assertEqual((env.x[0], env.y[0]), (session.player_x, session.player_y))
+        self.assertAlmostEqual(env.timer[0], session.timer)
+        self.assertEqual(env.points[0], session.points)
+        heard = {name for index, name in enumerate(env.suspects) if env.clues[0] >> index & 1}
+        self.assertEqual(heard, set(session.clues))
+
+    def test_moves_and_doors_match_the_game_rules(self):
+        """Test walking, walls and doors give the same result as GameRules"""
+        rng = np.random.default_rng(3)
+        # Camino hacia la puerta de la mansión y luego pasos al azar
+        actions = [ACTION_RIGHT] * 7 + [ACTION_UP] * 2 + list(rng.choice(list(MOVES), size=3000))
+        rooms = set()
+        for action in actions:
+            self.env.step(np.array([action]))
+            self.session.move_player(*MOVES[action])
+            self.session.check_door_interaction()
+            self.session._update_timer()
+            self.assert_same_game()
+            rooms.add(self.session.current_map)
+        self.assertIn('main', rooms)
+
+    def test_talking_matches_the_game_rules(self):
+        """Test clues, timer bonus and solving give the same result as GameRules"""
+        self.session.current_map = 'main'
+        self.env.room[0] = self.env.room_names.index('main')
+        for index, name in enumerate(self.env.suspects):
+            character = self.session.characters[name]
+            x, y = int(character.x), int(character.y)
+            self.env.npc_x[0, index], self.env.npc_y[0, index] = x, y
+            self.session.player_x, self.session.player_y = x, y
+            self.env.x[0], self.env.y[0] = x, y
+            # Otros sospechosos al lado también hablarían: apartarlos en ambos juegos
+            for other_index, other in enumerate(self.env.suspects):
+                if other_index != index and self.session.player.is_near(
+                        self.session.characters[other].x, self.session.characters[other].y):
+                    self.skipTest("Suspects placed next to each other")
+            self.session.interact()
+            self.env.step(np.array([ACTION_INTERACT]))
+            self.session._update_timer()
+            self.assert_same_game()
+        self.assertEqual(self.env.points[0], 1)
+        self.assertAlmostEqual(self.env.timer[0], REDUCED_TIMER - 1 / 60)
+
+    def test_time_running_out(self):
+        """Test a game without clues is lost and reset, and one with clues keeps going"""
+        env = BatchEnv(2, seed=0)
+        env.timer[:] = 1 / 60
+        env.clues[1] = 1
+        _, lost = env.step(np.array([ACTION_NONE, ACTION_NONE]))
+        self.assertEqual(lost.tolist(), [True, False])
+        self.assertEqual(env.timer[0], env.initial_timer)
+        self.assertFalse(env.timer_active[1])
+        self.assertEqual(env.timer[1], 0)
+
+    def test_new_clue_adds_the_bonus_once(self):
+        """Test talking twice to the same suspect adds the bonus once"""
+        env = BatchEnv(1, seed=0)
+        env.room[0] = env.room_names.index('main')
+        env.x[0], env.y[0] = env.npc_x[0, 0], env.npc_y[0, 0]
+        env.npc_x[0, 1:] = env.npc_y[0, 1:] = 0
+        timer = env.timer[0]
+        env.step(np.array([ACTION_INTERACT]))
+        self.assertAlmostEqual(env.timer[0], timer + TIMER_BONUS - 1 / 60)
+        env.npc_x[0, 0], env.npc_y[0, 0] = env.x[0], env.y[0]
+        env.step(np.array([ACTION_INTERACT]))
+        self.assertAlmostEqual(env.timer[0], timer + TIMER_BONUS - 2 / 60)
+
+    def test_many_games_stay_on_walkable_tiles(self):
+        """Test random play in a large batch never puts a player in a wall"""
+        env = BatchEnv(5000, seed=1)
+        rng = np.random.default_rng(2)
+        for _ in range(300):
+            env.step(rng.integers(0, 6, size=env.count))
+            tiles = env.tiles[env.room, env.y, env.x]
+            self.assertFalse((tiles == TILE_TYPES['WALL']).any())
+        self.assertGreater(len(np.unique(env.room)), 1)
+
+
+class TestBatchEnvBenchmarks(benchmark.BenchmarkCase):
+    def test_batch_env(self):
+        """Benchmark stepping 100000 games in lockstep, one frame being one step of every game"""
+        env = BatchEnv(100000, seed=0)
+        actions = np.random.default_rng(0).integers(0, 6, size=(16, env.count))
+        frames = [0]
+
+        def step():
+            env.step(actions[frames[0] % len(actions)])
+            frames[0] += 1
+
+        self.check_throughput("batch_env_100000", step)
+        print(f"\nBatch env: {self.results['batch_env_100000'] * env.count / 1e6:.1f} M steps/s")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import pygame
+from src.game.camera import Camera
+from src.game.game import Game
+from src.game.game_state import GameState
+from src.game.sprites import LAYER_FURNITURE
+
+
+class TestCamera(unittest.TestCase):
+    def setUp(self):
+        """Set up a camera showing 10x8 tiles of a 100x50 room"""
+        self.camera = Camera((320, 250), 32)
+        self.camera.set_world(100, 50)
+
+    def test_follow_centers_and_clamps(self):
+        """Test the camera centers on the target without leaving the room"""
+        self.assertEqual((self.camera.columns, self.camera.rows), (10, 8))
+        self.assertTrue(self.camera.follow(50, 20))
+        self.assertEqual(self.camera.origin, (45, 16))
+        self.assertFalse(self.camera.follow(50, 20))
+        self.camera.follow(99, 49)
+        self.assertEqual(self.camera.origin, (90, 42))
+        self.camera.follow(0, 0)
+        self.assertEqual(self.camera.origin, (0, 0))
+
+    def test_visible_slices_cover_only_the_view(self):
+        """Test the visible slices depend on the view size, not the room size"""
+        self.camera.follow(50, 20)
+        rows, columns = self.camera.visible_slices()
+        self.assertEqual((rows, columns), (slice(16, 24), slice(45, 55)))
+        rows, columns = self.camera.visible_slices(pygame.Rect(288, 0, 32, 250), margin=1)
+        self.assertEqual((rows, columns), (slice(15, 25), slice(53, 56)))
+
+    def test_small_rooms_do_not_scroll(self):
+        """Test rooms smaller than the view keep the origin at the corner"""
+        self.camera.set_world(5, 5)
+        self.assertFalse(self.camera.follow(4, 4))
+        self.assertEqual(self.camera.to_screen(4, 4), (128, 128))
+
+
+class TestScrollingRoom(unittest.TestCase):
+    def setUp(self):
+        """Set up a game outside, the room larger than the window"""
+        pygame.init()
+        self.game = Game()
+        self.game.state = GameState.PLAYING
+        self.game.current_map = 'outside'
+
+    def tearDown(self):
+        """Clean up after tests"""
+        pygame.quit()
+
+    def furniture_layer(self, game):
+        """Get the furniture layer image of the current room"""
+        return dict(game.room_layers[game.current_map])[LAYER_FURNITURE].image
+
+    def test_scrolled_layers_match_a_fresh_bake(self):
+        """Test drawing only the exposed tiles gives the same picture as baking again"""
+        self.game.player_x, self.game.player_y = 1, 1
+        self.game.draw_game_screen()
+        self.game.player_x, self.game.player_y = 25, 19
+        self.game.draw_game_screen()
+        self.assertNotEqual(self.game.camera.origin, (0, 0))
+        scrolled = pygame.image.tobytes(self.furniture_layer(self.game), "RGBA")
+
+        fresh = Game()
+        fresh.current_map = 'outside'
+        fresh.player_x, fresh.player_y = 25, 19
+        fresh.draw_game_screen()
+        self.assertEqual(fresh.camera.origin, self.game.camera.origin)
+        self.assertEqual(pygame.image.tobytes(self.furniture_layer(fresh), "RGBA"), scrolled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import random
+import timeit
+import unittest
+from src.game.deduction import BACKEND_BITSET, BACKEND_Z3, BitsetSession, create_session
+from src.game.mystery_generator import DEFAULT_SCENARIO, generate_candidate
+from src.game.solver_session import SolverSession
+
+MANY_SUSPECTS = tuple(f"S{i}" for i in range(40))
+
+
+class TestBitsetSession(unittest.TestCase):
+    def test_original_mystery(self):
+        """Test the original statements leave Rodys as the only suspect"""
+        session = BitsetSession(DEFAULT_SCENARIO.suspects)
+        for statement in DEFAULT_SCENARIO.statements:
+            session.add(statement)
+        self.assertEqual(session.possible_suspects(), ["Rodys"])
+        self.assertEqual(session.killer(), "Rodys")
+        session.reset()
+        self.assertEqual(session.possible_suspects(), ["Carla", "Juan", "Rodys"])
+        self.assertIsNone(session.killer())
+
+    def test_matches_z3_after_every_statement(self):
+        """Test both backends agree statement by statement on random scenarios"""
+        rng = random.Random(3)
+        for suspects in (DEFAULT_SCENARIO.suspects, MANY_SUSPECTS[:8], MANY_SUSPECTS[:24]):
+            bitset, solver = BitsetSession(suspects), SolverSession(suspects)
+            for seed in range(15):
+                statements, _ = generate_candidate(seed, suspects, statements_per_suspect=2)
+                # Mezclar declaraciones de distintos escenarios da también casos sin asesino
+                statements = rng.sample(statements, len(statements) // 2)
+                bitset.reset()
+                solver.reset()
+                for statement in statements:
+                    bitset.add(statement)
+                    solver.add(statement)
+                    self.assertEqual(bitset.possible_suspects(), solver.possible_suspects())
+                self.assertEqual(bitset.killer(), solver.killer())
+
+    def test_many_suspects_in_microseconds(self):
+        """Test a statement about dozens of suspects costs microseconds"""
+        statements, _ = generate_candidate(0, MANY_SUSPECTS)
+        session = BitsetSession(MANY_SUSPECTS)
+
+        def round_of_statements():
+            session.reset()
+            for statement in statements:
+                session.add(statement)
+            session.killer()
+
+        per_statement = min(timeit.repeat(round_of_statements, number=20, repeat=3)) / (20 * len(statements))
+        self.assertLess(per_statement, 50e-6)
+
+    def test_create_session(self):
+        """Test the backend constant selects the engine"""
+        self.assertIsInstance(create_session(MANY_SUSPECTS, BACKEND_BITSET), BitsetSession)
+        self.assertIsInstance(create_session(MANY_SUSPECTS, BACKEND_Z3), SolverSession)
+        with self.assertRaises(ValueError):
+            create_session(MANY_SUSPECTS, "oracle")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import unittest
+from src.game.dialogue_db import DialogueDatabase
+from src.game.mystery_generator import DEFAULT_SCENARIO, load_bank
+from src.game.statements import CLAIM_GUILTY, Statement
+
+
+class TestDialogueDatabase(unittest.TestCase):
+    def setUp(self):
+        """Load the dialogue database shipped with the game"""
+        self.db = DialogueDatabase()
+
+    def test_original_statements_keep_their_text(self):
+        """Test the original statements have stable IDs and their own lines"""
+        ids = [self.db.statement_id(statement) for statement in DEFAULT_SCENARIO.statements]
+        self.assertEqual(ids, [101, 102, 103])
+        self.assertEqual(self.db.text(101), "Estaba en mi habitación toda la noche.")
+        self.assertEqual(self.db.text(101, "en"), "I was in my room all night.")
+        self.assertIs(self.db.statements[101], self.db.statements[ids[0]])
+
+    def test_small_talk_keeps_the_original_lines(self):
+        """Test the lines said after the testimony are the original game's, in order"""
+        small_talk = {name: [self.db.text(line_id) for line_id in ids] for name, ids in self.db.small_talk.items()}
+        self.assertEqual(small_talk, {
+            "Carla": ["No vi a nadie en el pasillo.", "No sé quién es el asesino."],
+            "Juan": ["Rodys estaba en la sala.", "No sé quién es el asesino."],
+            "Rodys": ["No vi a nadie sospechoso.", "No sé quién es el asesino."],
+        })
+
+    def test_every_banked_statement_is_in_the_file(self):
+        """Test the shipped scenarios only use statements with an ID in the dialogue file"""
+        known = len(self.db.statements)
+        for scenario in load_bank():
+            for statement in scenario.statements:
+                line_id = self.db.statement_id(statement)
+                self.assertEqual(self.db.statements[line_id], statement)
+                self.assertTrue(self.db.text(line_id))
+        self.assertEqual(len(self.db.statements), known)
+
+    def test_languages_load_lazily(self):
+        """Test text tables are read on first use only"""
+        self.assertEqual(self.db.tables, {})
+        line_id = self.db.statement_id(Statement("Juan", CLAIM_GUILTY, "Rodys"))
+        self.assertEqual(self.db.text(line_id), "Vi a Rodys salir de la habitación de Alex.")
+        self.assertEqual(list(self.db.tables), ["es"])
+        self.db.set_language("en")
+        self.assertEqual(self.db.text(line_id), "I saw Rodys leaving Alex's room.")
+        self.assertEqual(sorted(self.db.tables), ["en", "es"])
+
+    def test_unknown_statements_get_new_ids(self):
+        """Test statements missing from the file are registered for the run"""
+        statement = Statement("Ana", CLAIM_GUILTY, "Bruno")
+        line_id = self.db.statement_id(statement)
+        self.assertGreater(line_id, max(self.db.small_talk["Carla"] + [101]))
+        self.assertEqual(self.db.statement_id(statement), line_id)
+        self.assertEqual(self.db.text(line_id), "Vi a Bruno salir de la habitación de Alex.")
+
+    def test_duplicate_ids_are_rejected(self):
+        """Test a dialogue file reusing an ID fails to load"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "dialogues.json")
+            with open(path, "w", encoding="utf-8") as dialogue_file:
+                json.dump({"version": 1, "small_talk": {},
+                           "lines": [{"id": 1, "speaker": "Ana"}, {"id": 1, "speaker": "Bruno"}]}, dialogue_file)
+            with self.assertRaises(ValueError):
+                DialogueDatabase(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import pygame
+from src.game.dialogue_layout import LINE_HEIGHT, PADDING, DialogueLayout, wrap_text
+from src.game.game import Game
+from src.game.game_constants import BLACK, SCREEN_WIDTH, WHITE
+from tests import benchmark
+
+
+class TestDialogueLayout(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        self.fonts = {}
+        self.layout = DialogueLayout(self.get_font, font_size=24, language="es", line_width=250)
+        self.text = "Carla: Estaba en la biblioteca leyendo cuando oí un ruido en la habitación de Alex."
+
+    def tearDown(self):
+        pygame.quit()
+
+    def get_font(self, size):
+        return self.fonts.setdefault(size, pygame.font.Font(None, size))
+
+    def test_wrapped_lines_fit_the_width(self):
+        """Test every line fits the width, keeps the words in order and longer words stand alone"""
+        font = self.get_font(24)
+        lines = wrap_text(font, self.text, 250)
+        self.assertGreater(len(lines), 1)
+        self.assertEqual(" ".join(lines), self.text)
+        for line in lines:
+            self.assertLessEqual(font.size(line)[0], 250)
+        self.assertEqual(wrap_text(font, "Supercalifragilístico dijo", 50), ["Supercalifragilístico", "dijo"])
+
+    def test_box_is_rendered_once(self):
+        """Test the box holds every line inside its border and is rendered only on first use"""
+        image = self.layout.image(self.text)
+        lines = wrap_text(self.get_font(24), self.text, 250)
+        self.assertEqual(image.get_size(), (250 + 2 * PADDING, len(lines) * LINE_HEIGHT + 2 * PADDING))
+        self.assertEqual(image.get_at((0, 0))[:3], BLACK)
+        self.assertEqual(image.get_at((5, 5))[:3], WHITE)
+        self.assertIs(self.layout.image(self.text), image)
+        self.assertEqual(self.layout.renders, 1)
+
+    def test_font_size_and_language_drop_the_boxes(self):
+        """Test changing the font size or the language renders the boxes again"""
+        image = self.layout.image(self.text)
+        self.layout.set_language("es")
+        self.assertIs(self.layout.image(self.text), image)
+        self.layout.set_font_size(32)
+        bigger = self.layout.image(self.text)
+        self.assertGreater(bigger.get_height(), image.get_height())
+        self.layout.set_language("en")
+        self.assertEqual(self.layout.images, {})
+        self.assertEqual(self.layout.renders, 2)
+
+
+class TestGameDialogues(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        self.game = Game()
+
+    def tearDown(self):
+        pygame.quit()
+
+    def test_dialogues_are_ready_before_talking(self):
+        """Test every line of the round has its box rendered, so showing one renders nothing"""
+        layout = self.game.dialogue_layout
+        renders = layout.renders
+        for name, character in self.game.characters.items():
+            for line_id in character.dialogues:
+                image, (x, y) = self.game.layout_dialogue(self.game.dialogue_text(name, line_id), 0, 0)
+                self.assertGreaterEqual(x, 10)
+                self.assertLessEqual(x + image.get_width(), SCREEN_WIDTH - 10)
+        self.assertEqual(layout.renders, renders)
+
+    def test_language_change_renders_the_new_text(self):
+        """Test changing the language replaces the boxes with the ones of the new text"""
+        carla = self.game.characters["Carla"]
+        text = self.game.dialogue_text("Carla", carla.dialogues[0])
+        self.game.set_language("en")
+        self.assertNotIn(text, self.game.dialogue_layout.images)
+        self.assertIn(self.game.dialogue_text("Carla", carla.dialogues[0]), self.game.dialogue_layout.images)
+
+
+class TestDialogueBenchmarks(benchmark.GameBenchmarkCase):
+    def test_dialogue_overlay(self):
+        """Benchmark the dialogue box drawn over the game screen"""
+        carla = self.game.characters["Carla"]
+        image, pos = self.game.layout_dialogue(
+            self.game.dialogue_text("Carla", carla.dialogues[0]), carla.x, carla.y)
+
+        def draw_frame():
+            self.game.invalidate_screen()
+            self.game.draw_dialogue(image, pos)
+            self.game.display.present()
+
+        self.check_throughput("dialogue_overlay", draw_frame)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import pygame
+from src.game.display import (SoftwareDisplay, create_display, BACKEND_SOFTWARE,
+                              BACKEND_TEXTURE, QUALITY_SMOOTH)
+from src.game.game import Game
+from src.game.game_state import GameState
+from tests import benchmark
+
+
+class TestDisplay(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment"""
+        pygame.init()
+        self.display = SoftwareDisplay((800, 600), QUALITY_SMOOTH)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        pygame.quit()
+
+    def test_logical_resolution_survives_resize(self):
+        """Test the render target keeps its logical size on resize"""
+        screen = self.display.screen
+        self.display.resize((1600, 1200))
+        self.assertIs(self.display.screen, screen)
+        self.assertEqual(self.display.screen.get_size(), (800, 600))
+        self.assertEqual(self.display.window_size, (1600, 1200))
+        self.display.present()
+
+    def test_mouse_positions_map_to_logical_coordinates(self):
+        """Test window positions are converted back to logical positions"""
+        self.display.resize((1600, 1200))
+        self.assertEqual(self.display.to_logical((800, 600)), (400, 300))
+        # Letterboxed: a wider window adds bars on the left and right
+        self.display.resize((1000, 600))
+        self.assertEqual(self.display.to_logical((100, 0)), (0, 0))
+
+    def test_texture_backend_draws_like_software(self):
+        """Test both backends accept the same draw calls"""
+        image = pygame.Surface((32, 32))
+        image.fill((0, 255, 0))
+        display = create_display((800, 600), BACKEND_TEXTURE)
+        try:
+            self.assertIn(display.backend, (BACKEND_SOFTWARE, BACKEND_TEXTURE))
+            display.clear((0, 0, 0))
+            display.blit(display.prepare_image(image), (10.5, 20))
+            display.present()
+        finally:
+            display.close()
+
+
+class TestRenderingBenchmarks(benchmark.GameBenchmarkCase):
+    def test_room_outside(self):
+        """Benchmark the outside area"""
+        self.game.current_map = 'outside'
+        self.check_throughput("room_outside", self.draw_full_frame)
+
+    def test_room_main(self):
+        """Benchmark the main hall"""
+        self.check_throughput("room_main", self.draw_full_frame)
+
+    def test_room_alexs_room(self):
+        """Benchmark Alexander's room"""
+        self.game.current_map = 'alexs_room'
+        self.check_throughput("room_alexs_room", self.draw_full_frame)
+
+    def test_window_sizes(self):
+        """Benchmark the main hall at several window sizes"""
+        for size in [(640, 480), (1280, 720), (1920, 1080)]:
+            with self.subTest(size=size):
+                self.set_window_size(size)
+                self.check_throughput(f"window_{size[0]}x{size[1]}", self.draw_full_frame)
+
+    def test_render_backends(self):
+        """Benchmark the same scene with the software and texture backends"""
+        self.check_throughput(f"backend_{BACKEND_SOFTWARE}", self.draw_full_frame)
+        game = Game(render_backend=BACKEND_TEXTURE)
+        try:
+            if game.display.backend != BACKEND_TEXTURE:
+                self.skipTest("Texture backend not available")
+            game.state = GameState.PLAYING
+            game.current_map = 'main'
+            game.player_x, game.player_y = self.game.player_x, self.game.player_y
+            for name, character in self.game.characters.items():
+                game.characters[name].place(character.x, character.y)
+
+            def draw_frame():
+                game.invalidate_screen()
+                game.draw_game_screen()
+                game.display.present()
+
+            self.check_throughput(f"backend_{BACKEND_TEXTURE}", draw_frame)
+        finally:
+            game.display.close()
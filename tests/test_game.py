@@ -1,7 +1,9 @@
 import unittest
 import pygame
 from src.game.game import Game
+from src.game.game_constants import NPC_ROOM
 from src.game.game_state import GameState
+from src.game.mystery_generator import DEFAULT_SCENARIO
 
 class TestGame(unittest.TestCase):
     def setUp(self):
@@ -36,6 +38,47 @@ class TestGame(unittest.TestCase):
     def test_character_placement(self):
         """Test random character placement"""
         self.game.place_characters_randomly()
+        navigation = self.game.get_navigation(NPC_ROOM)
         for character in self.game.characters.values():
-            # Check character is in valid position
-            self.assertTrue(self.game.is_position_valid(character["x"], character["y"]))
+            # Check character is in valid position of the room they walk in
+            self.assertTrue(navigation.is_walkable(int(character.x), int(character.y)))
+
+    def test_character_walks_to_goal(self):
+        """Test an interacted character follows the navigation grid to its goal"""
+        self.game.characters["Carla"].place(1, 1)
+        self.game.npcs.activate("Carla", goal=(12, 9))
+        navigation = self.game.get_navigation('main')
+        for _ in range(1000):
+            if not self.game.npcs.is_active("Carla"):
+                break
+            self.game._update_characters()
+            carla = self.game.characters["Carla"]
+            self.assertTrue(navigation.is_walkable(int(round(carla.x)), int(round(carla.y))))
+        self.assertFalse(self.game.npcs.is_active("Carla"))
+        carla = self.game.characters["Carla"]
+        self.assertEqual((carla.x, carla.y), (12, 9))
+
+    def test_hearing_every_suspect_solves_the_mystery(self):
+        """Test talking to each suspect once reveals the scenario's killer"""
+        scenario = self.game.scenario
+        self.assertIn(scenario, self.game.scenarios)
+        for name in scenario.suspects:
+            character = self.game.characters[name]
+            statement = self.game.dialogue_db.statements[character.dialogues[0]]
+            self.assertEqual(statement, scenario.testimony(name)[0])
+            self.game.update_solver(character.next_dialogue())
+        self.assertEqual(self.game.determine_killer(), scenario.killer)
+
+    def test_partial_testimony_names_no_killer(self):
+        """Test no killer is named while the statements heard allow several"""
+        self.game.scenario = DEFAULT_SCENARIO
+        self.game.setup_solver()
+        self.game.update_solver(self.game.dialogue_db.statement_id(DEFAULT_SCENARIO.statements[0]))
+        self.assertIsNone(self.game.determine_killer())
+
+    def test_entity_attribute_typos_raise(self):
+        """Test entities reject attributes they don't declare"""
+        with self.assertRaises(AttributeError):
+            self.game.player.z = 1
+        with self.assertRaises(AttributeError):
+            self.game.characters["Carla"].dialog_index = 1
@@ -0,0 +1,120 @@
+import unittest
+import numpy as np
+import pygame
+from src.game.camera import Camera
+from src.game.game import Game
+from src.game.game_maps import TILE_TYPES
+from src.game.game_state import GameState
+from src.game.lighting import Lighting, shadowcast
+from tests import benchmark
+
+WALL = TILE_TYPES['WALL']
+TILE = 8
+
+
+class TestShadowcast(unittest.TestCase):
+    def test_walls_cast_shadows(self):
+        """Test cells behind a wall are dark and open cells within the radius are lit"""
+        opaque = [[False] * 9 for _ in range(9)]
+        for y in range(2, 7):
+            opaque[y][6] = True
+        visible = shadowcast(opaque, 4, 4, 4)
+        self.assertTrue(visible[4, 4])
+        self.assertTrue(visible[4, 6])  # The wall itself is lit
+        self.assertFalse(visible[4, 7])
+        self.assertFalse(visible[4, 8])
+        self.assertTrue(visible[4, 0])
+        self.assertTrue(visible[1, 4])
+        self.assertFalse(visible[0, 0])  # Outside the radius
+
+    def test_open_room_is_symmetric(self):
+        """Test the lit area in an empty room is the same in every octant"""
+        visible = shadowcast([[False] * 11 for _ in range(11)], 5, 5, 5)
+        self.assertTrue(np.array_equal(visible, visible.T))
+        self.assertTrue(np.array_equal(visible, visible[::-1, ::-1]))
+
+
+class TestLighting(unittest.TestCase):
+    def setUp(self):
+        self.grid = np.zeros((20, 30), dtype=np.uint8)
+        self.grid[:, 15] = WALL
+        surface = pygame.Surface((30 * TILE, 20 * TILE), pygame.SRCALPHA)
+        self.lighting = Lighting(surface, TILE, radius=5, darkness=200)
+        self.camera = Camera(surface.get_size(), TILE)
+        self.camera.set_world(30, 20)
+
+    def alpha_at(self, x, y):
+        """Alpha of the darkness at the center of a tile"""
+        return self.lighting.surface.get_at((x * TILE + TILE // 2, y * TILE + TILE // 2)).a
+
+    def test_darkness_follows_the_player(self):
+        """Test the area around the player is lit, and walls and distance leave it dark"""
+        self.assertIsNotNone(self.lighting.update('room', self.grid, 12, 10, self.camera))
+        self.assertLess(self.alpha_at(12, 10), 10)
+        self.assertLess(self.alpha_at(10, 10), self.alpha_at(8, 10))
+        self.assertEqual(self.alpha_at(16, 10), 200)  # Behind the wall
+        self.assertEqual(self.alpha_at(2, 10), 200)  # Beyond the radius
+
+        changed = self.lighting.update('room', self.grid, 20, 10, self.camera)
+        self.assertEqual(changed, pygame.Rect(7 * TILE, 5 * TILE, 19 * TILE, 11 * TILE))
+        self.assertEqual(self.alpha_at(12, 10), 200)
+        self.assertLess(self.alpha_at(20, 10), 10)
+
+    def test_results_are_cached_per_tile(self):
+        """Test a tile already visited is a cache hit and an unchanged view is not redrawn"""
+        self.lighting.update('room', self.grid, 12, 10, self.camera)
+        self.assertIsNone(self.lighting.update('room', self.grid, 12, 10, self.camera))
+        self.lighting.update('room', self.grid, 13, 10, self.camera)
+        self.lighting.update('room', self.grid, 12, 10, self.camera)
+        self.assertEqual((self.lighting.hits, self.lighting.misses), (1, 2))
+        self.lighting.forget('room')
+        self.assertEqual(len(self.lighting.cache), 0)
+
+
+class TestGameDarkness(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        self.game = Game()
+        self.game.state = GameState.PLAYING
+
+    def tearDown(self):
+        pygame.quit()
+
+    def test_only_dark_rooms_are_covered(self):
+        """Test the darkness is drawn in the mansion and not outside"""
+        self.game.current_map = 'main'
+        self.game.player_x, self.game.player_y = 12, 8
+        self.game.draw_game_screen()
+        self.assertTrue(self.game.darkness_sprite.visible)
+        self.assertLess(self.game.lighting.surface.get_at((self.game.camera.to_screen(12, 8))).a,
+                        self.game.lighting.darkness)
+        self.game.current_map = 'outside'
+        self.game.player_x, self.game.player_y = 1, 17
+        self.game.draw_game_screen()
+        self.assertFalse(self.game.darkness_sprite.visible)
+
+
+class TestLightingBenchmarks(benchmark.GameBenchmarkCase):
+    def test_lighting(self):
+        """Benchmark the main hall with and without darkness, and walking through the darkness"""
+        lighting = self.game.lighting
+        radius = lighting.radius
+        try:
+            lighting.radius = 0
+            self.check_throughput("lighting_main_unlit", self.draw_full_frame)
+        finally:
+            lighting.radius = radius
+        self.check_throughput("lighting_main_lit", self.draw_full_frame)
+
+        steps = iter(range(1 << 62))
+
+        def walk():
+            # Ir y volver entre dos casillas: cada fotograma redibuja la oscuridad
+            self.game.player_x = 12 + next(steps) % 2
+            self.draw_game_frame()
+
+        self.check_throughput("lighting_main_walking", walk)
+
+
+if __name__ == '__main__':
+    unittest.main()
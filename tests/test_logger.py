@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+from src.utils.logger import GameLogger
+
+
+class TestGameLogger(unittest.TestCase):
+    def setUp(self):
+        """Set up a logger writing to a temporary file"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.temp_dir.name, "game.log")
+        self.logger = GameLogger(self.log_file, name="mansion.test", console=False)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.logger.stop()
+        self.temp_dir.cleanup()
+
+    def read_records(self):
+        """Flush the background listener and read the JSON lines"""
+        self.logger.stop()
+        with open(self.log_file, encoding="utf-8") as log:
+            return [json.loads(line) for line in log]
+
+    def test_records_are_json_lines_with_frame_context(self):
+        """Test structured records carry the frame context"""
+        self.logger.set_frame(42, "main")
+        self.logger.info("Entering %s", "main")
+        records = self.read_records()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["message"], "Entering main")
+        self.assertEqual(records[0]["level"], "INFO")
+        self.assertEqual(records[0]["frame"], 42)
+        self.assertEqual(records[0]["room"], "main")
+
+    def test_repeated_warnings_are_rate_limited(self):
+        """Test repeated warnings are dropped and counted"""
+        for _ in range(5):
+            self.logger.warning("Music file not found: %s", "horror_music.mp3")
+        self.logger.rate_limit.last_seen.clear()
+        self.logger.warning("Music file not found: %s", "horror_music.mp3")
+        records = self.read_records()
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[1]["suppressed"], 4)
+
+    def test_rate_limit_keeps_distinct_messages(self):
+        """Test messages from the same call site with different arguments are not merged"""
+        for name in ("horror_music.mp3", "outside_music.mp3"):
+            self.logger.warning("Music file not found: %s", name)
+        records = self.read_records()
+        self.assertEqual([record["message"] for record in records],
+                         ["Music file not found: horror_music.mp3", "Music file not found: outside_music.mp3"])
+
+    def test_suppressed_count_is_flushed_on_stop(self):
+        """Test repeats of a message that never comes back are reported when stopping"""
+        for _ in range(3):
+            self.logger.warning("Missing tile %s", 7)
+        records = self.read_records()
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[1]["message"], "Missing tile 7 (repeated 2 more times)")
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.game.game_maps import TILE_TYPES
+from src.game.mansion_generator import (Mansion, cache_path, generate_batch, generate_mansion,
+                                        is_connected)
+from src.game.navigation import NavigationGrid, UNREACHABLE
+
+FURNITURE = [TILE_TYPES[name] for name in ('TABLE', 'CHAIR', 'BOOKSHELF', 'WARDROBE', 'PLANT')]
+
+
+class TestMansionGenerator(unittest.TestCase):
+    def accepted(self, count=20):
+        """Generate mansions from the first seeds that pass validation"""
+        mansions = (generate_mansion(seed) for seed in range(count * 3))
+        return [mansion for mansion in mansions if mansion is not None][:count]
+
+    def test_same_seed_same_mansion(self):
+        """Test generation is deterministic"""
+        first = self.accepted(1)[0]
+        second = generate_mansion(first.seed)
+        np.testing.assert_array_equal(first.tiles, second.tiles)
+        self.assertEqual((first.doors, first.spawns, first.body), (second.doors, second.spawns, second.body))
+
+    def test_accepted_mansions_are_connected(self):
+        """Test every door, spawn and the body can be reached from every door"""
+        for mansion in self.accepted():
+            navigation = NavigationGrid(mansion.tiles.tolist())
+            for door in mansion.doors:
+                for x, y in mansion.doors + mansion.spawns + [mansion.body]:
+                    self.assertNotEqual(navigation.distance(x, y, door), UNREACHABLE)
+
+    def test_furniture_stays_off_doors(self):
+        """Test no furniture touches a door and the tile vocabulary is the game's"""
+        for mansion in self.accepted():
+            tiles = mansion.tiles
+            self.assertTrue(set(np.unique(tiles)) <= set(TILE_TYPES.values()))
+            self.assertEqual(np.count_nonzero(tiles == TILE_TYPES['BODY']), 1)
+            for x, y in mansion.doors:
+                around = tiles[y - 1:y + 2, x - 1:x + 2]
+                self.assertFalse(np.isin(around, FURNITURE).any())
+
+    def test_disconnected_layout_is_rejected(self):
+        """Test the flood fill finds a walled-in spawn"""
+        mansion = self.accepted(1)[0]
+        x, y = mansion.spawns[0]
+        tiles = mansion.tiles.copy()
+        tiles[y - 1:y + 2, x - 1:x + 2] = TILE_TYPES['WALL']
+        tiles[y, x] = TILE_TYPES['EMPTY']
+        walled_in = Mansion(mansion.seed, tiles, mansion.doors, mansion.spawns, mansion.body)
+        self.assertFalse(is_connected(walled_in))
+
+    def test_batch_uses_the_cache(self):
+        """Test a batch in worker processes caches accepted mansions by seed"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            mansions = generate_batch(range(12), workers=2, cache_dir=cache_dir)
+            self.assertTrue(mansions)
+            for seed, mansion in mansions.items():
+                path = cache_path(seed, 48, 32, cache_dir)
+                self.assertTrue(os.path.exists(path))
+            cached = generate_batch(range(12), workers=0, cache_dir=cache_dir)
+            self.assertEqual(sorted(cached), sorted(mansions))
+            for seed, mansion in cached.items():
+                np.testing.assert_array_equal(mansion.tiles, mansions[seed].tiles)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import numpy as np
+import pygame
+from pygame.locals import KEYDOWN, K_m
+from src.game.game import Game
+from src.game.game_constants import MINIMAP_MARGIN, NPC_ROOM, SCREEN_HEIGHT, SCREEN_WIDTH
+from src.game.game_maps import MAIN_MAP, TILE_TYPES
+from src.game.game_state import GameState
+from src.ui.minimap import NPC_COLOR, PLAYER_COLOR, TILE_COLORS, Minimap, palette
+from tests import benchmark
+
+
+class TestMinimap(unittest.TestCase):
+    def setUp(self):
+        self.minimap = Minimap((150, 100))
+
+    def test_room_is_drawn_from_its_tiles(self):
+        """Test each tile is scaled to a square of its palette color, built once per room"""
+        self.assertTrue(self.minimap.set_room('main', MAIN_MAP))
+        surface = self.minimap.surface
+        # 25x17 casillas de 5 píxeles en una caja de 150x100
+        self.assertEqual(surface.get_size(), (125, 85))
+        self.assertEqual(surface.get_at((2, 2))[:3], TILE_COLORS['WALL'])
+        self.assertEqual(surface.get_at((7, 7))[:3], TILE_COLORS['EMPTY'])
+        self.assertFalse(self.minimap.set_room('main', MAIN_MAP))
+        self.assertEqual(self.minimap.builds, 1)
+        self.assertEqual(tuple(palette('outside')[TILE_TYPES['EMPTY']]), (56, 96, 48))
+
+    def test_big_rooms_are_sampled_down(self):
+        """Test a room bigger than the minimap gets one pixel per sampled tile"""
+        tiles = np.zeros((1000, 3000), dtype=np.uint8)
+        tiles[::40, ::40] = TILE_TYPES['WALL']
+        self.minimap.set_room('big', tiles)
+        self.assertEqual(self.minimap.surface.get_size(), (150, 50))
+        self.assertEqual(self.minimap.surface.get_at((0, 0))[:3], TILE_COLORS['WALL'])
+        self.assertEqual(self.minimap.surface.get_at((1, 0))[:3], TILE_COLORS['EMPTY'])
+
+    def test_dots_move_without_redrawing_the_room(self):
+        """Test dots are drawn at their tiles, only moved dots are repainted and the room shows again where they were"""
+        self.minimap.set_room('main', MAIN_MAP)
+        player_tile = self.minimap.surface.get_at((52, 42))
+        npc_tile = self.minimap.surface.get_at((17, 22))
+        npcs = (np.array([3.0], dtype=np.float32), np.array([4.0], dtype=np.float32))
+        self.assertTrue(self.minimap.update((10, 8), npcs))
+        self.assertEqual(self.minimap.surface.get_at((52, 42))[:3], PLAYER_COLOR)
+        self.assertEqual(self.minimap.surface.get_at((17, 22))[:3], NPC_COLOR)
+        self.assertEqual(self.minimap.update((10, 8), npcs), [])
+        # Solo se repintan el punto del jugador donde estaba y donde está
+        self.assertEqual(self.minimap.update((10, 9), npcs), [pygame.Rect(50, 40, 5, 5), pygame.Rect(50, 45, 5, 5)])
+        self.minimap.update((10, 8), npcs)
+        self.assertTrue(self.minimap.update((11, 8), None))
+        self.assertEqual(self.minimap.surface.get_at((52, 42)), player_tile)
+        self.assertEqual(self.minimap.surface.get_at((17, 22)), npc_tile)
+        self.assertEqual(self.minimap.builds, 1)
+
+
+class TestGameMinimap(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        self.game = Game()
+        self.game.state = GameState.PLAYING
+        self.game.current_map = NPC_ROOM
+        self.game.player_x, self.game.player_y = 12, 8
+
+    def tearDown(self):
+        pygame.quit()
+
+    def test_minimap_in_the_corner(self):
+        """Test the minimap is shown in the bottom-right corner and rebuilt only on room changes"""
+        for _ in range(3):
+            self.game.draw_game_screen()
+        sprite = self.game.minimap_sprite
+        self.assertTrue(sprite.visible)
+        self.assertEqual(sprite.rect.bottomright, (SCREEN_WIDTH - MINIMAP_MARGIN, SCREEN_HEIGHT - MINIMAP_MARGIN))
+        self.assertEqual(self.game.minimap.builds, 1)
+        self.game.current_map = 'outside'
+        self.game.draw_game_screen()
+        self.assertEqual(self.game.minimap.room, 'outside')
+        self.assertIs(sprite.image, self.game.minimap.surface)
+
+    def test_m_toggles_the_minimap(self):
+        """Test the M key hides and shows the minimap"""
+        self.game._handle_gameplay_input(pygame.event.Event(KEYDOWN, key=K_m))
+        self.game.draw_game_screen()
+        self.assertFalse(self.game.minimap_sprite.visible)
+        self.game._handle_gameplay_input(pygame.event.Event(KEYDOWN, key=K_m))
+        self.game.draw_game_screen()
+        self.assertTrue(self.game.minimap_sprite.visible)
+
+
+class TestMinimapBenchmarks(benchmark.GameBenchmarkCase):
+    def test_minimap(self):
+        """Benchmark the minimap dots alone with the suspects walking, and walking frames with the minimap"""
+        minimap = self.game.minimap
+        npcs = self.game.npcs
+        minimap.set_room('main', MAIN_MAP)
+
+        def move_dots():
+            self.walk_npcs()
+            minimap.update((self.game.player_x, self.game.player_y), (npcs.x[:npcs.count], npcs.y[:npcs.count]))
+
+        self.check_throughput("minimap_npcs_3", move_dots)
+
+        def walk():
+            self.walk_npcs()
+            self.draw_game_frame()
+
+        self.check_throughput("minimap_walking", walk)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from src.game.mystery_generator import (DEFAULT_SCENARIO, ScenarioValidator, generate_bank,
+                                        generate_candidate, load_bank, save_bank)
+from src.game.statements import CLAIM_EITHER, CLAIM_GUILTY, CLAIM_INNOCENT, Statement
+
+SUSPECTS = ("Ana", "Bruno", "Clara", "Diego", "Elena")
+
+
+class TestMysteryGenerator(unittest.TestCase):
+    def brute_force_killers(self, suspects, statements):
+        """Suspects for whom every innocent speaker tells the truth"""
+        return [killer for killer in suspects
+                if all(statement.speaker == killer or statement.is_true(killer) for statement in statements)]
+
+    def test_validator_matches_brute_force(self):
+        """Test the incremental solver agrees with trying every killer"""
+        validator = ScenarioValidator(SUSPECTS)
+        for seed in range(200):
+            statements, _ = generate_candidate(seed, SUSPECTS)
+            self.assertEqual(validator.possible_killers(statements),
+                             self.brute_force_killers(SUSPECTS, statements))
+        # Cada declaración distinta se añade una sola vez al solver
+        self.assertLessEqual(len(validator.guards), 200 * len(SUSPECTS))
+
+    def test_contradiction_leaves_no_killer(self):
+        """Test statements no one can satisfy are rejected"""
+        validator = ScenarioValidator(("Ana", "Bruno"))
+        statements = [Statement("Ana", CLAIM_GUILTY, "Bruno"), Statement("Bruno", CLAIM_GUILTY, "Ana")]
+        self.assertEqual(validator.possible_killers(statements), ["Ana", "Bruno"])
+        statements = [Statement("Ana", CLAIM_INNOCENT, "Bruno"), Statement("Bruno", CLAIM_INNOCENT, "Ana")]
+        self.assertIsNone(validator.unique_killer(statements))
+        with self.assertRaises(ValueError):
+            Statement("Ana", CLAIM_EITHER, "Bruno")
+
+    def test_default_scenario_is_unique(self):
+        """Test the original hand-written mystery has Rodys as its only killer"""
+        validator = ScenarioValidator(DEFAULT_SCENARIO.suspects)
+        self.assertEqual(validator.possible_killers(DEFAULT_SCENARIO.statements), ["Rodys"])
+
+    def test_bank_in_workers_round_trips(self):
+        """Test worker processes produce distinct unique-killer scenarios that load back"""
+        bank = generate_bank(20, SUSPECTS, statements_per_suspect=2, workers=2)
+        self.assertEqual(len(bank), 20)
+        keys = {frozenset(statement.key for statement in scenario.statements) for scenario in bank}
+        self.assertEqual(len(keys), 20)
+        for scenario in bank:
+            self.assertEqual(self.brute_force_killers(SUSPECTS, scenario.statements), [scenario.killer])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "scenarios.json")
+            save_bank(bank, path)
+            loaded = load_bank(path)
+        self.assertEqual([scenario.to_dict() for scenario in loaded], [scenario.to_dict() for scenario in bank])
+
+    def test_shipped_bank_is_valid(self):
+        """Test every scenario shipped with the game has exactly one killer"""
+        bank = load_bank()
+        self.assertTrue(bank)
+        validator = ScenarioValidator(bank[0].suspects)
+        for scenario in bank:
+            self.assertEqual(validator.possible_killers(scenario.statements), [scenario.killer])
+
+
+if __name__ == '__main__':
+    unittest.main()
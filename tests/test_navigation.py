@@ -0,0 +1,91 @@
+import unittest
+from src.game.game_maps import MAIN_MAP, TILE_TYPES
+from src.game.navigation import NavigationGrid, UNREACHABLE
+
+WALL = TILE_TYPES['WALL']
+DOOR = TILE_TYPES['DOOR']
+
+ROOM = [
+    [1, 1, 1, 1, 1, 1],
+    [1, 0, 0, 1, 0, 1],
+    [1, 0, 0, 1, 0, 1],
+    [1, 0, 0, 0, 0, 2],
+    [1, 1, 1, 1, 1, 1],
+]
+
+
+class TestNavigationGrid(unittest.TestCase):
+    def setUp(self):
+        """Set up a small room with a wall in the middle"""
+        self.navigation = NavigationGrid(ROOM, waypoints=[(1, 1), (3, 1)])
+
+    def test_points_of_interest(self):
+        """Test doors are found and waypoints on walls are ignored"""
+        self.assertEqual(self.navigation.doors, [(5, 3)])
+        self.assertEqual(self.navigation.points_of_interest, [(5, 3), (1, 1)])
+
+    def test_distances_go_around_walls(self):
+        """Test the distance field follows the shortest walkable path"""
+        self.assertEqual(self.navigation.distance(5, 3, (5, 3)), 0)
+        self.assertEqual(self.navigation.distance(4, 1, (1, 1)), 7)
+        self.assertEqual(self.navigation.distance(3, 1, (1, 1)), UNREACHABLE)
+
+    def test_following_the_gradient_reaches_the_target(self):
+        """Test next_step leads to the target in the shortest number of steps"""
+        x, y = 4, 1
+        steps = 0
+        while (direction := self.navigation.next_step(x, y, (1, 1))) is not None:
+            x, y = x + direction[0], y + direction[1]
+            steps += 1
+        self.assertEqual((x, y), (1, 1))
+        self.assertEqual(steps, 7)
+
+    def test_fields_are_cached(self):
+        """Test a field is computed once per target"""
+        field = self.navigation.distance_field((1, 1))
+        self.assertIs(self.navigation.distance_field((1, 1)), field)
+
+    def test_opening_a_cell_updates_fields_incrementally(self):
+        """Test unblocking matches a full recomputation"""
+        field = self.navigation.distance_field((1, 1))
+        self.navigation.set_blocked(3, 1, False)
+        self.assertIs(self.navigation.distance_field((1, 1)), field)
+        expected = NavigationGrid([row[:3] + [0] + row[4:] if y == 1 else row
+                                   for y, row in enumerate(ROOM)]).distance_field((1, 1))
+        self.assertEqual(list(field), list(expected))
+        self.assertEqual(self.navigation.distance(4, 1, (1, 1)), 3)
+
+    def test_closing_a_cell_drops_affected_fields(self):
+        """Test blocking recomputes only fields that could use the cell"""
+        self.navigation.distance_field((1, 1))
+        self.navigation.distance_field((4, 1))
+        self.navigation.set_blocked(3, 3, True)
+        self.assertEqual(self.navigation.distance(4, 1, (1, 1)), UNREACHABLE)
+        self.assertEqual(self.navigation.distance(4, 3, (4, 1)), 2)
+
+    def test_closing_a_dead_end_keeps_fields(self):
+        """Test blocking a cell no shortest path needs keeps the cached fields correct"""
+        navigation = NavigationGrid(MAIN_MAP)
+        targets = [(5, 3), (19, 3), (12, 9)]
+        fields = [navigation.distance_field(target) for target in targets]
+        navigation.set_blocked(1, 13, True)
+        blocked_map = [[WALL if (x, y) == (1, 13) else tile for x, tile in enumerate(row)]
+                       for y, row in enumerate(MAIN_MAP)]
+        expected = NavigationGrid(blocked_map)
+        for target, field in zip(targets, fields):
+            self.assertIs(navigation.distance_field(target), field)
+            self.assertEqual(list(field), list(expected.distance_field(target)))
+
+    def test_main_hall_is_connected(self):
+        """Test every floor tile of the main hall can reach both doors"""
+        navigation = NavigationGrid(MAIN_MAP)
+        for door in navigation.doors:
+            field = navigation.distance_field(door)
+            for y, row in enumerate(MAIN_MAP):
+                for x, tile in enumerate(row):
+                    if tile != WALL:
+                        self.assertNotEqual(field[y * navigation.width + x], UNREACHABLE)
+
+
+if __name__ == '__main__':
+    unittest.main()
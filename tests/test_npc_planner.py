@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+from src.game.game_maps import MAIN_MAP, PATROL_WAYPOINTS
+from src.game.navigation import NavigationGrid
+from src.game.npc_planner import NPCPlanner
+from src.game.npc_system import NPCSystem
+
+GOAL = (12, 9)
+
+
+class TestNPCPlanner(unittest.TestCase):
+    def setUp(self):
+        """Set up an NPC system in the main hall planned by a worker process"""
+        self.navigation = NavigationGrid(MAIN_MAP, waypoints=PATROL_WAYPOINTS['main'])
+        self.npcs = NPCSystem(self.navigation, move_speed=0.1, seed=1)
+        self.planner = NPCPlanner()
+        if not self.planner.start(self.npcs):
+            self.skipTest(f"Planner process not available: {self.planner.error}")
+        self.addCleanup(self.planner.close)
+
+    def walk(self, npcs, frames):
+        """Update a system, letting the worker answer every frame, and record the positions"""
+        path = []
+        for _ in range(frames):
+            npcs.update()
+            if npcs.planner is not None:
+                self.assertTrue(npcs.planner.wait(5))
+            n = npcs.count
+            tiles = (np.rint(npcs.y[:n]) * self.navigation.width + np.rint(npcs.x[:n])).astype(int)
+            self.assertTrue(npcs.walkable[tiles].all())
+            path.append((npcs.x[:n].tolist(), npcs.y[:n].tolist()))
+        return path
+
+    def test_worker_walks_like_in_process_planning(self):
+        """Test errands planned by the worker follow the same path as in-process planning"""
+        local = NPCSystem(NavigationGrid(MAIN_MAP, waypoints=PATROL_WAYPOINTS['main']), move_speed=0.1)
+        frames = self.navigation.distance(1, 1, GOAL) * self.npcs.steps_per_tile + 1
+        paths = []
+        for npcs in (self.npcs, local):
+            npcs.spawn("Carla", 1, 1)
+            npcs.activate("Carla", errands=1, goal=GOAL)
+            paths.append(self.walk(npcs, frames))
+        self.assertEqual(paths[0], paths[1])
+        self.assertEqual(self.npcs.position("Carla"), (12.0, 9.0))
+        self.assertFalse(self.npcs.is_active("Carla"))
+        stats = self.planner.stats()
+        self.assertGreater(stats["remote"], stats["local"])
+
+    def test_obstacles_reach_the_worker(self):
+        """Test the worker routes around an obstacle added after it started"""
+        self.npcs.spawn("Carla", 1, 1)
+        self.npcs.activate("Carla", errands=1, goal=GOAL)
+        self.walk(self.npcs, 1)
+        # Bloquear la casilla del camino por la que pasaría
+        x, y = 1, 1
+        for _ in range(4):
+            dx, dy = self.navigation.next_step(x, y, GOAL)
+            x, y = x + dx, y + dy
+        self.navigation.set_blocked(x, y, True)
+        self.walk(self.npcs, 400)
+        self.assertEqual(self.npcs.position("Carla"), (12.0, 9.0))
+        self.assertGreater(self.planner.stats()["remote"], 0)
+
+    def test_stale_answers_are_dropped(self):
+        """Test answers made before an NPC was placed somewhere else are not applied"""
+        self.npcs.spawn_crowd(30)
+        self.walk(self.npcs, 25)
+        for name in self.npcs.names[:5]:
+            self.npcs.place(name, 1, 1)
+            self.npcs.activate(name, errands=1, goal=GOAL)
+        self.walk(self.npcs, 30)
+        self.assertGreater(self.planner.stats()["dropped"], 0)
+
+    def test_dead_worker_falls_back_to_in_process(self):
+        """Test the NPCs keep walking after the worker process dies"""
+        self.npcs.spawn_crowd(30)
+        self.walk(self.npcs, 5)
+        self.planner.process.terminate()
+        self.planner.process.join()
+        start = self.npcs.x[:self.npcs.count].copy()
+        for _ in range(60):
+            self.npcs.update()
+        self.assertIsNone(self.npcs.planner)
+        self.assertFalse(self.planner.stats()["alive"])
+        self.assertFalse(np.array_equal(start, self.npcs.x[:self.npcs.count]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import numpy as np
+from src.game.game_maps import MAIN_MAP, PATROL_WAYPOINTS
+from src.game.navigation import NavigationGrid
+from src.game.npc_system import NPCSystem, WANDER_FOREVER
+from tests import benchmark
+
+
+class TestNPCSystem(unittest.TestCase):
+    def setUp(self):
+        """Set up an NPC system in the main hall"""
+        self.navigation = NavigationGrid(MAIN_MAP, waypoints=PATROL_WAYPOINTS['main'])
+        self.npcs = NPCSystem(self.navigation, move_speed=0.1, capacity=2, seed=1)
+
+    def walk(self, frames):
+        """Update the system and check nobody ever stands on a wall"""
+        for _ in range(frames):
+            self.npcs.update()
+            n = self.npcs.count
+            tiles = (np.rint(self.npcs.y[:n]) * self.navigation.width + np.rint(self.npcs.x[:n])).astype(int)
+            self.assertTrue(self.npcs.walkable[tiles].all())
+
+    def test_spawn_grows_and_remove_compacts(self):
+        """Test slots grow on demand and stay contiguous after removals"""
+        for i in range(5):
+            self.npcs.spawn(f"N{i}", 1 + i, 1)
+        self.assertGreaterEqual(self.npcs.capacity, 5)
+        self.npcs.remove("N1")
+        self.assertEqual(self.npcs.count, 4)
+        self.assertEqual(self.npcs.position("N4"), (5.0, 1.0))
+        self.assertEqual(sorted(self.npcs.slots.values()), [0, 1, 2, 3])
+
+    def test_npc_reaches_goal_and_stops(self):
+        """Test a single errand ends on the goal tile"""
+        self.npcs.spawn("Carla", 1, 1)
+        self.npcs.activate("Carla", errands=1, goal=(12, 9))
+        distance = self.navigation.distance(1, 1, (12, 9))
+        self.walk(distance * self.npcs.steps_per_tile + 1)
+        self.assertFalse(self.npcs.is_active("Carla"))
+        self.assertEqual(self.npcs.position("Carla"), (12.0, 9.0))
+
+    def test_entities_follow_their_npc(self):
+        """Test entity positions are written back after moves, placements and removals"""
+        class Walker:
+            __slots__ = ('x', 'y')
+
+        walkers = [Walker() for _ in range(3)]
+        for i, walker in enumerate(walkers):
+            self.npcs.spawn(f"W{i}", 1 + i, 1, entity=walker)
+        self.npcs.spawn_crowd(20)
+        self.npcs.remove("W0")
+        self.npcs.activate_all()
+        self.walk(37)
+        for i, walker in enumerate(walkers[1:], start=1):
+            self.assertEqual((walker.x, walker.y), self.npcs.position(f"W{i}"))
+        self.npcs.place("W2", 5, 3)
+        self.assertEqual((walkers[2].x, walkers[2].y), (5.0, 3.0))
+
+    def test_crowd_wanders_in_one_update(self):
+        """Test hundreds of NPCs keep moving without entering walls"""
+        names = self.npcs.spawn_crowd(300)
+        self.assertEqual(len(names), 300)
+        start = self.npcs.x[:300].copy(), self.npcs.y[:300].copy()
+        self.walk(50)
+        moved = (self.npcs.x[:300] != start[0]) | (self.npcs.y[:300] != start[1])
+        self.assertGreater(np.count_nonzero(moved), 250)
+        self.assertTrue(self.npcs.active[:300].all())
+        self.assertTrue((self.npcs.limits[:300] == WANDER_FOREVER).all())
+
+    def test_npc_walks_up_to_player(self):
+        """Test the player goal stops next to the player"""
+        self.npcs.spawn("Juan", 1, 1)
+        self.npcs.set_player((5, 3))
+        self.npcs.goal_cells = []
+        self.npcs.activate("Juan")
+        self.walk(200)
+        self.assertFalse(self.npcs.is_active("Juan"))
+        self.assertEqual(self.navigation.distance(*map(int, self.npcs.position("Juan")), (5, 3)), 1)
+
+
+class TestNPCSystemBenchmarks(benchmark.BenchmarkCase):
+    def test_npc_update(self):
+        """Benchmark the NPC system update alone with a large crowd"""
+        npcs = NPCSystem(NavigationGrid(MAIN_MAP, waypoints=PATROL_WAYPOINTS['main']), seed=0)
+        npcs.spawn_crowd(1000)
+        self.check_throughput("npc_update_1000", npcs.update)
+
+
+class TestCrowdBenchmarks(benchmark.GameBenchmarkCase):
+    def test_npc_counts(self):
+        """Benchmark the main hall with a growing number of walking NPCs"""
+        def draw_frame():
+            self.walk_npcs()
+            self.draw_game_frame()
+
+        try:
+            for count in [3, 50, 200]:
+                with self.subTest(npcs=count):
+                    self.set_npc_count(count)
+                    self.check_throughput(f"npcs_{count}", draw_frame)
+        finally:
+            self.set_npc_count(3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import unittest
+from src.game.game_state import GameState
+from src.server.client import GameClient
+from src.server.server import GameServer
+from src.server.session import GameSession, SessionWorld
+
+
+class TestGameSession(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Load the shared game data once"""
+        cls.world = SessionWorld()
+
+    def setUp(self):
+        self.session = GameSession(1, self.world)
+
+    def talk_to(self, name):
+        """Stand on a character's tile and talk to it"""
+        session = self.session
+        character = session.characters[name]
+        session.current_map = 'main'
+        session.player_x, session.player_y = int(character.x), int(character.y)
+        session.interact()
+
+    def test_hearing_every_suspect_solves_the_mystery(self):
+        """Test the rules run headless and report the killer as events"""
+        scenario = self.session.scenario
+        for name in scenario.suspects:
+            self.talk_to(name)
+            if self.session.points:
+                break
+        events = self.session.take_events()
+        self.assertIn("dialogue", [event["type"] for event in events])
+        self.assertIn({"type": "killer", "killer": scenario.killer,
+                       "explanation": f"Basado en las declaraciones, {scenario.killer} es el asesino."}, events)
+        self.assertEqual(events[-1], {"type": "won", "points": 1})
+        self.assertEqual(self.session.take_events(), [])
+
+    def test_time_running_out_loses(self):
+        """Test a session without clues loses when its timer runs out"""
+        self.session.timer = 1 / 60
+        self.session.tick()
+        self.assertFalse(self.session.is_playing)
+        self.assertEqual(self.session.state, GameState.LOST)
+        self.assertEqual(self.session.take_events(), [{"type": "lost"}])
+        self.session.restart()
+        self.assertTrue(self.session.is_playing)
+
+    def test_door_changes_room(self):
+        """Test walking onto a door moves the player to the next room"""
+        self.session.current_map = 'main'
+        self.session.player_x, self.session.player_y = 23, 5
+        self.session.tick()
+        self.assertEqual(self.session.current_map, 'alexs_room')
+        self.assertEqual(self.session.take_events(), [{"type": "room", "room": "alexs_room"}])
+
+    def test_state_is_json(self):
+        """Test the described state can be sent as JSON"""
+        state = json.loads(json.dumps(self.session.describe()))
+        self.assertEqual(state["room"], 'outside')
+        self.assertEqual(sorted(state["characters"]), sorted(self.session.characters))
+
+
+class TestGameServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.world = SessionWorld()
+
+    def setUp(self):
+        self.server = GameServer(self.world, tick_rate=60, idle_timeout=0.5)
+
+    def test_idle_sessions_are_parked(self):
+        """Test sessions without commands stop being ticked until used again"""
+        owned = set()
+        session_id = self.server.handle({"op": "new"}, owned)["session"]
+        session = self.server.sessions[session_id]
+        for _ in range(31):
+            self.server.tick()
+        self.assertNotIn(session_id, self.server.active)
+        timer = session.timer
+        self.server.tick()
+        self.assertEqual(session.timer, timer)
+
+        self.server.handle({"op": "state", "session": session_id}, owned)
+        self.server.tick()
+        self.assertIn(session_id, self.server.active)
+        self.assertLess(session.timer, timer)
+
+    def test_bad_requests_are_answered_with_errors(self):
+        """Test malformed requests get an error answer instead of closing the server"""
+        owned = set()
+        for line in (b"not json\n", b"[1]\n", b'{"op": "state", "session": 99}\n',
+                     b'{"op": "fly"}\n', b'{"op": "new"}\n'):
+            answer = json.loads(self.server.handle_line(line, owned))
+        self.assertTrue(answer["ok"])
+        session_id = answer["session"]
+        for request in ({"op": "fly", "session": session_id},
+                        {"op": "move", "session": session_id, "dx": 2, "dy": 0}):
+            answer = json.loads(self.server.handle_line(json.dumps(request), owned))
+            self.assertFalse(answer["ok"])
+            self.assertIn("error", answer)
+
+    def test_invalid_session_ids_are_answered_with_errors(self):
+        """Test session IDs that are not integers get an error answer instead of closing the server"""
+        owned = {self.server.handle({"op": "new"}, set())["session"]}
+        for session_id in ([1], {"id": 1}, True, "1", None):
+            answer = json.loads(self.server.handle_line(json.dumps({"op": "state", "session": session_id}), owned))
+            self.assertFalse(answer["ok"])
+            self.assertIn("session", answer["error"])
+
+    def test_sessions_belong_to_their_connection(self):
+        """Test a connection cannot drive another connection's session"""
+        session_id = self.server.handle({"op": "new"}, set())["session"]
+        answer = json.loads(self.server.handle_line(json.dumps({"op": "state", "session": session_id}), set()))
+        self.assertFalse(answer["ok"])
+
+    def test_client_plays_over_tcp(self):
+        """Test the test client drives a session through the socket protocol"""
+        async def play():
+            listener = await self.server.start("127.0.0.1", 0)
+            port = listener.sockets[0].getsockname()[1]
+            client = await GameClient.connect("127.0.0.1", port)
+            try:
+                answer = await client.new_game()
+                self.assertEqual(answer["state"]["player"], [1, 17])
+                answer = await client.move(1, 0)
+                self.assertEqual(answer["state"]["player"], [2, 17])
+                answer = await client.stats()
+                self.assertEqual(answer["stats"]["sessions"], 1)
+            finally:
+                await client.close()
+            # Closing the session frees it on the server
+            await asyncio.sleep(0)
+            self.assertEqual(self.server.sessions, {})
+            self.server.stop()
+            listener.close()
+            await listener.wait_closed()
+
+        asyncio.run(play())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import time
+import unittest
+import pygame
+from src.game.game import Game
+from src.game.game_state import GameState
+from src.game.snapshot import (HEADER, SnapshotWriter, read_snapshot_file, restore_snapshot,
+                               take_snapshot)
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        """Set up a game in the middle of a round"""
+        pygame.init()
+        self.game = Game()
+        game = self.game
+        game.state = GameState.PLAYING
+        game.current_map = 'main'
+        game.player_x, game.player_y = 12, 8
+        game.points = 2
+        game.timer = 71.5
+        game.first_win = False
+        for name in game.scenario.suspects[:2]:
+            game.update_solver(game.characters[name].next_dialogue())
+            game.clues.append(name)
+            game.npcs.activate(name)
+        for _ in range(13):
+            game._update_characters()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        pygame.quit()
+
+    def state_of(self, game):
+        """Everything a snapshot must bring back"""
+        characters = {name: (character.x, character.y, character.dialogue_index, tuple(character.dialogues))
+                      for name, character in game.characters.items()}
+        return (game.state, game.player_x, game.player_y, game.current_map, game.points, game.timer,
+                game.first_win, game.clues, game.heard, game.possible_suspects,
+                game.scenario.killer, characters, game.npcs.names,
+                [array.tolist() for array in game.npcs.get_arrays()])
+
+    def test_restore_brings_back_the_whole_game(self):
+        """Test a fresh game restored from a snapshot continues identically"""
+        for compress in (False, True):
+            with self.subTest(compress=compress):
+                data = take_snapshot(self.game, compress=compress)
+                other = Game()
+                restore_snapshot(other, data)
+                self.assertEqual(self.state_of(other), self.state_of(self.game))
+                # Mismo estado de los generadores: los NPC siguen igual en ambos juegos
+                snapshot = take_snapshot(self.game)
+                for game in (self.game, other):
+                    for _ in range(40):
+                        game._update_characters()
+                self.assertEqual(self.state_of(other), self.state_of(self.game))
+                restore_snapshot(self.game, snapshot)
+
+    def test_snapshot_is_fast_and_small(self):
+        """Test taking and restoring a snapshot is well under a millisecond"""
+        data = take_snapshot(self.game, compress=True)
+        self.assertLess(len(data), 4096)
+        start = time.perf_counter()
+        for _ in range(50):
+            restore_snapshot(self.game, take_snapshot(self.game))
+        self.assertLess((time.perf_counter() - start) / 50, 1e-3)
+
+    def test_damaged_snapshots_are_rejected(self):
+        """Test truncated, corrupted or foreign data raises ValueError"""
+        data = take_snapshot(self.game)
+        corrupted = bytearray(data)
+        corrupted[-5] ^= 0xFF
+        for bad in (data[:40], bytes(corrupted), b'PNG' + data[3:]):
+            with self.assertRaises(ValueError):
+                restore_snapshot(Game(), bad)
+
+    def test_damaged_compressed_snapshots_are_rejected(self):
+        """Test a compressed payload that no longer inflates raises ValueError, so autosave is skipped"""
+        data = take_snapshot(self.game, compress=True)
+        corrupted = bytearray(data)
+        # Cabecera zlib rota y bytes cambiados en mitad del flujo comprimido
+        corrupted[HEADER.size] ^= 0xFF
+        corrupted[len(data) // 2] ^= 0xFF
+        with self.assertRaises(ValueError):
+            restore_snapshot(Game(), bytes(corrupted))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "autosave.snap")
+            with open(path, "wb") as f:
+                f.write(bytes(corrupted))
+            self.assertFalse(Game().resume_autosave(path))
+
+    def test_writer_and_autosave(self):
+        """Test the background writer keeps the latest snapshot and autosave resumes it"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "autosave.snap")
+            writer = SnapshotWriter(path)
+            for points in range(5):
+                self.game.points = points
+                writer.submit(take_snapshot(self.game))
+            writer.close()
+            self.assertEqual(read_snapshot_file(path), take_snapshot(self.game))
+
+            self.game.start_autosave(path)
+            self.game.frame_count = self.game.last_autosave_frame + 10 ** 6
+            self.game._autosave()
+            self.game.stop_autosave()
+            other = Game()
+            self.assertTrue(other.resume_autosave(path))
+            self.assertEqual(self.state_of(other), self.state_of(self.game))
+            self.assertFalse(other.resume_autosave(os.path.join(temp_dir, "missing.snap")))
+
+
+if __name__ == '__main__':
+    unittest.main()
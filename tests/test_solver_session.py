@@ -0,0 +1,52 @@
+import unittest
+from src.game.mystery_generator import DEFAULT_SCENARIO
+from src.game.solver_session import SolverSession
+from src.game.statements import CLAIM_EITHER, CLAIM_GUILTY, Statement
+
+
+class TestSolverSession(unittest.TestCase):
+    def setUp(self):
+        """Set up a session with the suspects of the original mystery"""
+        self.session = SolverSession(DEFAULT_SCENARIO.suspects)
+
+    def test_possible_suspects_shrink_after_every_statement(self):
+        """Test each heard statement narrows the suspects until one is left"""
+        self.assertEqual(self.session.possible_suspects(), ["Carla", "Juan", "Rodys"])
+        remaining = []
+        for statement in DEFAULT_SCENARIO.statements:
+            self.session.add(statement)
+            remaining.append(self.session.possible_suspects())
+        self.assertEqual(remaining, [["Carla", "Rodys"], ["Rodys"], ["Rodys"]])
+        self.assertEqual(self.session.killer(), "Rodys")
+
+    def test_reset_keeps_the_solver(self):
+        """Test a new round reuses the solver and its statements"""
+        solver = self.session.solver
+        for statement in DEFAULT_SCENARIO.statements:
+            self.session.add(statement)
+        self.session.killer()
+        self.session.reset(DEFAULT_SCENARIO.suspects)
+        self.assertIs(self.session.solver, solver)
+        self.assertIsNone(self.session.killer())
+        self.session.add(DEFAULT_SCENARIO.statements[0])
+        self.assertEqual(len(self.session.guards), 3)
+
+        self.session.reset(["Ana", "Bruno", "Clara"])
+        self.assertIsNot(self.session.solver, solver)
+        self.session.add(Statement("Ana", CLAIM_EITHER, "Bruno", "Clara"))
+        self.session.add(Statement("Bruno", CLAIM_GUILTY, "Clara"))
+        self.assertEqual(self.session.possible_suspects(), ["Bruno", "Clara"])
+
+    def test_latency_is_recorded_per_query(self):
+        """Test only queries after a new statement reach the solver and are timed"""
+        self.session.add(DEFAULT_SCENARIO.statements[0])
+        self.session.possible_suspects()
+        self.session.possible_suspects()
+        stats = self.session.latency_stats()
+        self.assertEqual(stats["queries"], 1)
+        self.assertGreater(stats["max_ms"], 0)
+        self.assertLessEqual(stats["mean_ms"], stats["max_ms"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import pygame
+from pygame.sprite import LayeredDirty
+from src.game.sprites import ActorSprite, TextSprite, LAYER_ACTORS, LAYER_OVERLAY
+
+
+class TestSprites(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment"""
+        pygame.init()
+        self.font = pygame.font.Font(None, 20)
+        self.screen = pygame.Surface((800, 600))
+
+    def tearDown(self):
+        """Clean up after tests"""
+        pygame.quit()
+
+    def test_text_is_rendered_only_when_it_changes(self):
+        """Test labels keep their surface while the text is unchanged"""
+        label = TextSprite(self.font, "Tiempo: 3:00", (700, 50))
+        image = label.image
+        label.dirty = 0
+        label.set_text("Tiempo: 3:00")
+        self.assertIs(label.image, image)
+        self.assertEqual(label.dirty, 0)
+        label.set_text("Tiempo: 2:59")
+        self.assertIsNot(label.image, image)
+        self.assertEqual(label.dirty, 1)
+
+    def test_only_moved_actors_are_redrawn(self):
+        """Test a still actor produces no dirty area"""
+        image = pygame.Surface((32, 32))
+        actor = ActorSprite(image, 32, self.font, "Carla")
+        group = LayeredDirty()
+        group.add(actor, layer=LAYER_ACTORS)
+        group.add(actor.label, layer=LAYER_OVERLAY)
+        actor.place(5, 2)
+        # The first draw is a full redraw, the second one clears the dirty flags
+        group.draw(self.screen)
+        group.draw(self.screen)
+
+        actor.place(5, 2)
+        self.assertEqual(group.draw(self.screen), [])
+        actor.place(6, 2)
+        self.assertTrue(group.draw(self.screen))
+        self.assertEqual(actor.rect.topleft, (192, 64))
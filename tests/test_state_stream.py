@@ -0,0 +1,189 @@
+import io
+import socket
+import threading
+import time
+import unittest
+import pygame
+from src.game.game import Game
+from src.game.state_stream import (LENGTH, MSG_DELTA, OVERLAY_DIALOGUE, SceneState, StateEncoder,
+                                   StatePublisher, capture_state, read_messages)
+from src.game.viewer import Viewer
+from tests import benchmark
+
+
+def decode_all(data, scene=None):
+    """Apply every message of a byte string to a scene"""
+    scene = scene or SceneState()
+    for message in read_messages(io.BytesIO(data)):
+        scene.apply(message)
+    return scene
+
+
+class TestStateStream(unittest.TestCase):
+    def setUp(self):
+        """Set up a game with walking characters"""
+        pygame.init()
+        self.game = Game()
+        self.game.current_map = 'main'
+        self.game.player_x, self.game.player_y = 12, 8
+        self.game.npcs.activate_all()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        pygame.quit()
+
+    def assert_scene_matches(self, scene):
+        game = self.game
+        self.assertEqual(scene.room, game.current_map)
+        self.assertEqual(scene.player, (game.player_x, game.player_y))
+        self.assertEqual(scene.timer, int(game.timer))
+        self.assertEqual(scene.points, game.points)
+        for name, character in game.characters.items():
+            self.assertAlmostEqual(scene.positions[name][0], character.x, places=2)
+            self.assertAlmostEqual(scene.positions[name][1], character.y, places=2)
+
+    def test_deltas_rebuild_the_scene(self):
+        """Test a keyframe followed by deltas keeps the viewer scene in sync"""
+        encoder = StateEncoder()
+        keyframe = encoder.encode(0, capture_state(self.game))
+        encoder.delta(0, capture_state(self.game))
+        data = [keyframe]
+        for frame in range(1, 40):
+            self.game._update_characters()
+            if frame == 20:
+                self.game.move_player(1, 0)
+                self.game.points = 3
+            data.append(encoder.delta(frame, capture_state(self.game)) or b"")
+        scene = decode_all(b"".join(data))
+        self.assert_scene_matches(scene)
+        # Un delta de un frame es mucho más pequeño que el keyframe
+        self.game._update_characters()
+        delta = encoder.delta(40, capture_state(self.game))
+        self.assertLess(len(delta), len(keyframe))
+        self.assertIsNone(encoder.delta(41, capture_state(self.game)))
+
+    def test_deltas_before_a_keyframe_are_ignored(self):
+        """Test a subscriber joining mid-stream waits for its keyframe"""
+        encoder = StateEncoder()
+        encoder.delta(0, capture_state(self.game))
+        self.game.move_player(1, 0)
+        delta = encoder.delta(1, capture_state(self.game))
+        self.assertEqual(delta[LENGTH.size], MSG_DELTA)
+        scene = decode_all(delta)
+        self.assertFalse(scene.synced)
+
+    def test_far_positions_do_not_wrap(self):
+        """Test NPCs and the player far beyond 327 tiles, as in generated worlds, reach the viewer unchanged"""
+        npcs = self.game.npcs
+        npcs.x[0], npcs.y[0] = 2500.25, 40000.5
+        self.game.player_x, self.game.player_y = 40000, 3
+        encoder = StateEncoder()
+        previous = capture_state(self.game)
+        scene = decode_all(encoder.encode(0, previous))
+        self.assertEqual(scene.positions[npcs.names[0]], (2500.25, 40000.5))
+        self.assertEqual(scene.player, (40000, 3))
+        npcs.x[0] += 1
+        scene = decode_all(encoder.encode(1, capture_state(self.game), previous), scene)
+        self.assertEqual(scene.positions[npcs.names[0]], (2501.25, 40000.5))
+
+    def test_overlay_changes_are_sent(self):
+        """Test the dialogue box reaches the spectators"""
+        encoder = StateEncoder()
+        scene = decode_all(encoder.encode(0, capture_state(self.game)))
+        encoder.delta(0, capture_state(self.game))
+        self.game.overlay = (OVERLAY_DIALOGUE, "Carla: ¿Qué?")
+        decode_all(encoder.delta(1, capture_state(self.game)), scene)
+        self.assertEqual(scene.overlay, (OVERLAY_DIALOGUE, "Carla: ¿Qué?"))
+
+    def test_socket_subscriber_receives_the_game(self):
+        """Test a spectator connected over a socket follows the game"""
+        publisher = StatePublisher()
+        server_side, client_side = socket.socketpair()
+        publisher.add_socket(server_side)
+        for frame in range(30):
+            self.game._update_characters()
+            publisher.publish(frame, capture_state(self.game))
+        publisher.close()
+        with client_side.makefile('rb') as stream:
+            scene = SceneState()
+            for message in read_messages(stream):
+                scene.apply(message)
+        client_side.close()
+        self.assert_scene_matches(scene)
+        stats = publisher.stats()
+        self.assertEqual(stats["frames"], 30)
+
+    def test_slow_subscriber_does_not_block_publishing(self):
+        """Test a stalled spectator is resynced instead of slowing the game"""
+        release = threading.Event()
+        received = []
+
+        def stalled_write(data):
+            release.wait()
+            received.append(data)
+
+        publisher = StatePublisher(max_buffer=512)
+        subscriber = publisher.add_subscriber(stalled_write, lambda: None, "stalled")
+        start = time.perf_counter()
+        for frame in range(300):
+            self.game._update_characters()
+            publisher.publish(frame, capture_state(self.game))
+        self.assertLess(time.perf_counter() - start, 2.0)
+        publisher.flush()
+        self.assertGreater(subscriber.resyncs, 0)
+        release.set()
+        publisher.publish(300, capture_state(self.game))
+        publisher.close()
+        subscriber.thread.join(timeout=5)
+        self.assert_scene_matches(decode_all(b"".join(received)))
+
+    def test_viewer_draws_the_stream(self):
+        """Test the viewer rebuilds and draws the scene from the stream"""
+        encoder = StateEncoder()
+        viewer = Viewer(io.BytesIO(encoder.encode(7, capture_state(self.game))))
+        viewer.reader.join(timeout=5)
+        self.assertFalse(viewer.receive())
+        self.assertEqual(viewer.scene.frame, 7)
+        viewer.draw()
+        self.assertEqual(viewer.background_key[0], 'main')
+
+
+class TestStateStreamBenchmarks(benchmark.GameBenchmarkCase):
+    def test_state_stream_spectators(self):
+        """Benchmark the game loop side of the state stream with many spectators"""
+        def drain(sock):
+            while sock.recv(65536):
+                pass
+            sock.close()
+
+        self.set_npc_count(50)
+        try:
+            for count in [0, 1, 50]:
+                with self.subTest(spectators=count):
+                    publisher = StatePublisher()
+                    for _ in range(count):
+                        game_side, spectator_side = socket.socketpair()
+                        publisher.add_socket(game_side)
+                        threading.Thread(target=drain, args=(spectator_side,), daemon=True).start()
+
+                    def frame():
+                        self.walk_npcs()
+                        self.game.frame_count += 1
+                        publisher.publish(self.game.frame_count, capture_state(self.game))
+
+                    try:
+                        self.check_throughput(f"stream_spectators_{count}", frame)
+                    finally:
+                        stats = publisher.stats()
+                        publisher.close()
+                    if count:
+                        subscriber = stats["subscribers"][0]
+                        print(f"\n{count} spectators: publish {stats['publish']['mean_ms']:.3f} ms/frame, "
+                              f"{subscriber['bytes'] / max(stats['frames'], 1):.0f} B/frame and "
+                              f"{subscriber['cpu_ms'] / max(stats['frames'], 1):.3f} ms CPU/frame per spectator")
+        finally:
+            self.set_npc_count(3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import numpy as np
+import pygame
+from src.game import weather
+from src.game.game import Game
+from src.game.game_constants import MIN_RAIN_DROPS
+from src.game.game_state import GameState
+from src.game.weather import RAIN_ALPHA, Storm
+from tests import benchmark
+
+
+class TestStorm(unittest.TestCase):
+    def setUp(self):
+        self.surface = pygame.Surface((200, 150), pygame.SRCALPHA)
+        self.storm = Storm(self.surface, capacity=500, budget_ms=10, seed=3)
+
+    def test_rain_falls_and_is_drawn(self):
+        """Test drops move down with the wind, come back from the top and are drawn as streaks"""
+        y = self.storm.y.copy()
+        self.assertTrue(self.storm.update(True))
+        moved = self.storm.y > y
+        self.assertTrue(moved.any())
+        self.assertTrue(np.allclose(self.storm.y[moved], y[moved] + self.storm.speed[moved]))
+        self.assertTrue((self.storm.y <= 150 + weather.STREAK_LENGTH).all())
+        alpha = pygame.surfarray.array_alpha(self.surface)
+        self.assertGreater(np.count_nonzero(alpha == RAIN_ALPHA), 500)
+        for _ in range(100):
+            self.storm.update(True)
+        self.assertTrue(((self.storm.x >= -150) & (self.storm.x < 200)).all())
+
+    def test_indoors_only_lightning_is_seen(self):
+        """Test indoors the surface is left alone until a flash, which is dimmer than outside"""
+        self.assertFalse(self.storm.update(False))
+        self.storm.lightning_chance = 1.0
+        self.assertTrue(self.storm.update(False))
+        self.storm.lightning_chance = 0
+        indoor = self.surface.get_at((0, 0)).a
+        self.assertGreater(indoor, 0)
+        self.assertLess(indoor, weather.LIGHTNING_FRAMES[0])
+        # El destello se apaga y la superficie vuelve a quedar transparente
+        for _ in weather.LIGHTNING_FRAMES:
+            self.storm.update(False)
+        self.assertEqual(self.surface.get_at((0, 0)).a, 0)
+        self.assertFalse(self.storm.shown)
+
+    def test_rain_follows_the_frame_time(self):
+        """Test slow frames thin the rain out and fast frames bring it back"""
+        for _ in range(300):
+            self.storm.record_frame_time(25)
+        self.assertEqual(self.storm.count, MIN_RAIN_DROPS)
+        for _ in range(600):
+            self.storm.record_frame_time(2)
+        self.assertEqual(self.storm.count, self.storm.capacity)
+
+
+class TestGameWeather(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        self.game = Game()
+        self.game.state = GameState.PLAYING
+
+    def tearDown(self):
+        pygame.quit()
+
+    def test_rain_is_shown_outside_only(self):
+        """Test the weather layer is shown outside and hidden in the mansion without lightning"""
+        self.game.current_map = 'outside'
+        self.game.draw_game_screen()
+        self.assertTrue(self.game.weather_sprite.visible)
+        self.game.storm.lightning_chance = 0
+        self.game.current_map = 'main'
+        self.game.player_x, self.game.player_y = 12, 8
+        self.game.draw_game_screen()
+        self.assertFalse(self.game.weather_sprite.visible)
+
+
+class TestWeatherBenchmarks(benchmark.GameBenchmarkCase):
+    def test_weather(self):
+        """Benchmark the rain alone and the outside area with the rain falling"""
+        storm = self.game.storm
+        self.check_throughput(f"rain_update_{storm.count}", lambda: storm.update(True))
+        self.game.current_map = 'outside'
+        self.game.player_x, self.game.player_y = 1, 17
+        self.check_throughput("weather_outside", self.draw_game_frame)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pygame
+from src.game.game import Game
+from src.game.game_state import GameState
+from src.game.world import ChunkedWorld, save_world
+from tests import benchmark
+
+
+class TestChunkedWorld(unittest.TestCase):
+    def setUp(self):
+        """Set up a 100x70 world stored in 16x16 chunks"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "world.npy")
+        rng = np.random.default_rng(0)
+        self.tiles = rng.integers(0, 10, size=(70, 100), dtype=np.uint8)
+        save_world(self.path, self.tiles, chunk_size=16)
+        self.world = ChunkedWorld(self.path, max_resident=8)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.world.close()
+        self.temp_dir.cleanup()
+
+    def test_indexing_matches_the_source(self):
+        """Test tiles, rows and slices read the same values as the source array"""
+        self.assertEqual(self.world.shape, (70, 100))
+        self.assertEqual(self.world[69, 99], self.tiles[69, 99])
+        self.assertEqual(self.world[33][17], self.tiles[33, 17])
+        self.assertEqual(len(self.world[0]), 100)
+        np.testing.assert_array_equal(self.world[10:40, 5:60], self.tiles[10:40, 5:60])
+        np.testing.assert_array_equal(self.world[60:90, 90:120], self.tiles[60:, 90:])
+        with self.assertRaises(IndexError):
+            self.world[70, 0]
+
+    def test_resident_chunks_are_bounded(self):
+        """Test reading the whole world keeps at most max_resident chunks"""
+        np.testing.assert_array_equal(self.world[:, :], self.tiles)
+        self.assertLessEqual(self.world.resident_chunks, 8)
+        loads = self.world.loads
+        self.world[65, 95]
+        self.assertEqual(self.world.loads, loads)
+
+    def test_sample_keeps_the_resident_chunks(self):
+        """Test sampling reads every step-th tile without loading chunks"""
+        np.testing.assert_array_equal(self.world.sample(7), self.tiles[::7, ::7])
+        self.assertEqual(self.world.resident_chunks, 0)
+
+    def test_prefetch_loads_in_background(self):
+        """Test prefetched chunks are resident without reading them"""
+        self.world.prefetch(slice(0, 32), slice(0, 32))
+        self.assertTrue(self.world.wait_for_prefetch())
+        self.assertEqual(self.world.resident_chunks, 4)
+        loads = self.world.loads
+        np.testing.assert_array_equal(self.world[0:32, 0:32], self.tiles[0:32, 0:32])
+        self.assertEqual(self.world.loads, loads)
+
+
+class TestWorldRoom(unittest.TestCase):
+    def setUp(self):
+        """Set up a game with a 2000x2000 streamed room"""
+        pygame.init()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.temp_dir.name, "mansion.npy")
+        tiles = np.zeros((2000, 2000), dtype=np.uint8)
+        tiles[::7, :] = 1
+        tiles[:, ::11] = 6
+        save_world(path, tiles)
+        self.game = Game()
+        self.game.state = GameState.PLAYING
+        self.world = self.game.load_world_room('mansion', path, max_resident=32)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.world.close()
+        self.temp_dir.cleanup()
+        pygame.quit()
+
+    def test_walking_across_the_world_keeps_memory_constant(self):
+        """Test the camera streams chunks in while the resident set stays bounded"""
+        self.game.current_map = 'mansion'
+        for step in range(0, 1500, 50):
+            self.game.player_x, self.game.player_y = 100 + step, 100 + step
+            self.game.draw_game_screen()
+            self.assertLessEqual(self.world.resident_chunks, 32)
+        self.assertEqual(self.game.camera.origin, (1550 - 12, 1550 - 9))
+        self.assertEqual(self.game.get_current_map()[1596][1595], 6)
+
+    def test_unload_closes_the_world(self):
+        """Test unloading a world room closes it and forgets every cached layer"""
+        self.game.current_map = 'mansion'
+        self.game.draw_game_screen()
+        self.game.current_map = 'main'
+        self.game.unload_world_room('mansion')
+        self.assertIsNone(self.world.store)
+        self.assertFalse(self.world._loader.is_alive())
+        for cache in (self.game.rooms, self.game.room_arrays, self.game.room_layers, self.game.room_origins):
+            self.assertNotIn('mansion', cache)
+        self.game.draw_game_screen()
+
+
+class TestWorldBenchmarks(benchmark.GameBenchmarkCase):
+    def test_large_world(self):
+        """Benchmark walking through a streamed 2000x2000 room"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "world.npy")
+            tiles = np.zeros((2000, 2000), dtype=np.uint8)
+            tiles[::9, :] = 1
+            tiles[:, ::13] = 6
+            save_world(path, tiles)
+            self.game.load_world_room('benchmark_world', path)
+            self.game.current_map = 'benchmark_world'
+            self.game.player_x, self.game.player_y = 1000, 1000
+
+            def draw_frame():
+                # Walk back and forth across a few chunks
+                self.game.player_x = 1000 + (self.game.player_x - 999) % 200
+                self.draw_game_frame()
+
+            try:
+                self.check_throughput("world_2000x2000", draw_frame)
+            finally:
+                self.game.current_map = 'main'
+                self.game.unload_world_room('benchmark_world')
+
+
+if __name__ == '__main__':
+    unittest.main()